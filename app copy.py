@@ -2,23 +2,24 @@
 # 날짜별 크롤링 + 키워드 분석 + 트렌드 시각화 + AI 인사이트
 
 import streamlit as st
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
+from kbs_cache import ResponseCache, make_key
+from kbs_store import ArticleStore, date_label
+import kbs_cli
+import kbs_dataset
+import kbs_search
+import kbs_sources
+import kbs_metrics
+import kbs_trends
+import kbs_topics
 import pandas as pd
-from openai import OpenAI
-import time
-from datetime import datetime
+from openai import OpenAI, DefaultHttpxClient
+from datetime import datetime, timedelta
 import io
 import os
 from dotenv import load_dotenv
-from collections import Counter
-import re
 import plotly.express as px
 import plotly.graph_objects as go
 from wordcloud import WordCloud
-import matplotlib.pyplot as plt
 
 # 환경변수 로드
 load_dotenv()
@@ -35,6 +36,217 @@ st.title("📊 KBS 국제 뉴스 분석 대시보드")
 st.markdown("실시간 뉴스 크롤링 + AI 분석 + 키워드 트렌드")
 st.markdown("---")
 
+# 요약/인사이트 캐시 (프로세스당 하나, 새로고침해도 유지)
+@st.cache_resource
+def get_cache():
+    return ResponseCache()
+
+cache = get_cache()
+
+# 수집한 기사 저장소 (다시 실행하면 새 기사만 수집)
+@st.cache_resource
+def get_store():
+    return ArticleStore()
+
+# 기사 검색 색인 (글자 2-gram 역색인, 크롤링할 때 기사마다 바로 추가됨)
+@st.cache_resource
+def get_index():
+    return kbs_search.SearchIndex(store=get_store())
+
+# 날짜 × 키워드 행렬 (크롤링할 때 기사마다 바로 더해짐)
+@st.cache_resource
+def get_trends():
+    return kbs_trends.TrendIndex()
+
+# OpenAI 클라이언트 (API 키마다 하나, 모든 세션이 같은 HTTP 커넥션 풀을 씀)
+@st.cache_resource
+def get_http_client():
+    return DefaultHttpxClient()
+
+@st.cache_resource(max_entries=16)
+def get_openai_client(api_key):
+    return OpenAI(api_key=api_key, http_client=get_http_client())
+
+LIGHT_COLUMNS = ("url", "기고 날짜", "뉴스 제목", "3줄 요약", "본문 길이", kbs_dataset.DUPLICATE_COLUMN)
+FULL_COLUMNS = ("기고 날짜", "뉴스 제목", "뉴스 내용", "3줄 요약")
+
+# 분석용 뉴스 데이터셋 (본문 제외, 프로세스당 하나를 모든 세션이 읽기 전용으로 같이 씀)
+# cache_data는 부를 때마다 복사본을 돌려주므로 세션/기간 수만큼 메모리가 늘어남 -> cache_resource로 하나만 둠
+# 세션은 기간(window)만 들고, 표/차트는 kbs_dataset.window()로 잘라 본 것(복사 없음)을 씀
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_shared_news(version):
+    """version은 데이터셋 파일이 추가되면 바뀌어서 새로 읽게 함 (예전 버전은 버림)"""
+    return kbs_dataset.load_shared(LIGHT_COLUMNS)
+
+def news_view(start_day, end_day, version):
+    """공유 데이터셋에서 기간 안의 행만 (읽기 전용, 고치지 말 것)"""
+    return kbs_dataset.window(get_shared_news(version), start_day, end_day)
+
+# 기사별로 저장할 때 세어 둔 키워드 빈도를 합쳐서 상위 k개
+@st.cache_data(show_spinner=False)
+def load_top_keywords(start_day, end_day, k, version):
+    return kbs_dataset.top_terms(start_day, end_day, k)
+
+# ---- 대시보드 파생 결과 캐시 ----
+# 모두 (start_day, end_day, version) 지문으로 캐시해서, 검색어 입력 같은 위젯 조작으로
+# 스크립트가 다시 돌아도 데이터가 같으면 차트/워드클라우드/엑셀을 다시 만들지 않음
+
+@st.cache_data(show_spinner=False)
+def build_date_counts(start_day, end_day, version):
+    # 다시 올라온 같은 기사는 트렌드를 부풀리지 않도록 원본만 셈
+    df = news_view(start_day, end_day, version)
+    counts = df.loc[df[kbs_dataset.DUPLICATE_COLUMN].isna(), '기고 날짜'].value_counts(sort=False)
+    # 날짜 category에는 기간 밖 날짜도 들어 있으므로 0건은 뺌
+    counts = counts[counts > 0].sort_index()
+    return pd.Series(counts.to_numpy(), index=counts.index.astype(str))
+
+@st.cache_data(show_spinner=False)
+def build_timeline_figure(start_day, end_day, version):
+    date_counts = build_date_counts(start_day, end_day, version)
+    fig_timeline = px.line(
+        x=date_counts.index,
+        y=date_counts.values,
+        labels={'x': '날짜', 'y': '뉴스 개수'},
+        title="날짜별 뉴스 발행 추이"
+    )
+    fig_timeline.update_traces(mode='lines+markers', line_color='#FF6B6B')
+    return fig_timeline
+
+@st.cache_data(show_spinner=False)
+def build_keyword_bar_figure(start_day, end_day, version):
+    top10_keywords = load_top_keywords(start_day, end_day, 20, version)[:10]
+    fig_bar = px.bar(
+        x=[k[1] for k in top10_keywords],
+        y=[k[0] for k in top10_keywords],
+        orientation='h',
+        labels={'x': '빈도', 'y': '키워드'},
+        title="가장 많이 언급된 키워드"
+    )
+    fig_bar.update_traces(marker_color='#4ECDC4')
+    return fig_bar
+
+@st.cache_data(show_spinner=False)
+def build_wordcloud_png(start_day, end_day, version):
+    """워드클라우드 이미지 (PNG bytes)"""
+    top_keywords = load_top_keywords(start_day, end_day, 20, version)
+    wordcloud = WordCloud(
+        font_path='C:\\Windows\\Fonts\\malgun.ttf',  # 한글 폰트
+        width=800,
+        height=400,
+        background_color='white',
+        colormap='viridis'
+    ).generate_from_frequencies(dict(top_keywords))
+    output = io.BytesIO()
+    wordcloud.to_image().save(output, format="PNG")
+    return output.getvalue()
+
+@st.cache_data(show_spinner=False)
+def build_keyword_table(start_day, end_day, version):
+    keyword_df = pd.DataFrame(load_top_keywords(start_day, end_day, 20, version), columns=['키워드', '빈도'])
+    keyword_df['순위'] = range(1, len(keyword_df) + 1)
+    return keyword_df[['순위', '키워드', '빈도']]
+
+@st.cache_data(show_spinner=False)
+def build_excel(start_day, end_day, version):
+    # 본문은 공유 데이터셋에 두지 않고 내보낼 때만 그 기간 것을 읽음 (결과 bytes만 캐시)
+    full_df = kbs_dataset.load(start_day, end_day, list(FULL_COLUMNS))
+    keyword_df = build_keyword_table(start_day, end_day, version)
+    return kbs_dataset.export_excel({'국제뉴스': full_df, '키워드': keyword_df[['키워드', '빈도']]})
+
+@st.cache_data(show_spinner=False)
+def build_topics(start_day, end_day, version):
+    """기간 전체 기사를 주제로 묶은 결과 (AI 인사이트 프롬프트용)"""
+    return kbs_topics.cluster(start_day, end_day)
+
+RISING_LIMIT = 15  # 떠오르는 키워드 표에 보여줄 수
+
+@st.cache_data(show_spinner=False)
+def build_rising_table(start_day, end_day, version):
+    """기간 마지막 날까지 최근 7일 동안 이전 4주보다 급증한 키워드"""
+    return pd.DataFrame(get_trends().rising(end_day, k=RISING_LIMIT),
+                        columns=['키워드', '최근 기사 수', '기대 기사 수', '증가율', '급증 점수'])
+
+@st.cache_data(show_spinner=False)
+def build_term_series_figure(start_day, end_day, version, terms, window):
+    """키워드별 날짜 추이 (기사 수의 window일 이동 평균)"""
+    days, terms, matrix, _ = get_trends().matrix(start_day, end_day, terms=terms)
+    series = pd.DataFrame(kbs_trends.rolling_sum(matrix, window) / window, index=pd.to_datetime(days),
+                          columns=terms)
+    fig = px.line(series, labels={'index': '날짜', 'value': '기사 수', 'variable': '키워드'},
+                  title=f"키워드별 추이 ({window}일 이동 평균)" if window > 1 else "키워드별 추이")
+    return fig
+
+SEARCH_LIMIT = 50  # 검색 결과에 보여줄 기사 수
+
+@st.cache_data(show_spinner=False)
+def search_news(start_day, end_day, version, keyword):
+    """색인에서 관련도순 상위 기사 (전체 일치 수, DataFrame)"""
+    total, results = get_index().search(keyword, start_day, end_day, limit=SEARCH_LIMIT)
+    found = pd.DataFrame(results, columns=['url', 'date', 'title', 'score', 'snippet'])
+    summaries = news_view(start_day, end_day, version).set_index('url')['3줄 요약']
+    found['3줄 요약'] = summaries.reindex(found['url']).to_numpy()
+    return total, found.rename(columns={'date': '기고 날짜', 'title': '뉴스 제목', 'score': '관련도',
+                                        'snippet': '미리보기'})
+
+# ---- 성능 기록 (크롤링 실행마다 data/metrics/spans.jsonl에 추가됨) ----
+THROUGHPUT_BUCKET = 5  # 처리량 그래프의 시간 간격(초)
+
+def metrics_version():
+    path = kbs_metrics.SPANS_PATH
+    return os.path.getmtime(path) if os.path.exists(path) else 0
+
+@st.cache_data(show_spinner=False)
+def load_perf_runs(version):
+    """{실행 id: {'spans', 'counters', 'errors'}} - version은 파일 수정 시각"""
+    return kbs_metrics.load_runs()
+
+@st.cache_data(show_spinner=False)
+def build_perf_summary(run_id, version):
+    run = load_perf_runs(version)[run_id]
+    spans = pd.DataFrame(run['spans'])
+    rows = []
+    for stage in kbs_metrics.STAGES:
+        values = spans.loc[spans['stage'] == stage, 'seconds'].tolist() if len(spans) else []
+        counters = {c['kind']: c['value'] for c in run['counters'] if c['stage'] == stage}
+        if not values and not counters:
+            continue
+        rows.append({
+            '단계': stage, '횟수': len(values),
+            'p50(초)': round(kbs_metrics.percentile(values, 0.5), 3),
+            'p95(초)': round(kbs_metrics.percentile(values, 0.95), 3),
+            '최대(초)': round(max(values, default=0), 3),
+            '합계(초)': round(sum(values), 2),
+            '재시도': counters.get(kbs_metrics.RETRY, 0),
+            '건너뜀': counters.get(kbs_metrics.SKIP, 0),
+            '오류': counters.get(kbs_metrics.ERROR, 0),
+        })
+    return pd.DataFrame(rows)
+
+@st.cache_data(show_spinner=False)
+def build_perf_figures(run_id, version):
+    """(단계별 지연 히스토그램, 시간대별 처리량) 그래프"""
+    spans = pd.DataFrame(load_perf_runs(version)[run_id]['spans'])
+    if not len(spans):
+        return None, None
+    fig_hist = px.histogram(spans, x='seconds', facet_col='stage', facet_col_wrap=3, nbins=30,
+                            labels={'seconds': '걸린 시간(초)', 'stage': '단계'},
+                            title="단계별 지연 분포")
+    fig_hist.update_yaxes(matches=None)
+    fig_hist.update_xaxes(matches=None)
+    finished = spans['start'] + spans['seconds'] - spans['start'].min()
+    spans['구간(초)'] = (finished // THROUGHPUT_BUCKET * THROUGHPUT_BUCKET).astype(int)
+    throughput = spans.groupby(['구간(초)', 'stage']).size().reset_index(name='처리 수')
+    throughput['초당 처리'] = throughput['처리 수'] / THROUGHPUT_BUCKET
+    fig_rate = px.line(throughput, x='구간(초)', y='초당 처리', color='stage', markers=True,
+                       labels={'stage': '단계'}, title=f"시간대별 처리량 ({THROUGHPUT_BUCKET}초 단위)")
+    return fig_hist, fig_rate
+
+# 예전 실행에서 SQLite에만 저장된 기사가 있으면 데이터셋으로 한 번 옮김
+kbs_dataset.import_store(get_store())
+# 색인이 비어 있으면 데이터셋에 있는 기사로 한 번 채움
+kbs_search.index_dataset(get_index())
+kbs_trends.index_dataset(get_trends())
+
 # 사이드바
 with st.sidebar:
     st.header("⚙️ 크롤링 설정")
@@ -62,6 +274,11 @@ with st.sidebar:
 
     st.markdown("---")
 
+    # 수집할 소스 (KBS 분류 등, 여러 개면 같이 수집)
+    st.subheader("📰 소스")
+    sources = st.multiselect("수집할 소스", list(kbs_sources.SOURCES), default=[kbs_sources.DEFAULT_SOURCE],
+                             format_func=lambda name: kbs_sources.SOURCES[name]["label"])
+
     # 날짜 범위
     st.subheader("📅 크롤링 날짜")
     num_days = st.slider("크롤링할 날짜 수", 1, 30, 3)
@@ -71,48 +288,43 @@ with st.sidebar:
     # 페이지 수
     st.subheader("📄 페이지 설정")
     pages_per_day = st.slider("날짜당 페이지 수", 1, 10, 2)
+    max_workers = st.slider("상세 페이지 동시 요청 수", 1, 16, 8)
+    summary_workers = st.slider("요약 동시 요청 수", 1, 16, 4)
+    browsers = st.slider("브라우저 수 (소스 × 날짜 병렬 수집)", 1, 6, 2)
 
     st.markdown("---")
     start_crawling = st.button("🚀 크롤링 시작", type="primary", use_container_width=True)
+    # 끊긴 실행이 있으면 멈춘 자리(날짜/페이지/상세 페이지)부터 이어서
+    unfinished = kbs_cli.unfinished_run()
+    resume_crawling = unfinished is not None and st.button(
+        f"⏯️ 끊긴 크롤링 이어서 ({unfinished['targets'][-1]} ~ {unfinished['targets'][0]})",
+        use_container_width=True)
 
-# 키워드 추출 함수 (한글)
-def extract_keywords(text):
-    """한글 텍스트에서 주요 키워드 추출 (명사 중심)"""
-    # 불용어 제거
-    stopwords = {'있다', '하다', '되다', '이다', '않다', '없다', '같다', '많다',
-                 '크다', '작다', '높다', '낮다', '좋다', '나쁘다', '위해', '통해',
-                 '대한', '있는', '하는', '되는', '이번', '올해', '지난', '오늘'}
+    st.markdown("---")
 
-    # 2글자 이상 한글 단어 추출
-    words = re.findall(r'[가-힣]{2,}', text)
+    # 이미 저장된 뉴스만 불러와서 보기 (크롤링 없이)
+    st.subheader("📂 저장된 뉴스 보기")
+    saved_days = kbs_dataset.list_days()
+    if saved_days:
+        today = datetime.now().date()
+        date_range = st.date_input("기간", value=(today - timedelta(days=6), today))
+        if st.button("📂 불러오기", use_container_width=True) and len(date_range) == 2:
+            st.session_state['window'] = (date_range[0].isoformat(), date_range[1].isoformat())
+        st.caption(f"저장된 날짜 {len(saved_days)}일 ({saved_days[0]} ~ {saved_days[-1]})")
+    else:
+        st.caption("아직 저장된 뉴스가 없습니다")
 
-    # 불용어 제거 및 카운트
-    filtered_words = [w for w in words if w not in stopwords]
+# AI 인사이트 생성 함수
+INSIGHT_TOKENS = 1500  # 인사이트 프롬프트에 넣을 뉴스 제목의 최대 토큰
 
-    return filtered_words
+def generate_insights(df, top_keywords, topics, client, cache=None):
+    """수집된 뉴스 데이터를 분석하여 인사이트 생성
 
-# OpenAI 요약 함수
-def summarize_news(content, client):
+    기사 전체를 묶은 주제 요약(kbs_topics)을 넣으므로 기사 수와 상관없이 프롬프트 크기가 같음
+    """
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "뉴스를 정확하고 간결하게 3줄로 요약하세요."},
-                {"role": "user", "content": f"다음 뉴스를 3줄로 요약:\n\n{content}"}
-            ],
-            max_tokens=200,
-            temperature=0.7
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        return f"요약 실패: {str(e)}"
-
-# AI 인사이트 생성 함수
-def generate_insights(df, top_keywords, client):
-    """수집된 뉴스 데이터를 분석하여 인사이트 생성"""
-    try:
-        # 뉴스 제목과 요약 샘플
-        sample_titles = "\n".join(df['뉴스 제목'].head(10).tolist())
+        # 주제별 기사 수/추세/키워드/대표 제목 (INSIGHT_TOKENS를 넘지 않게 큰 주제부터)
+        topic_digest = kbs_topics.digest(topics, INSIGHT_TOKENS)
         keyword_str = ", ".join([f"{k}({v}건)" for k, v in top_keywords[:10]])
 
         prompt = f"""
@@ -122,8 +334,8 @@ def generate_insights(df, top_keywords, client):
 **총 뉴스 수**: {len(df)}개
 **주요 키워드**: {keyword_str}
 
-**주요 뉴스 제목들**:
-{sample_titles}
+**주제별 요약** (전체 기사를 비슷한 기사끼리 묶음, 추세는 기간 뒤쪽 절반의 비율 변화):
+{topic_digest}
 
 위 데이터를 바탕으로 다음 관점에서 인사이트를 제공해주세요:
 
@@ -134,147 +346,104 @@ def generate_insights(df, top_keywords, client):
 각 항목을 명확하게 구분하여 간결하게 작성해주세요.
 """
 
+        system_prompt = "당신은 국제 뉴스 분석 전문가입니다."
+        key = make_key(prompt, model="gpt-4o-mini", system=system_prompt, max_tokens=500, temperature=0.8)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
         response = client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
-                {"role": "system", "content": "당신은 국제 뉴스 분석 전문가입니다."},
+                {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt}
             ],
             max_tokens=500,
             temperature=0.8
         )
 
-        return response.choices[0].message.content.strip()
+        insights = response.choices[0].message.content.strip()
+        if cache is not None:
+            cache.set(key, insights)
+        return insights
     except Exception as e:
         return f"인사이트 생성 실패: {str(e)}"
 
-# 크롤링 함수
-def crawl_news(num_days, pages_per_day, api_key, progress_bar, status_text):
-    client = OpenAI(api_key=api_key)
-
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
+# 크롤링은 별도 프로세스(kbs_cli crawl)에서 돌고, 대시보드는 진행 상황 파일과 저장된 데이터만 읽음
+# (크롤링이 오래 걸려도 화면은 바로 반응하고, 여러 사용자가 같은 결과를 봄)
+STATUS_REFRESH = 2  # 크롤링 중 진행 상황을 다시 읽는 간격(초)
 
-    driver = webdriver.Chrome(options=chrome_options)
-    data = []
-    base_url = "https://news.kbs.co.kr/news/pc/category/category.do?ctcd=0006&ref=pSiteMap"
-
-    total_steps = num_days * pages_per_day
-    current_step = 0
-
-    try:
-        status_text.text("🌐 KBS 국제 뉴스 접속 중...")
-        driver.get(base_url)
-        time.sleep(3)
-
-        for day_num in range(num_days):
-            try:
-                current_date = driver.find_element(By.CSS_SELECTOR, ".datepicker-label .date").text
-            except:
-                current_date = datetime.now().strftime("%Y.%m.%d")
-
-            status_text.text(f"📅 [{day_num + 1}/{num_days}일] {current_date} 크롤링 중...")
-
-            for page_num in range(1, pages_per_day + 1):
-                current_step += 1
-                progress_bar.progress(current_step / total_steps)
-
-                time.sleep(2)
-                soup = BeautifulSoup(driver.page_source, "html.parser")
-                news_items = soup.select(".box-contents.has-wrap .box-content")
-
-                for item in news_items:
-                    try:
-                        link = item.get("href")
-                        if not link:
-                            continue
-
-                        news_url = "https://news.kbs.co.kr" + link
-                        title_elem = item.select_one(".title")
-                        title = title_elem.text.strip() if title_elem else "제목 없음"
-
-                        date_elem = item.select_one(".field-writer .date")
-                        date = date_elem.text.strip() if date_elem else current_date
-
-                        driver.execute_script(f"window.open('{news_url}', '_blank');")
-                        driver.switch_to.window(driver.window_handles[1])
-                        time.sleep(1)
-
-                        detail_soup = BeautifulSoup(driver.page_source, "html.parser")
-                        content_elem = detail_soup.select_one("#cont_newstext")
-                        content = content_elem.text.strip() if content_elem else "내용 없음"
-
-                        summary = summarize_news(content, client)
-                        data.append([date, title, content, summary])
-
-                        driver.close()
-                        driver.switch_to.window(driver.window_handles[0])
-                        time.sleep(0.5)
-
-                    except Exception as e:
-                        if len(driver.window_handles) > 1:
-                            driver.close()
-                            driver.switch_to.window(driver.window_handles[0])
-                        continue
-
-                if page_num < pages_per_day:
-                    try:
-                        next_button = driver.find_element(By.CSS_SELECTOR, f"#page{page_num + 1}")
-                        driver.execute_script("arguments[0].click();", next_button)
-                        time.sleep(2)
-                    except:
-                        break
-
-            if day_num < num_days - 1:
-                try:
-                    prev_button = driver.find_element(By.CSS_SELECTOR, ".previous-button")
-                    driver.execute_script("arguments[0].click();", prev_button)
-                    time.sleep(3)
-                except:
-                    break
-
-    finally:
-        driver.quit()
-
-    return data
-
-# 크롤링 실행
-if start_crawling:
+if start_crawling or resume_crawling:
     if not api_key:
         st.error("❌ OpenAI API 키를 입력하세요!")
+    elif kbs_cli.is_running():
+        st.warning("⏳ 이미 크롤링이 실행 중입니다. 끝나면 새 기사가 대시보드에 반영됩니다.")
     else:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
-        with st.spinner("크롤링 중..."):
-            data = crawl_news(num_days, pages_per_day, api_key, progress_bar, status_text)
-
-        progress_bar.progress(1.0)
-        status_text.text("✅ 크롤링 완료!")
-
-        if data:
-            df = pd.DataFrame(data, columns=["기고 날짜", "뉴스 제목", "뉴스 내용", "3줄 요약"])
-            st.session_state['df'] = df
-            st.success(f"✅ 총 {len(df)}개의 뉴스를 수집했습니다!")
-        else:
-            st.error("❌ 수집된 뉴스가 없습니다.")
+        kbs_cli.start_background(num_days, pages_per_day, browsers, max_workers, summary_workers, api_key,
+                                 resume=resume_crawling, sources=sources)
+        # 크롤링하는 기간을 바로 대시보드로 보여줌 (새 기사는 저장되는 대로 반영)
+        window = (unfinished['targets'] if resume_crawling else
+                  [date_label(day_offset) for day_offset in range(num_days)])
+        st.session_state['window'] = (kbs_dataset.partition_day(window[-1]), kbs_dataset.partition_day(window[0]))
+        st.session_state['crawl_started'] = datetime.now().timestamp()
+        st.success("🚀 백그라운드에서 크롤링을 시작했습니다.")
+
+def show_crawl_status():
+    status = kbs_cli.read_status()
+    started = st.session_state.get('crawl_started')
+    if started and (status is None or status['started_at'] < started - 1):
+        # 방금 띄운 프로세스가 아직 상태 파일을 쓰기 전
+        st.caption("⏳ 크롤링 프로세스 시작 중...")
+        return
+    if status is None:
+        return
+    if status['state'] == 'running':
+        st.progress(min(max(status['fraction'], 0.0), 1.0))
+        st.caption(f"⏳ {status['message']} · 새로 요약된 기사 {status['new_articles']}개 "
+                   f"({datetime.fromtimestamp(status['started_at']):%H:%M:%S} 시작)")
+        st.session_state['crawl_running'] = True
+        # 크롤러가 새 기사를 데이터셋에 쓰면 표/지표/차트도 새 데이터로 다시 그림
+        shown = st.session_state.get('shown_version')
+        if shown is not None and kbs_dataset.dataset_version() != shown:
+            st.rerun()
+        return
+    finished = datetime.fromtimestamp(status['finished_at'] or status['started_at'])
+    if status['state'] == 'failed':
+        st.error(f"❌ 마지막 크롤링 실패 ({finished:%m-%d %H:%M}): {status['error']} "
+                 f"(그 전까지 수집한 기사는 저장되었습니다)")
+    else:
+        st.caption(f"✅ 마지막 크롤링 {finished:%m-%d %H:%M} · 새 기사 {status['new_articles']}개")
+    st.session_state.pop('crawl_started', None)
+    if st.session_state.pop('crawl_running', False):
+        # 방금 끝났으면 새 데이터로 화면 전체를 다시 그림
+        st.rerun()
+
+# 크롤링 중에는 진행 상황 부분만 주기적으로 다시 그림 (fragment가 없는 버전은 새로고침 버튼)
+if hasattr(st, "fragment"):
+    st.fragment(run_every=STATUS_REFRESH)(show_crawl_status)()
+else:
+    show_crawl_status()
+    if (st.session_state.get('crawl_running') or st.session_state.get('crawl_started')) \
+            and st.button("🔄 진행 상황 새로고침"):
+        st.rerun()
 
 # 대시보드 표시
-if 'df' in st.session_state:
-    df = st.session_state['df']
-    client = OpenAI(api_key=api_key)
+if 'window' in st.session_state:
+    start_day, end_day = st.session_state['window']
+    version = kbs_dataset.dataset_version()
+    st.session_state['shown_version'] = version
+    fingerprint = (start_day, end_day, version)
+    # 화면에는 본문 없이 가벼운 컬럼만 (공유 데이터셋의 기간 부분), 본문은 검색/내보내기에 필요할 때만 읽음
+    df = news_view(start_day, end_day, version)
+
+    st.caption(f"📂 {start_day} ~ {end_day} 기간의 저장된 뉴스")
 
-    # 키워드 추출
-    all_text = " ".join(df['뉴스 제목'] + " " + df['뉴스 내용'])
-    keywords = extract_keywords(all_text)
-    keyword_counts = Counter(keywords)
-    top_keywords = keyword_counts.most_common(20)
+    # 키워드 순위 (본문을 다시 읽지 않고 저장된 빈도만 합침)
+    top_keywords = load_top_keywords(start_day, end_day, 20, version)
 
     # 탭 구성
-    tab1, tab2, tab3, tab4 = st.tabs(["📊 대시보드", "🔍 키워드 분석", "💡 AI 인사이트", "📥 데이터"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["📊 대시보드", "🔍 키워드 분석", "💡 AI 인사이트", "📥 데이터", "⚡ 성능"])
 
     with tab1:
         st.header("📊 뉴스 분석 대시보드")
@@ -282,11 +451,13 @@ if 'df' in st.session_state:
         # 통계 카드
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("총 뉴스", f"{len(df)}개")
+            duplicates = int(df[kbs_dataset.DUPLICATE_COLUMN].notna().sum())
+            st.metric("총 뉴스", f"{len(df)}개",
+                      help=f"거의 같은 기사 {duplicates}개는 원본 요약을 재사용하고 트렌드/키워드 집계에서 제외")
         with col2:
             st.metric("수집 날짜", f"{df['기고 날짜'].nunique()}일")
         with col3:
-            st.metric("평균 길이", f"{df['뉴스 내용'].str.len().mean():.0f}자")
+            st.metric("평균 길이", f"{df['본문 길이'].mean():.0f}자")
         with col4:
             st.metric("주요 키워드", f"{len(top_keywords)}개")
 
@@ -294,15 +465,7 @@ if 'df' in st.session_state:
 
         # 날짜별 뉴스 개수 차트
         st.subheader("📈 날짜별 뉴스 트렌드")
-        date_counts = df['기고 날짜'].value_counts().sort_index()
-        fig_timeline = px.line(
-            x=date_counts.index,
-            y=date_counts.values,
-            labels={'x': '날짜', 'y': '뉴스 개수'},
-            title="날짜별 뉴스 발행 추이"
-        )
-        fig_timeline.update_traces(mode='lines+markers', line_color='#FF6B6B')
-        st.plotly_chart(fig_timeline, use_container_width=True)
+        st.plotly_chart(build_timeline_figure(*fingerprint), use_container_width=True)
 
         st.markdown("---")
 
@@ -311,32 +474,13 @@ if 'df' in st.session_state:
 
         with col1:
             st.subheader("🔝 Top 10 키워드")
-            top10_keywords = top_keywords[:10]
-            fig_bar = px.bar(
-                x=[k[1] for k in top10_keywords],
-                y=[k[0] for k in top10_keywords],
-                orientation='h',
-                labels={'x': '빈도', 'y': '키워드'},
-                title="가장 많이 언급된 키워드"
-            )
-            fig_bar.update_traces(marker_color='#4ECDC4')
-            st.plotly_chart(fig_bar, use_container_width=True)
+            st.plotly_chart(build_keyword_bar_figure(*fingerprint), use_container_width=True)
 
         with col2:
             st.subheader("☁️ 워드 클라우드")
-            # 워드클라우드 생성
-            wordcloud = WordCloud(
-                font_path='C:\\Windows\\Fonts\\malgun.ttf',  # 한글 폰트
-                width=800,
-                height=400,
-                background_color='white',
-                colormap='viridis'
-            ).generate_from_frequencies(dict(top_keywords))
-
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.imshow(wordcloud, interpolation='bilinear')
-            ax.axis('off')
-            st.pyplot(fig)
+            # 워드클라우드는 무거우므로 켤 때만 생성 (한 번 만들면 같은 데이터에서는 재사용)
+            if st.toggle("워드 클라우드 보기", key="show_wordcloud"):
+                st.image(build_wordcloud_png(*fingerprint), use_container_width=True)
 
     with tab2:
         st.header("🔍 키워드 상세 분석")
@@ -345,51 +489,110 @@ if 'df' in st.session_state:
         search_keyword = st.text_input("🔎 키워드 검색", placeholder="검색할 키워드를 입력하세요")
 
         if search_keyword:
-            filtered = df[df['뉴스 제목'].str.contains(search_keyword, case=False, na=False) |
-                         df['뉴스 내용'].str.contains(search_keyword, case=False, na=False)]
-            st.info(f"'{search_keyword}' 관련 뉴스: {len(filtered)}개")
-            st.dataframe(filtered[['기고 날짜', '뉴스 제목', '3줄 요약']], use_container_width=True)
+            total, found = search_news(*fingerprint, search_keyword)
+            st.info(f"'{search_keyword}' 관련 뉴스: {total}개" +
+                    (f" (관련도 상위 {len(found)}개 표시)" if total > len(found) else ""))
+            for _, row in found.iterrows():
+                st.markdown(f"**{row['뉴스 제목']}** · {row['기고 날짜']} · 관련도 {row['관련도']}")
+                st.caption(row['미리보기'])
+            with st.expander("📋 검색 결과 표로 보기"):
+                st.dataframe(found[['기고 날짜', '뉴스 제목', '관련도', '3줄 요약']], use_container_width=True)
+
+        st.markdown("---")
+
+        # 떠오르는 키워드 + 키워드별 추이 (저장된 날짜 × 키워드 행렬에서 바로 계산)
+        st.subheader("🚀 떠오르는 키워드")
+        rising_df = build_rising_table(*fingerprint)
+        if rising_df.empty:
+            st.info("비교할 만큼 쌓인 기사가 아직 없습니다.")
+        else:
+            st.caption(f"{end_day}까지 최근 {kbs_trends.WINDOW}일 동안 이전 {kbs_trends.BASELINE}일보다 "
+                       f"많이 나온 키워드 (기대 기사 수는 수집량 차이를 반영한 값)")
+            st.dataframe(rising_df, use_container_width=True)
+
+        trend_terms = st.multiselect(
+            "📈 키워드별 추이",
+            options=[k for k, _ in top_keywords] + [k for k in rising_df['키워드'] if k not in dict(top_keywords)],
+            default=list(rising_df['키워드'].head(3)) or [k for k, _ in top_keywords[:3]],
+        )
+        smoothing = st.radio("이동 평균", [1, 7], format_func=lambda w: "일별" if w == 1 else f"{w}일",
+                             horizontal=True)
+        if trend_terms:
+            st.plotly_chart(build_term_series_figure(*fingerprint, tuple(trend_terms), smoothing),
+                            use_container_width=True)
 
         st.markdown("---")
 
         # 전체 키워드 테이블
         st.subheader("📋 전체 키워드 순위")
-        keyword_df = pd.DataFrame(top_keywords, columns=['키워드', '빈도'])
-        keyword_df['순위'] = range(1, len(keyword_df) + 1)
-        st.dataframe(keyword_df[['순위', '키워드', '빈도']], use_container_width=True, height=400)
+        st.dataframe(build_keyword_table(*fingerprint), use_container_width=True, height=400)
 
     with tab3:
         st.header("💡 AI 인사이트")
 
         if st.button("🤖 AI 인사이트 생성", type="primary"):
             with st.spinner("AI가 뉴스를 분석하고 있습니다..."):
-                insights = generate_insights(df, top_keywords, client)
+                insights = generate_insights(df, top_keywords, build_topics(*fingerprint),
+                                             get_openai_client(api_key), cache)
                 st.session_state['insights'] = insights
 
         if 'insights' in st.session_state:
             st.markdown(st.session_state['insights'])
 
+        # 인사이트에 들어가는 주제 요약 (기간이 같으면 캐시에서 바로 나옴)
+        with st.expander("🧩 AI에 전달되는 주제별 요약 보기"):
+            topics = build_topics(*fingerprint)
+            if topics:
+                topics_df = pd.DataFrame(topics)
+                topics_df['추세'] = topics_df['추세'].map(kbs_topics.format_trend)
+                topics_df['핵심 키워드'] = topics_df['핵심 키워드'].str.join(", ")
+                topics_df['대표 제목'] = topics_df['대표 제목'].str.join(" / ")
+                st.dataframe(topics_df, use_container_width=True)
+            else:
+                st.info("주제로 묶을 기사가 없습니다.")
+
     with tab4:
         st.header("📥 데이터 및 다운로드")
 
-        # 데이터 미리보기
+        # 데이터 미리보기 (본문 제외)
         st.subheader("📋 전체 뉴스 데이터")
-        st.dataframe(df, use_container_width=True, height=400)
-
-        # 엑셀 다운로드
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='국제뉴스')
-            keyword_df.to_excel(writer, index=False, sheet_name='키워드')
-        excel_data = output.getvalue()
-
-        st.download_button(
-            label="📥 엑셀 다운로드 (뉴스 + 키워드)",
-            data=excel_data,
-            file_name=f"국제뉴스_분석_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True
-        )
+        st.dataframe(df[list(LIGHT_COLUMNS)], use_container_width=True, height=400)
+
+        # 엑셀은 본문까지 읽어야 하므로 버튼을 눌렀을 때만 생성 (저장은 parquet, 엑셀은 내보내기용)
+        if st.button("📄 엑셀 파일 만들기 (뉴스 + 키워드)", use_container_width=True):
+            st.session_state['excel_fingerprint'] = fingerprint
+
+        if st.session_state.get('excel_fingerprint') == fingerprint:
+            st.download_button(
+                label="📥 엑셀 다운로드 (뉴스 + 키워드)",
+                data=build_excel(*fingerprint),
+                file_name=f"국제뉴스_분석_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True
+            )
+
+    with tab5:
+        st.header("⚡ 크롤링 성능")
+
+        perf_version = metrics_version()
+        runs = load_perf_runs(perf_version)
+        if not runs:
+            st.info("아직 기록된 크롤링 실행이 없습니다. 크롤링을 한 번 실행하면 단계별 기록이 표시됩니다.")
+        else:
+            run_id = st.selectbox("실행", list(reversed(runs)), help="최근 실행이 맨 위")
+            run = runs[run_id]
+            st.dataframe(build_perf_summary(run_id, perf_version), use_container_width=True)
+
+            fig_hist, fig_rate = build_perf_figures(run_id, perf_version)
+            if fig_hist is not None:
+                st.plotly_chart(fig_hist, use_container_width=True)
+                st.plotly_chart(fig_rate, use_container_width=True)
+
+            if run['errors']:
+                with st.expander(f"⚠️ 오류 {len(run['errors'])}건"):
+                    errors_df = pd.DataFrame(run['errors'])
+                    errors_df['time'] = pd.to_datetime(errors_df['time'], unit='s')
+                    st.dataframe(errors_df[['time', 'stage', 'message']], use_container_width=True)
 
 else:
     # 초기 화면
@@ -402,13 +605,30 @@ else:
         1. **API 키**: .env 파일에서 자동 로드
         2. **날짜 설정**: 크롤링할 날짜 수 선택
         3. **페이지 설정**: 날짜당 페이지 수 선택
-        4. **크롤링 시작**: 버튼 클릭
-        5. **대시보드**: 4개 탭에서 분석 결과 확인
+        4. **크롤링 시작**: 버튼 클릭 (백그라운드에서 실행, 진행 상황은 사이드바 아래에 표시)
+           - 터미널에서 `python kbs_cli.py crawl --days 1 --pages 3` 또는
+             `python kbs_cli.py schedule --every 60` (주기 실행)으로도 수집 가능
+        5. **대시보드**: 5개 탭에서 분석 결과 확인
 
         ### 📊 대시보드 기능
 
         - **📊 대시보드**: 통계, 트렌드, 워드클라우드
-        - **🔍 키워드 분석**: 키워드 검색 및 순위
+        - **🔍 키워드 분석**: 키워드 검색, 떠오르는 키워드, 키워드별 추이 및 순위
         - **💡 AI 인사이트**: GPT 기반 트렌드 분석
         - **📥 데이터**: 엑셀 다운로드
+        - **⚡ 성능**: 크롤링 단계별 소요 시간, 처리량, 오류
         """)
+
+# 캐시 현황 (크롤링/인사이트 생성 후 값이 반영되도록 맨 마지막에 표시)
+with st.sidebar:
+    st.markdown("---")
+    st.subheader("🗄️ 요약 캐시")
+    # 요약은 크롤러 프로세스에서 하므로 캐시 파일에 쌓이는 모든 프로세스 누적 값을 보여줌
+    cache_stats = cache.stats()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric("히트", cache_stats["total_hits"])
+    with col2:
+        st.metric("미스", cache_stats["total_misses"])
+    st.caption(f"저장된 항목 {cache_stats['entries']}개 ({cache_stats['bytes'] / 1024 / 1024:.1f}MB) · "
+               f"적중률 {cache_stats['total_hit_rate']:.0%} (크롤링 포함 누적)")
@@ -1,35 +1,20 @@
-
 # 여러 페이지 크롤링
     # 주소: page=n 이라고 들어오는 주소마다 크롤링
+    # 페이지를 하나씩 requests.get으로 받으면 매번 새로 연결하고, 안 바뀐 페이지도 전부 다시 받음
+    # -> kbs_scrape: 연결을 재사용하면서 여러 페이지를 동시에 받고, 마지막 페이지는 알아서 찾음
+    #    (안 바뀐 페이지는 서버가 304만 보내므로 다시 받지 않음)
 
 # 여러 개 상품 데이터를 들고오기(파싱)
 
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd # 파일 형태로 바꾸기 위해
-import openpyxl # 엑셀 파일로 in/out 가능하게
-
-data=[] # 파싱한 데이터를 넣을 빈 list
-for i in range(1,5):
-    response=requests.get(f"https://startcoding.pythonanywhere.com/basic?page={i}&keyword=") # 페이지 돌기
-    html=response.text
-    soup=BeautifulSoup(html,"html.parser")
-    items=soup.select(".product") # 부모를 찾기
-    for item in items: # 자식 찾아서 돌리기
-        # 카테고리
-        category=item.select_one(".product-category").text
-        # 상품명
-        name=item.select_one(".product-name").text
-        # 상세페이지(class가 없음, a태그)
-        link=item.select_one(".product-name > a").attrs["href"]
-        # 가격
-        price=item.select_one(".product-price").text.split("원")[0].replace(",","").replace("원","")
-        print(category,name,link,price)
-        data.append([category,name,link,price])
-    print(f"<페이지 {i}>")
+from kbs_parse import parse_products # 필요한 부분만 파싱 (html.parser/lxml/selectolax)
+from kbs_scrape import scrape_to_file, PRODUCTS_URL, PRODUCT_COLUMNS # 페이지 돌기 + 파일로 바로 쓰기
 
-print(data)
+def show(page, rows): # 페이지를 받을 때마다 불림 (페이지 순서대로)
+    for row in rows:
+        print(*row) # 가격은 이미 int (PRODUCT_COLUMNS의 타입대로 바뀜)
+    print(f"<페이지 {page}>")
 
-# 엑셀로 만들기
-df=pd.DataFrame(data,columns=["카테고리","상품명","상세페이지 링크","가격"]) # 해당 컬럼 명으로 구조화시키겠다.
-df.to_excel("data.xlsx",index=False) # 엑셀 파일로 빼기
\ No newline at end of file
+# .product 묶음에서 카테고리/상품명/링크/가격 뽑기 (b4_3과 같은 선택자)
+# 엑셀로 만들기: 행을 받는 대로 "카테고리","상품명","상세페이지 링크","가격" 컬럼으로 씀 (openpyxl 필요)
+stats=scrape_to_file(PRODUCTS_URL, "data.xlsx", parse_products, PRODUCT_COLUMNS, on_page=show)
+print(stats) # 페이지 수, 행 수, 안 바뀐 페이지 수, 걸린 시간
@@ -0,0 +1,335 @@
+# 크롤링 전체 속도 측정 (오프라인)
+# KBS와 OpenAI 대신 로컬 HTTP 서버 하나로
+#   - KBS 목록 페이지 (#pageN 페이지 버튼, .previous-button 이전 날짜, 날짜 표시)와 상세 페이지
+#   - 가짜 chat-completions (지연 시간 / 오류 비율 조정 가능)
+# 를 흉내 내고, 실제 크롤러(NewsCrawler.stream, crawl_news와 같은 경로)를 돌려서
+# 초당 기사 수, 단계별 p50/p95 지연, 최대 메모리를 출력함
+#
+# 사용법: python bench_crawl.py --days 2 --pages 3 --browsers 2 --llm-latency 300 --llm-error-rate 0.05
+#   --pages-dir 에 저장해 둔 KBS 상세 페이지(.html)가 있으면 그 본문을 기사 내용으로 사용
+#   --no-date-param 을 주면 날짜 주소를 무시해서 '이전 날짜' 버튼으로 찾아가는 경로를 잼
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+try:
+    import resource  # 윈도우에는 없음
+except ImportError:
+    resource = None
+
+LIST_PATH = "/news/pc/category/category.do"
+VIEW_PATH = "/news/pc/view/view.do"
+LLM_PATH = "/v1/chat/completions"
+
+WORDS = ["정부", "대통령", "회담", "경제", "무역", "협상", "발표", "미국", "중국", "일본", "유럽",
+         "전쟁", "휴전", "선거", "시장", "금리", "기후", "에너지", "외교", "안보", "국제사회", "관계자"]
+
+LISTING_TEMPLATE = """<!DOCTYPE html>
+<html lang="ko"><head><meta charset="UTF-8"><title>KBS 국제</title></head>
+<body>
+<div class="datepicker-label"><span class="date">{label}</span></div>
+<button type="button" class="previous-button">이전 날짜</button>
+<div class="box-contents has-wrap" id="list"></div>
+<div class="paging">{paging}</div>
+<script>
+var PAGES = {pages};
+function render(n) {{
+  document.getElementById("list").innerHTML = PAGES[n - 1].map(function (item) {{
+    return '<a class="box-content" href="' + item.href + '"><p class="title">' + item.title +
+           '</p><div class="field-writer"><span class="date">' + item.date + '</span></div></a>';
+  }}).join("");
+}}
+render(1);
+document.querySelectorAll(".paging a").forEach(function (a) {{
+  a.addEventListener("click", function () {{
+    setTimeout(function () {{ render(Number(a.textContent)); }}, {render_delay});
+  }});
+}});
+document.querySelector(".previous-button").addEventListener("click", function () {{
+  location.href = "{previous_url}";
+}});
+</script>
+</body></html>"""
+
+DETAIL_TEMPLATE = """<!DOCTYPE html>
+<html lang="ko"><head><meta charset="UTF-8"><title>{title}</title></head>
+<body><div class="view"><h4>{title}</h4>
+<div id="cont_newstext">{content}</div></div></body></html>"""
+
+
+class StageTimes:
+    """단계 이름별 걸린 시간(초) 목록"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def record(self, name, seconds):
+        with self.lock:
+            self.values.setdefault(name, []).append(seconds)
+
+
+class FixtureSite:
+    """가짜 KBS 목록/상세 페이지 + 가짜 chat-completions 서버"""
+
+    def __init__(self, articles_per_page=10, site_pages=5, page_latency=0.0, render_delay=50,
+                 llm_latency=0.3, llm_error_rate=0.0, date_param=True, bodies=None, seed=0):
+        self.articles_per_page = articles_per_page
+        self.site_pages = site_pages
+        self.page_latency = page_latency
+        self.render_delay = render_delay
+        self.llm_latency = llm_latency
+        self.llm_error_rate = llm_error_rate
+        self.date_param = date_param
+        self.bodies = bodies or []
+        self.seed = seed
+        self.stages = StageTimes()
+        self.llm_errors = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def root(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    @property
+    def base_url(self):
+        return f"{self.root}{LIST_PATH}?ctcd=0006"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # ---- 가짜 기사 ----
+
+    def _article(self, day, page, number):
+        """날짜/페이지/순번으로 항상 같은 기사를 만듦"""
+        rng = random.Random(f"{self.seed}-{day:%Y%m%d}-{page}-{number}")
+        title = " ".join(rng.choice(WORDS) for _ in range(5))
+        if self.bodies:
+            body = self.bodies[rng.randrange(len(self.bodies))]
+        else:
+            sentences = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 14))) + "."
+                         for _ in range(rng.randint(8, 40))]
+            body = "\n".join(sentences) + "\n촬영기자:김철수\n영상편집:이영희\n홍길동 기자 (hong@kbs.co.kr)"
+        minute = (self.site_pages * self.articles_per_page) - ((page - 1) * self.articles_per_page + number)
+        return {
+            "ncd": f"{day:%Y%m%d}{page:02d}{number:02d}",
+            "title": title,
+            "date": f"{day:%Y.%m.%d} {minute // 60 % 24:02d}:{minute % 60:02d}",
+            "content": body,
+        }
+
+    def listing_html(self, day):
+        pages = [[{"href": f"{VIEW_PATH}?ncd={article['ncd']}&ref=A", "title": article["title"],
+                   "date": article["date"]}
+                  for article in (self._article(day, page, number) for number in range(self.articles_per_page))]
+                 for page in range(1, self.site_pages + 1)]
+        paging = "".join(f'<a id="page{page}" href="javascript:void(0)">{page}</a>'
+                         for page in range(1, self.site_pages + 1))
+        previous = day - timedelta(days=1)
+        return LISTING_TEMPLATE.format(
+            label=f"{day:%Y.%m.%d}", paging=paging, pages=json.dumps(pages, ensure_ascii=False),
+            render_delay=self.render_delay, previous_url=f"{LIST_PATH}?ctcd=0006&_day={previous:%Y%m%d}",
+        )
+
+    def detail_html(self, ncd):
+        day = datetime.strptime(ncd[:8], "%Y%m%d")
+        article = self._article(day, int(ncd[8:10]), int(ncd[10:12]))
+        content = article["content"].replace("\n", "<br>\n")
+        return DETAIL_TEMPLATE.format(title=article["title"], content=content)
+
+    # ---- 가짜 chat-completions ----
+
+    def completion(self, body):
+        messages = body.get("messages", [])
+        prompt = "\n".join(message.get("content", "") for message in messages)
+        if body.get("response_format", {}).get("type") == "json_object":
+            numbers = re.findall(r"^\[(\d+)\]", prompt, re.MULTILINE)
+            text = json.dumps({"summaries": {number: f"{number}번 기사 요약 1\n요약 2\n요약 3"
+                                             for number in numbers}}, ensure_ascii=False)
+        else:
+            text = "요약 1\n요약 2\n요약 3"
+        completion_tokens = len(text) // 2
+        return {
+            "id": f"chatcmpl-bench-{random.getrandbits(32):x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "bench"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 2, "completion_tokens": completion_tokens,
+                      "total_tokens": len(prompt) // 2 + completion_tokens},
+        }
+
+    # ---- HTTP ----
+
+    def _handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                start = time.perf_counter()
+                parts = urlsplit(self.path)
+                query = {name: values[0] for name, values in parse_qs(parts.query).items()}
+                time.sleep(site.page_latency)
+                if parts.path == LIST_PATH:
+                    day = datetime.now()
+                    wanted = query.get("_day") or (query.get("datetime") if site.date_param else None)
+                    if wanted:
+                        day = datetime.strptime(wanted, "%Y%m%d")
+                    self._send(200, site.listing_html(day))
+                    site.stages.record("목록 페이지 (서버)", time.perf_counter() - start)
+                elif parts.path == VIEW_PATH and "ncd" in query:
+                    self._send(200, site.detail_html(query["ncd"]))
+                    site.stages.record("상세 페이지 (서버)", time.perf_counter() - start)
+                else:
+                    self._send(404, "not found", "text/plain")
+
+            def do_POST(self):
+                start = time.perf_counter()
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if urlsplit(self.path).path != LLM_PATH:
+                    self._send(404, "not found", "text/plain")
+                    return
+                time.sleep(random.uniform(0.5, 1.5) * site.llm_latency)
+                if random.random() < site.llm_error_rate:
+                    with site.stages.lock:
+                        site.llm_errors += 1
+                    status = random.choice([429, 500])
+                    error = {"error": {"message": "bench error", "type": "rate_limit_error" if status == 429
+                                       else "server_error", "code": None}}
+                    self._send(status, json.dumps(error), "application/json", {"retry-after": "0.2"})
+                else:
+                    self._send(200, json.dumps(site.completion(body), ensure_ascii=False), "application/json")
+                site.stages.record("요약 요청 (서버)", time.perf_counter() - start)
+
+        return Handler
+
+
+def load_bodies(folder):
+    """저장해 둔 상세 페이지에서 본문만 뽑아옴"""
+    from kbs_parse import parse_content
+
+    bodies = []
+    for path in sorted(glob.glob(os.path.join(folder, "*.html"))):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            content = parse_content(f.read())
+        if content:
+            bodies.append(content)
+    return bodies
+
+
+def peak_rss_mb():
+    """(이 프로세스, 끝난 자식 프로세스 중 최대) 메모리 MB, 잴 수 없으면 None"""
+    if resource is None:
+        return None, None
+    unit = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024  # macOS는 바이트, 리눅스는 KB
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 KBS/OpenAI 서버로 크롤링 전체 속도 측정")
+    parser.add_argument("--days", type=int, default=2, help="크롤링할 날짜 수")
+    parser.add_argument("--pages", type=int, default=3, help="날짜당 크롤링할 페이지 수")
+    parser.add_argument("--site-pages", type=int, default=5, help="가짜 사이트의 날짜당 페이지 수")
+    parser.add_argument("--articles-per-page", type=int, default=10)
+    parser.add_argument("--browsers", type=int, default=2)
+    parser.add_argument("--workers", type=int, default=8, help="상세 페이지 동시 요청 수")
+    parser.add_argument("--summary-workers", type=int, default=4)
+    parser.add_argument("--page-latency", type=float, default=50, help="페이지 응답 지연(ms)")
+    parser.add_argument("--render-delay", type=int, default=50, help="페이지 버튼을 누른 뒤 목록을 다시 그리는 지연(ms)")
+    parser.add_argument("--llm-latency", type=float, default=300, help="요약 응답 평균 지연(ms)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="429/500 오류 비율 (0~1)")
+    parser.add_argument("--rpm", type=int, default=100000, help="요약 분당 요청 한도")
+    parser.add_argument("--tpm", type=int, default=100000000, help="요약 분당 토큰 한도")
+    parser.add_argument("--no-date-param", action="store_true", help="날짜 주소를 무시해서 '이전 날짜' 버튼으로 이동")
+    parser.add_argument("--pages-dir", help="상세 페이지 본문으로 쓸 저장된 KBS 페이지(.html) 폴더")
+    parser.add_argument("--data-dir", help="저장소/데이터셋 폴더 (기본: 매번 새 임시 폴더)")
+    args = parser.parse_args()
+
+    site = FixtureSite(
+        articles_per_page=args.articles_per_page, site_pages=args.site_pages,
+        page_latency=args.page_latency / 1000, render_delay=args.render_delay,
+        llm_latency=args.llm_latency / 1000, llm_error_rate=args.llm_error_rate,
+        date_param=not args.no_date_param, bodies=load_bodies(args.pages_dir) if args.pages_dir else None,
+    ).start()
+
+    # kbs_* 모듈은 import할 때 .env/경로 설정을 읽으므로 가짜 서버 주소를 정한 뒤에 import
+    os.environ["KBS_DATA_DIR"] = args.data_dir or tempfile.mkdtemp(prefix="kbs_bench_")
+    os.environ["KBS_BASE_URL"] = site.base_url
+    os.environ["OPENAI_RPM"] = str(args.rpm)
+    os.environ["OPENAI_TPM"] = str(args.tpm)
+    from openai import OpenAI
+    from kbs_crawl import NewsCrawler
+    from kbs_metrics import metrics, percentile
+    from kbs_store import ArticleStore
+    from kbs_wait import timings
+
+    client = OpenAI(api_key="bench", base_url=f"{site.root}/v1")
+    crawler = NewsCrawler(client, ArticleStore(), base_url=site.base_url, browsers=args.browsers,
+                          max_workers=args.workers, summary_workers=args.summary_workers)
+
+    print(f"가짜 사이트 {site.root} | {args.days}일 × {args.pages}페이지, 브라우저 {args.browsers}개, "
+          f"상세 {args.workers}개, 요약 {args.summary_workers}개 동시")
+    print(f"데이터 폴더: {os.environ['KBS_DATA_DIR']}\n")
+
+    start = time.perf_counter()
+    arrivals = []
+    try:
+        for _ in crawler.stream(args.days, args.pages):
+            arrivals.append(time.perf_counter() - start)
+    finally:
+        site.stop()
+    elapsed = time.perf_counter() - start
+
+    stages = dict(site.stages.values)
+    for stage, _, seconds, _ in metrics.spans:
+        stages.setdefault(stage, []).append(seconds)
+    for name, values in timings.durations.items():
+        stages[f"{name} (브라우저)"] = values
+    stages["기사 완료 시각"] = arrivals
+
+    print(f"✅ 기사 {len(arrivals)}개, {elapsed:.2f}초, 초당 {len(arrivals) / elapsed if elapsed else 0:.2f}개")
+    print(f"   요약 요청 {crawler.summarizer.usage['requests']}회 (가짜 서버 오류 {site.llm_errors}회)\n")
+    print(f"{'단계':<22}{'횟수':>8}{'p50(ms)':>12}{'p95(ms)':>12}{'최대(ms)':>12}")
+    for name, values in stages.items():
+        print(f"{name:<22}{len(values):>8}{percentile(values, 0.5) * 1000:>12.1f}"
+              f"{percentile(values, 0.95) * 1000:>12.1f}{max(values, default=0) * 1000:>12.1f}")
+
+    own, children = peak_rss_mb()
+    if own is not None:
+        print(f"\n최대 메모리: 파이썬 {own:.0f}MB, 브라우저 등 자식 프로세스 중 최대 {children:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# HTML 파서 속도 비교
+# 저장해 둔 KBS 목록/상세 페이지(.html)로 백엔드별 추출 시간을 잼
+#
+# 사용법: python bench_parse.py [페이지 폴더] [반복 횟수]
+#   폴더 기본값: data/pages (브라우저에서 "다른 이름으로 저장"한 파일을 넣어두면 됨)
+#   파일 안에 cont_newstext가 있으면 상세 페이지, 없으면 목록 페이지로 봄
+
+import glob
+import os
+import sys
+import time
+from kbs_config import DATA_DIR
+from kbs_parse import available_backends, parse_listing, parse_content
+
+
+def load_pages(folder):
+    listing, detail = [], []
+    for path in sorted(glob.glob(os.path.join(folder, "*.html"))):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        (detail if "cont_newstext" in html else listing).append(html)
+    return listing, detail
+
+
+def bench(func, pages, repeat):
+    """페이지 전체를 repeat번 파싱하는 데 걸린 시간 중 가장 짧은 것 (초)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for html in pages:
+            func(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(DATA_DIR, "pages")
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    listing, detail = load_pages(folder)
+    if not listing and not detail:
+        print(f"⚠️  {folder} 에 .html 파일이 없습니다")
+        return
+
+    print(f"목록 페이지 {len(listing)}개, 상세 페이지 {len(detail)}개, {repeat}회 반복 중 최소값\n")
+    print(f"{'백엔드':<12}{'목록(ms/페이지)':>18}{'상세(ms/페이지)':>18}{'추출 기사 수':>14}")
+
+    for backend in available_backends():
+        listing_time = bench(lambda html: parse_listing(html, "", backend), listing, repeat)
+        detail_time = bench(lambda html: parse_content(html, backend), detail, repeat)
+        found = sum(len(parse_listing(html, "", backend)) for html in listing)
+        per_listing = listing_time / len(listing) * 1000 if listing else 0
+        per_detail = detail_time / len(detail) * 1000 if detail else 0
+        print(f"{backend:<12}{per_listing:>18.2f}{per_detail:>18.2f}{found:>14}")
+
+
+if __name__ == "__main__":
+    main()
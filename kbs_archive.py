@@ -0,0 +1,194 @@
+# 수집한 원본 페이지 보관소 + 오프라인 재추출
+# 크롤링 중 받은 목록/상세 페이지 HTML을 내용 해시(sha256)로 압축해서 저장하고, 메타데이터(URL, 종류, 소스,
+# 목록 날짜, 페이지 번호, 받은 시각)는 SQLite에 남김. 같은 HTML은 한 번만 저장됨
+# 다시 파싱할 때는 페이지를 받은 소스(kbs_sources)의 선택자를 씀 (설정에서 없어진 소스의 페이지는 건너뜀)
+#   data/archive/objects/ab/cdef...zst  : 압축한 HTML (zstandard가 있으면 zstd, 없으면 zlib; pip install zstandard)
+#   data/archive/pages.sqlite3          : 페이지 목록
+#
+# KBS 마크업이 바뀌거나 새 필드가 필요하면 네트워크 없이 보관소만 다시 파싱해서 저장소를 고침
+#   python kbs_cli.py reextract --processes 4
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+from kbs_config import data_path
+from kbs_parse import parse_content, parse_listing
+from kbs_sources import DEFAULT_SOURCE, SOURCES
+from kbs_store import canonical_url
+
+ARCHIVE_DIR = os.path.dirname(data_path("archive", "pages.sqlite3"))
+ZSTD_LEVEL = 10  # 압축 수준 (HTML은 수준을 올려도 크롤링 속도에 거의 영향 없음)
+LISTING = "listing"
+DETAIL = "detail"
+CHUNK = 200  # 재추출할 때 프로세스 하나에 넘기는 페이지 수
+
+# 파일 확장자 -> (압축, 풀기)
+CODECS = {"zlib": (lambda data: zlib.compress(data, 6), zlib.decompress)}
+if HAS_ZSTD:
+    CODECS["zst"] = (lambda data: zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data),
+                     lambda data: zstandard.ZstdDecompressor().decompress(data))
+CODEC = "zst" if HAS_ZSTD else "zlib"
+
+
+def object_path(archive_dir, digest, codec):
+    return os.path.join(archive_dir, "objects", digest[:2], f"{digest[2:]}.{codec}")
+
+
+def read_object(archive_dir, digest, codec):
+    with open(object_path(archive_dir, digest, codec), "rb") as f:
+        return CODECS[codec][1](f.read()).decode("utf-8")
+
+
+class PageArchive:
+    """원본 HTML 보관소 (여러 스레드에서 같이 써도 됨)"""
+
+    def __init__(self, archive_dir=ARCHIVE_DIR):
+        self.archive_dir = archive_dir
+        os.makedirs(os.path.join(archive_dir, "objects"), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(archive_dir, "pages.sqlite3"), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                url TEXT NOT NULL,
+                source TEXT NOT NULL,
+                list_date TEXT,
+                page INTEGER,
+                fetched_at REAL NOT NULL,
+                digest TEXT NOT NULL,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_pages_kind_url ON pages(kind, url);
+        """)
+        # 소스별로 나누기 전 파일의 페이지는 기본 소스에서 받은 것
+        if "source" not in {row[1] for row in self.conn.execute("PRAGMA table_info(pages)")}:
+            self.conn.execute("ALTER TABLE pages ADD COLUMN source TEXT NOT NULL DEFAULT ''")
+            self.conn.execute("UPDATE pages SET source = ?", (DEFAULT_SOURCE,))
+        self.conn.commit()
+
+    def put(self, kind, url, html, list_date=None, page=None, source=DEFAULT_SOURCE):
+        """HTML 하나 저장 (같은 내용이 이미 있으면 메타데이터만 추가), 내용 해시 반환"""
+        data = (html or "").encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = object_path(self.archive_dir, digest, CODEC)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(CODECS[CODEC][0](data))
+            os.replace(tmp, path)
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO pages (kind, url, source, list_date, page, fetched_at, digest, codec, size)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (kind, url, source, list_date, page, time.time(), digest, CODEC, len(data)))
+            self.conn.commit()
+        return digest
+
+    def get(self, digest, codec=CODEC):
+        return read_object(self.archive_dir, digest, codec)
+
+    def latest(self, kind):
+        """종류별로 URL(목록은 소스 + 날짜 + 페이지)마다 가장 나중에 받은 페이지
+        [(url, list_date, page, digest, codec, source), ...]
+        """
+        group = "url" if kind == DETAIL else "source, list_date, page"
+        with self.lock:
+            return self.conn.execute(f"""
+                SELECT url, list_date, page, digest, codec, source FROM pages
+                WHERE id IN (SELECT MAX(id) FROM pages WHERE kind = ? GROUP BY {group})
+                ORDER BY id
+            """, (kind,)).fetchall()
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+
+# ---- 재추출 (프로세스마다 실행) ----
+
+def _parse_listings(archive_dir, pages):
+    """목록 페이지 묶음 -> [{'url', 'list_date', 'title', 'date'}, ...]"""
+    items = []
+    for url, list_date, _, digest, codec, source in pages:
+        if source not in SOURCES:
+            continue
+        for item in parse_listing(read_object(archive_dir, digest, codec), list_date, base_url=url,
+                                  selectors=SOURCES[source]["selectors"]):
+            items.append(dict(item, list_date=list_date))
+    return items
+
+
+def _parse_details(archive_dir, pages):
+    """상세 페이지 묶음 -> [(url, 본문 또는 None), ...]"""
+    return [(url, parse_content(read_object(archive_dir, digest, codec),
+                                selector=SOURCES[source]["selectors"]["content"]))
+            for url, _, _, digest, codec, source in pages if source in SOURCES]
+
+
+def _chunks(rows, size=CHUNK):
+    return [rows[i:i + size] for i in range(0, len(rows), size)]
+
+
+def reextract(store, archive=None, processes=None, on_progress=None):
+    """보관소의 목록/상세 페이지를 여러 프로세스로 다시 파싱해서 저장소의 제목/날짜/본문을 고침
+
+    네트워크는 쓰지 않음. 본문이 바뀐 기사는 요약을 지워서 다음 크롤링/kbs_batch에서 다시 요약하게 하고
+    (제목/날짜만 바뀌었으면 요약은 그대로), 바뀐 기사만 [{'url', 'list_date', 'date', 'title', 'content',
+    'summary'}, ...]로 반환 (데이터셋/검색 색인 갱신용)
+    """
+    archive = archive or PageArchive()
+    listings = archive.latest(LISTING)
+    details = archive.latest(DETAIL)
+    report = on_progress or (lambda message: None)
+
+    meta = {}
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        report(f"📄 목록 페이지 {len(listings)}개 파싱 중")
+        # 오래된 목록부터 덮어써서 같은 기사는 가장 나중에 받은 목록의 제목/날짜를 씀
+        for items in executor.map(_parse_listings, [archive.archive_dir] * len(_chunks(listings)),
+                                  _chunks(listings)):
+            for item in items:
+                meta[canonical_url(item["url"])] = item
+        report(f"📰 상세 페이지 {len(details)}개 파싱 중")
+        contents = {}
+        for parsed in executor.map(_parse_details, [archive.archive_dir] * len(_chunks(details)),
+                                   _chunks(details)):
+            for url, content in parsed:
+                if content is not None:
+                    contents[canonical_url(url)] = content
+
+    existing = {record["url"]: record for record in store.records()}
+    changed = []
+    for url, content in contents.items():
+        item = meta.get(url)
+        old = existing.get(url)
+        if item is None and old is None:
+            continue  # 어느 목록 날짜의 기사인지 모름
+        list_date = item["list_date"] if item else old["list_date"]
+        date = item["date"] if item else old["date"]
+        title = item["title"] if item else old["title"]
+        if old is not None and (old["date"], old["title"], old["content"]) == (date, title, content):
+            continue
+        store.save(url, list_date, date, title, content)
+        if old is not None and old["content"] != content:
+            store.clear_summary(url)
+        changed.append({"url": url, "list_date": list_date, "date": date, "title": title, "content": content,
+                        "summary": store.summary(url) or "요약 없음",
+                        "duplicate_of": old["duplicate_of"] if old else None})
+    report(f"✅ 재추출 완료: 기사 {len(contents)}개 중 {len(changed)}개 변경")
+    return changed
@@ -0,0 +1,140 @@
+# 밀린 요약 일괄 처리 (OpenAI Batch API)
+# 요약이 없는 기사를 토큰 예산만큼 묶어서 배치 작업으로 올리고, 나중에 결과를 받아서 저장
+# 실시간 요청보다 싸고 분당 한도에 걸리지 않으므로 많은 양을 한꺼번에 채울 때 사용
+#
+#   python kbs_batch.py submit            요약 없는 기사 전체를 배치 작업으로 제출
+#   python kbs_batch.py status <job_id>   작업 상태 확인
+#   python kbs_batch.py collect <job_id>  끝난 작업의 요약을 저장소/데이터셋에 반영
+
+import argparse
+import io
+import json
+import os
+import time
+from openai import OpenAI
+from kbs_cache import ResponseCache
+from kbs_config import data_path
+from kbs_dataset import write_records
+from kbs_store import ArticleStore
+from kbs_summarize import batch_request, pack_batches, parse_batch_response, batch_summary_key, cached_for_batch
+from kbs_text import clean_content
+
+ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+
+
+def job_path(job_id):
+    return data_path("batch_jobs", f"{job_id}.json")
+
+
+def submit_missing(client, store, list_dates=None, cache=None):
+    """요약 없는 기사를 묶어서 배치 작업 하나로 제출하고 작업 id 반환 (제출할 것이 없으면 None)
+
+    캐시에 요약이 있는 기사는 바로 저장하고 제출하지 않음
+    """
+    list_dates = list_dates or store.list_dates()
+    articles = []
+    for url, list_date, date, title, content in store.missing_summaries(list_dates):
+        cached = cached_for_batch(cache, content)
+        if cached is not None:
+            store.set_summary(url, cached)
+        else:
+            articles.append((url, list_date, clean_content(content) or content))
+    if not articles:
+        return None
+
+    lines, groups = [], {}
+    for number, batch in enumerate(pack_batches([content for _, _, content in articles])):
+        custom_id = f"group-{number}"
+        groups[custom_id] = [articles[index][0] for index in batch]
+        body = batch_request([articles[index][2] for index in batch])
+        lines.append(json.dumps({"custom_id": custom_id, "method": "POST", "url": ENDPOINT, "body": body},
+                                ensure_ascii=False))
+
+    upload = client.files.create(file=("summaries.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+                                 purpose="batch")
+    job = client.batches.create(input_file_id=upload.id, endpoint=ENDPOINT, completion_window=COMPLETION_WINDOW)
+    with open(job_path(job.id), "w", encoding="utf-8") as f:
+        json.dump({"job_id": job.id, "list_dates": sorted({list_date for _, list_date, _ in articles}),
+                   "groups": groups, "submitted_at": time.time()}, f, ensure_ascii=False)
+    return job.id
+
+
+def collect(client, store, job_id, cache=None):
+    """끝난 배치 작업의 요약을 저장소와 데이터셋에 반영하고 (작업 상태, 저장한 기사 수) 반환
+
+    응답이 없거나 빠진 기사는 요약 없음으로 남아서 다음 크롤링/배치 때 다시 요약됨
+    """
+    job = client.batches.retrieve(job_id)
+    if job.status != "completed" or not job.output_file_id:
+        return job.status, 0
+
+    with open(job_path(job_id), encoding="utf-8") as f:
+        meta = json.load(f)
+    # 아직 요약이 없는 기사만 반영 (그 사이 크롤러가 요약한 기사는 건너뜀)
+    pending = {row[0]: row for row in store.missing_summaries(meta["list_dates"])}
+
+    records = []
+    for line in client.files.content(job.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        urls = meta["groups"].get(result["custom_id"], [])
+        response = result.get("response") or {}
+        if response.get("status_code") != 200 or not urls:
+            continue
+        try:
+            summaries = parse_batch_response(response["body"]["choices"][0]["message"]["content"], len(urls))
+        except (KeyError, IndexError, ValueError):
+            continue
+        # 묶음 하나의 토큰 사용량은 기사 수로 나눠서 기록
+        counts = response["body"].get("usage") or {}
+        usage = {"prompt_tokens": round(counts.get("prompt_tokens", 0) / len(urls)),
+                 "completion_tokens": round(counts.get("completion_tokens", 0) / len(urls)),
+                 "requests": 1}
+        for number, url in enumerate(urls, 1):
+            if number not in summaries or url not in pending:
+                continue
+            _, list_date, date, title, content = pending[url]
+            store.set_summary(url, summaries[number], usage)
+            if cache is not None:
+                cache.set(batch_summary_key(content), summaries[number])
+            records.append({"url": url, "list_date": list_date, "date": date, "title": title,
+                            "content": content, "summary": summaries[number]})
+
+    # 데이터셋은 같은 url의 가장 나중 행을 쓰므로 새 행만 추가하면 됨
+    if records:
+        write_records(records)
+    os.replace(job_path(job_id), job_path(f"{job_id}.collected"))
+    return job.status, len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="밀린 뉴스 요약을 OpenAI Batch API로 처리")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("submit", help="요약 없는 기사를 배치 작업으로 제출")
+    commands.add_parser("status", help="작업 상태 확인").add_argument("job_id")
+    commands.add_parser("collect", help="끝난 작업 결과 저장").add_argument("job_id")
+    args = parser.parse_args()
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("❌ OPENAI_API_KEY가 .env 파일에 설정되지 않았습니다!")
+    client = OpenAI(api_key=api_key)
+
+    if args.command == "submit":
+        job_id = submit_missing(client, ArticleStore(), cache=ResponseCache())
+        print(f"📤 배치 작업 제출: {job_id}" if job_id else "✅ 요약이 없는 기사가 없습니다.")
+    elif args.command == "status":
+        job = client.batches.retrieve(args.job_id)
+        print(f"⏳ {job.id}: {job.status} ({job.request_counts})")
+    else:
+        status, saved = collect(client, ArticleStore(), args.job_id, cache=ResponseCache())
+        if status == "completed":
+            print(f"✅ 요약 {saved}개 저장")
+        else:
+            print(f"⏳ 아직 끝나지 않았습니다: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+# 디스크 캐시 (SQLite)
+#   ResponseCache : OpenAI 응답, 키 = sha256(모델 + 프롬프트 + 파라미터 + 기사 본문), 오래되거나 개수/용량이 넘치면 정리
+#   HttpCache     : 웹 페이지, URL별 ETag/Last-Modified + 압축한 본문 (조건부 GET으로 바뀐 페이지만 다시 받음)
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from kbs_config import data_path
+
+CACHE_PATH = data_path("summary_cache.sqlite3")
+HTTP_CACHE_PATH = data_path("http_cache.sqlite3")
+MAX_ENTRIES = 50000      # 이보다 많으면 오래 안 쓴 항목부터 삭제
+MAX_BYTES = 64 * 1024 * 1024  # 저장한 응답(UTF-8) 크기 합이 이보다 크면 오래 안 쓴 항목부터 삭제
+MAX_AGE_DAYS = 90        # 이보다 오래 안 쓴 항목은 삭제
+EVICT_EVERY = 200        # 저장 N번마다 한 번씩 정리
+
+
+def make_key(text, **params):
+    """본문 + 모델/프롬프트/파라미터로 캐시 키 생성"""
+    payload = json.dumps(params, ensure_ascii=False, sort_keys=True) + "\n" + text
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """여러 스레드에서 같이 써도 되는 SQLite 캐시 + 히트/미스 카운터
+
+    hits/misses는 이 프로세스 값, counters 테이블에는 같은 파일을 쓰는 모든 프로세스(크롤러 포함)의 누적 값
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, max_age_days=MAX_AGE_DAYS, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        # 예전 파일에는 크기 컬럼이 없으므로 추가하고 채움
+        if "size" not in {row[1] for row in self.conn.execute("PRAGMA table_info(cache)")}:
+            self.conn.execute("ALTER TABLE cache ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute("UPDATE cache SET size = length(CAST(value AS BLOB))")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self.conn.execute("INSERT OR IGNORE INTO counters (name, value) VALUES ('hits', 0), ('misses', 0)")
+        self.conn.commit()
+        self.evict()
+
+    def get(self, key):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                self.conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'misses'")
+                self.conn.commit()
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.conn.execute("UPDATE counters SET value = value + 1 WHERE name = 'hits'")
+            self.conn.commit()
+            return row[0]
+
+    def set(self, key, value):
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now, len(value.encode("utf-8")))
+            )
+            self.conn.commit()
+            self.writes += 1
+            need_evict = self.writes % EVICT_EVERY == 0
+        if need_evict:
+            self.evict()
+
+    def evict(self):
+        """max_age_days보다 오래된 항목 삭제 후, max_entries/max_bytes를 넘는 만큼 LRU 순으로 삭제"""
+        with self.lock:
+            self.conn.execute("DELETE FROM cache WHERE accessed_at < ?", (time.time() - self.max_age,))
+            self.conn.execute("""
+                DELETE FROM cache WHERE key IN (
+                    SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+            # 최근에 쓴 것부터 크기를 누적해서 max_bytes를 넘어가는 항목부터 삭제
+            self.conn.execute("""
+                DELETE FROM cache WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY accessed_at DESC, key) AS total FROM cache
+                    ) WHERE total > ?
+                )
+            """, (self.max_bytes,))
+            self.conn.commit()
+
+    def stats(self):
+        """이 프로세스의 hits/misses/hit_rate + 모든 프로세스 누적 total_hits/total_misses/total_hit_rate"""
+        with self.lock:
+            entries, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+            totals = dict(self.conn.execute("SELECT name, value FROM counters").fetchall())
+        total = self.hits + self.misses
+        all_total = totals["hits"] + totals["misses"]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "total_hits": totals["hits"],
+            "total_misses": totals["misses"],
+            "total_hit_rate": totals["hits"] / all_total if all_total else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+class HttpCache:
+    """조건부 GET용 페이지 캐시 (여러 스레드에서 같이 써도 됨)
+
+    서버가 304(Not Modified)를 주면 저장해 둔 본문을 그대로 씀 (kbs_fetch.conditional_get).
+    ETag와 Last-Modified가 모두 없는 응답은 저장하지 않음
+    """
+
+    def __init__(self, path=HTTP_CACHE_PATH, max_age_days=MAX_AGE_DAYS):
+        self.max_age = max_age_days * 24 * 3600
+        self.hits = 0     # 304로 저장된 본문을 쓴 횟수
+        self.misses = 0   # 본문을 새로 받은 횟수
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body BLOB NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - self.max_age,))
+        self.conn.commit()
+
+    def validators(self, url):
+        """저장된 (etag, last_modified), 없으면 None"""
+        with self.lock:
+            row = self.conn.execute("SELECT etag, last_modified FROM pages WHERE url = ?", (url,)).fetchone()
+        return row
+
+    def body(self, url):
+        """304를 받았을 때 저장해 둔 본문 (확인 시각도 갱신)"""
+        with self.lock:
+            row = self.conn.execute("SELECT body FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self.hits += 1
+            self.conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def put(self, url, etag, last_modified, text):
+        with self.lock:
+            self.misses += 1
+            if not etag and not last_modified:
+                return
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, body, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, zlib.compress(text.encode("utf-8"), 6), time.time())
+            )
+            self.conn.commit()
+
+    def stats(self):
+        with self.lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": entries,
+        }
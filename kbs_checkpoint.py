@@ -0,0 +1,163 @@
+# 크롤링 실행 체크포인트 (SQLite)
+# 실행마다 id를 붙이고 어디까지 했는지(소스 × 날짜별 끝난 페이지, 상세 페이지 URL 상태)를 바로바로 기록해서
+# 브라우저가 죽거나 프로세스가 끊겨도 --resume으로 멈춘 자리부터 이어감
+#
+# URL 상태: pending(목록에서 찾음) -> in_flight(상세 페이지 받는 중) -> done(저장소에 저장됨)
+# 요약 여부는 저장소(summary 컬럼)가 기준이라 여기서는 따로 두지 않음
+
+import sqlite3
+import threading
+import time
+from kbs_config import data_path
+from kbs_sources import DEFAULT_SOURCE
+
+CHECKPOINT_PATH = data_path("checkpoints.sqlite3")
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+
+RUNNING = "running"
+FINISHED = "done"
+FAILED = "failed"
+
+
+class CrawlCheckpoint:
+    """실행별 진행 상황 (여러 스레드에서 같이 써도 됨)"""
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # 소스별로 나누기 전 파일은 기본 소스 기록으로 옮김 (run_days는 기본 키가 바뀌므로 새로 만듦)
+        old_columns = {row[1] for row in self.conn.execute("PRAGMA table_info(run_days)")}
+        migrate = bool(old_columns) and "source" not in old_columns
+        if migrate:
+            self.conn.execute("ALTER TABLE run_days RENAME TO old_run_days")
+            self.conn.execute("ALTER TABLE run_urls ADD COLUMN source TEXT NOT NULL DEFAULT ''")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                days INTEGER NOT NULL,
+                pages INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                started_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS run_days (
+                run_id TEXT NOT NULL,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                pages_done INTEGER NOT NULL DEFAULT 0,
+                done INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (run_id, source, target)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS run_urls (
+                run_id TEXT NOT NULL,
+                url TEXT NOT NULL,
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                date TEXT,
+                title TEXT,
+                state TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, url)
+            ) WITHOUT ROWID;
+        """)
+        if migrate:
+            self.conn.execute("INSERT INTO run_days (run_id, source, target, pages_done, done) "
+                              "SELECT run_id, ?, target, pages_done, done FROM old_run_days", (DEFAULT_SOURCE,))
+            self.conn.execute("UPDATE run_urls SET source = ? WHERE source = ''", (DEFAULT_SOURCE,))
+            self.conn.execute("DROP TABLE old_run_days")
+        self.conn.commit()
+
+    def _write(self, sql, params=(), many=False):
+        with self.lock:
+            if many:
+                self.conn.executemany(sql, params)
+            else:
+                self.conn.execute(sql, params)
+            self.conn.commit()
+
+    # ---- 실행 ----
+
+    def start(self, run_id, num_days, pages_per_day, targets, sources=(DEFAULT_SOURCE,)):
+        """새 실행 기록 (targets = 수집할 날짜 라벨 목록, 오늘부터 과거로, sources = 소스 이름 목록)"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("INSERT INTO runs (run_id, days, pages, state, started_at, updated_at) "
+                              "VALUES (?, ?, ?, ?, ?, ?)", (run_id, num_days, pages_per_day, RUNNING, now, now))
+            self.conn.executemany("INSERT OR IGNORE INTO run_days (run_id, source, target) VALUES (?, ?, ?)",
+                                  [(run_id, source, target) for source in sources for target in targets])
+            self.conn.commit()
+
+    def finish(self, run_id, state=FINISHED):
+        self._write("UPDATE runs SET state = ?, updated_at = ? WHERE run_id = ?", (state, time.time(), run_id))
+
+    def run(self, run_id):
+        """{'run_id', 'days', 'pages', 'state', 'started_at', 'targets', 'sources'}, 없으면 None"""
+        with self.lock:
+            row = self.conn.execute("SELECT run_id, days, pages, state, started_at FROM runs WHERE run_id = ?",
+                                    (run_id,)).fetchone()
+            targets = [r[0] for r in self.conn.execute(
+                "SELECT DISTINCT target FROM run_days WHERE run_id = ? ORDER BY target DESC", (run_id,))]
+            sources = [r[0] for r in self.conn.execute(
+                "SELECT DISTINCT source FROM run_days WHERE run_id = ? ORDER BY source", (run_id,))]
+        if row is None:
+            return None
+        return dict(zip(["run_id", "days", "pages", "state", "started_at"], row), targets=targets, sources=sources)
+
+    def latest_unfinished(self):
+        """끝나지 않은(실행 중에 끊겼거나 실패한) 가장 최근 실행 id, 없으면 None"""
+        with self.lock:
+            row = self.conn.execute("SELECT run_id FROM runs WHERE state != ? ORDER BY started_at DESC LIMIT 1",
+                                    (FINISHED,)).fetchone()
+        return row[0] if row else None
+
+    # ---- 소스 × 날짜/페이지 ----
+
+    def day(self, run_id, target, source=DEFAULT_SOURCE):
+        """(끝난 페이지 수, 날짜 끝남 여부)"""
+        with self.lock:
+            row = self.conn.execute("SELECT pages_done, done FROM run_days "
+                                    "WHERE run_id = ? AND source = ? AND target = ?",
+                                    (run_id, source, target)).fetchone()
+        return (row[0], bool(row[1])) if row else (0, False)
+
+    def page_done(self, run_id, target, page, source=DEFAULT_SOURCE):
+        self._write("UPDATE run_days SET pages_done = MAX(pages_done, ?) "
+                    "WHERE run_id = ? AND source = ? AND target = ?", (page, run_id, source, target))
+
+    def day_done(self, run_id, target, source=DEFAULT_SOURCE):
+        self._write("UPDATE run_days SET done = 1 WHERE run_id = ? AND source = ? AND target = ?",
+                    (run_id, source, target))
+
+    def all_done(self, run_id):
+        """실행의 모든 소스 × 날짜가 끝났는지"""
+        with self.lock:
+            row = self.conn.execute("SELECT COUNT(*) FROM run_days WHERE run_id = ? AND done = 0",
+                                    (run_id,)).fetchone()
+        return row[0] == 0
+
+    # ---- 상세 페이지 URL ----
+
+    def add_urls(self, run_id, target, items, source=DEFAULT_SOURCE):
+        """목록에서 찾은 새 기사 [{'url', 'title', 'date'}, ...]를 pending으로 (이미 있으면 그대로)"""
+        now = time.time()
+        self._write("INSERT OR IGNORE INTO run_urls (run_id, url, source, target, date, title, state, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, item["url"], source, target, item["date"], item["title"], PENDING, now)
+                     for item in items],
+                    many=True)
+
+    def mark(self, run_id, urls, state):
+        now = time.time()
+        self._write("UPDATE run_urls SET state = ?, updated_at = ? WHERE run_id = ? AND url = ?",
+                    [(state, now, run_id, url) for url in urls], many=True)
+
+    def unfinished(self, run_id, target, source=DEFAULT_SOURCE):
+        """아직 저장되지 않은(pending/in_flight) 기사 [{'url', 'title', 'date'}, ...]"""
+        with self.lock:
+            rows = self.conn.execute("SELECT url, title, date FROM run_urls "
+                                     "WHERE run_id = ? AND source = ? AND target = ? AND state != ?",
+                                     (run_id, source, target, DONE)).fetchall()
+        return [{"url": url, "title": title, "date": date} for url, title, date in rows]
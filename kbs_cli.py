@@ -0,0 +1,305 @@
+# 크롤링 명령줄 실행 + 주기 실행(스케줄러)
+# 대시보드와 상관없이 돌아가고, 진행 상황은 data/crawl_status.json에 써서 대시보드가 읽기만 함
+# 두 실행이 겹치지 않도록 kbs_crawl.CrawlLock으로 잠금
+#
+#   python kbs_cli.py crawl --days 1 --pages 3 --workers 8
+#   python kbs_cli.py crawl --sources kbs-world,kbs-economy --per-host 4   (여러 소스를 같이, kbs_sources 참고)
+#   python kbs_cli.py schedule --every 60 --days 2 --pages 3   (60분마다 새 기사만 수집, Ctrl+C로 종료)
+#   python kbs_cli.py crawl --resume            (끊긴 마지막 실행을 멈춘 자리부터 이어서, 실행 id를 줄 수도 있음)
+#   python kbs_cli.py reextract --processes 4   (보관해 둔 HTML만 다시 파싱해서 저장소 고치기, 네트워크 없음)
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import pandas as pd
+from openai import OpenAI
+import kbs_archive
+from kbs_cache import ResponseCache
+from kbs_checkpoint import CrawlCheckpoint
+from kbs_config import HOST_CONCURRENCY, data_path
+from kbs_crawl import CrawlLock, CrawlRunning, NewsCrawler
+from kbs_dataset import compact, partition_day, write_records
+from kbs_metrics import metrics
+from kbs_search import SearchIndex
+from kbs_sources import SOURCES, resolve
+from kbs_store import ArticleStore
+from kbs_trends import TrendIndex
+from kbs_wait import timings
+
+STATUS_PATH = data_path("crawl_status.json")
+LOG_PATH = data_path("crawl.log")  # 대시보드에서 띄운 백그라운드 실행의 출력
+STATUS_EVERY = 1.0  # 진행 상황 파일을 다시 쓰는 최소 간격(초)
+
+
+# ---- 진행 상황 파일 ----
+
+def read_status(path=STATUS_PATH):
+    """마지막(또는 지금) 실행 상태 dict, 기록이 없으면 None
+
+    'state'가 running인데 잠금이 없으면 중간에 죽은 실행이므로 failed로 보여줌
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            status = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if status.get("state") == "running" and not is_running():
+        status = dict(status, state="failed", error=status.get("error") or "실행이 중간에 종료되었습니다")
+    return status
+
+
+def write_status(status, path=STATUS_PATH):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(status, f, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def is_running():
+    """지금 크롤링이 돌고 있는지 (잠금 파일 기준)"""
+    lock = CrawlLock()
+    return lock.holder() is not None and not lock.is_stale()
+
+
+def unfinished_run():
+    """이어서 할 수 있는(끊겼거나 실패한) 마지막 실행 {'run_id', 'days', 'pages', 'targets', ...}, 없으면 None
+
+    지금 돌고 있는 실행은 빼고 봄
+    """
+    if is_running():
+        return None
+    checkpoint = CrawlCheckpoint()
+    run_id = checkpoint.latest_unfinished()
+    return checkpoint.run(run_id) if run_id else None
+
+
+# ---- 크롤링 한 번 ----
+
+def source_labels(sources=None):
+    """'KBS 국제, KBS 경제' (없는 소스면 ValueError)"""
+    return ", ".join(source["label"] for source in resolve(sources))
+
+
+def make_client(api_key=None):
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError("❌ OPENAI_API_KEY가 .env 파일에 설정되지 않았습니다!")
+    return OpenAI(api_key=api_key)
+
+
+def run_crawl(days, pages, browsers=2, workers=8, summary_workers=4, client=None, verbose=True, resume=None,
+              sources=None, per_host=HOST_CONCURRENCY):
+    """크롤링 한 번 실행하고 (새로 요약된 기사 수, 날짜 최신순 행 목록) 반환
+
+    진행 상황은 STATUS_PATH에 계속 기록됨. 다른 실행이 돌고 있으면 CrawlRunning
+    resume에 실행 id(True면 끊긴 마지막 실행)를 주면 그 실행을 이어서 함 (days/pages/sources는 그 실행 값)
+    """
+    client = client or make_client()
+    store = ArticleStore()
+    crawler = NewsCrawler(client, store, cache=ResponseCache(), browsers=browsers,
+                          max_workers=workers, summary_workers=summary_workers, sources=sources,
+                          per_host=per_host)
+    status = {"state": "running", "pid": os.getpid(), "days": days, "pages": pages,
+              "started_at": time.time(), "finished_at": None, "message": "시작 중", "fraction": 0.0,
+              "new_articles": 0, "error": None, "run_id": None}
+    last_write = 0.0
+
+    def save(force=False):
+        nonlocal last_write
+        if force or time.monotonic() - last_write >= STATUS_EVERY:
+            write_status(status)
+            last_write = time.monotonic()
+
+    def on_progress(message, fraction):
+        status.update(message=message, fraction=fraction, run_id=crawler.run_id)
+        if verbose:
+            print(f"[{fraction:>4.0%}] {message}", flush=True)
+        save()
+
+    stream = crawler.stream(days, pages, on_progress, resume=resume)
+    try:
+        # 잠금은 첫 next()에서 잡히므로, 다른 실행 중이면 상태 파일을 건드리지 않고 여기서 끝남
+        first = next(stream, None)
+    except CrawlRunning:
+        raise
+    except Exception as e:
+        status.update(state="failed", error=str(e), finished_at=time.time())
+        save(force=True)
+        raise
+    status["run_id"] = crawler.run_id
+    save(force=True)
+
+    try:
+        if first is not None:
+            status["new_articles"] += 1
+            for _ in stream:
+                status["new_articles"] += 1
+                save()
+    except Exception as e:
+        status.update(state="failed", error=str(e), finished_at=time.time())
+        save(force=True)
+        raise
+    status.update(state="done", message="✅ 크롤링 완료", fraction=1.0, finished_at=time.time())
+    save(force=True)
+    return status["new_articles"], store.rows(crawler.list_dates)
+
+
+def print_report(rows):
+    print(f"\n{'='*60}")
+    print(f"✅ 크롤링 완료! 총 {len(rows)}개의 뉴스")
+    print(f"{'='*60}\n")
+    for row in metrics.summary():
+        print(f"⚡ {row['단계']}: {row['횟수']}회, p50 {row['p50(초)']}초, p95 {row['p95(초)']}초, "
+              f"재시도 {row['재시도']} / 건너뜀 {row['건너뜀']} / 오류 {row['오류']}")
+    for row in timings.summary():
+        print(f"⏱️  {row['대기']}: {row['횟수']}회, 평균 {row['평균(초)']}초, 최대 {row['최대(초)']}초, "
+              f"타임아웃 {row['타임아웃']}회")
+
+
+def export_excel(rows, path="국제뉴스.xlsx"):
+    """수집 결과를 엑셀로도 내보내기 (저장은 이미 data/news parquet에 되어 있음)"""
+    df = pd.DataFrame(rows, columns=["기고 날짜", "뉴스 제목", "뉴스 내용", "3줄 요약"])
+    df.to_excel(path, index=False)
+    print(f"📊 '{path}' 파일로 내보냈습니다! (총 {len(df)}개의 뉴스)")
+
+
+# ---- 오프라인 재추출 ----
+
+def run_reextract(processes=None):
+    """보관소(kbs_archive)의 HTML을 다시 파싱해서 저장소를 고치고, 바뀐 기사는 데이터셋/검색 색인/키워드 트렌드에도 반영
+
+    크롤링과 같은 저장소를 쓰므로 같은 잠금을 잡음. 바뀐 기사 수 반환
+    """
+    with CrawlLock():
+        started = time.monotonic()
+        store = ArticleStore()
+        changed = kbs_archive.reextract(store, processes=processes,
+                                        on_progress=lambda message: print(message, flush=True))
+        if changed:
+            write_records(changed)
+            compact(sorted({partition_day(record["list_date"]) for record in changed}))
+            SearchIndex(store=store).add(changed)
+            # 트렌드는 기사별로 더해 둔 값이라, 바뀐 기사가 있는 날짜를 데이터셋(고친 본문)으로 다시 셈
+            TrendIndex().rebuild(partition_day(record["list_date"]) for record in changed)
+        print(f"⏱️  {time.monotonic() - started:.1f}초")
+    return len(changed)
+
+
+# ---- 주기 실행 ----
+
+def schedule(every_minutes, days, pages, browsers=2, workers=8, summary_workers=4, sources=None,
+             per_host=HOST_CONCURRENCY):
+    """every_minutes분마다 새 기사만 수집 (이전 실행이 아직 돌고 있으면 그 회차는 건너뜀)"""
+    client = make_client()
+    print(f"⏰ {every_minutes}분마다 {source_labels(sources)} {days}일 × {pages}페이지 수집 (Ctrl+C로 종료)")
+    while True:
+        started = time.monotonic()
+        try:
+            new_articles, rows = run_crawl(days, pages, browsers, workers, summary_workers, client, verbose=False,
+                                           sources=sources, per_host=per_host)
+            print(f"[{time.strftime('%Y-%m-%d %H:%M')}] 새 기사 {new_articles}개 (표시 기간 {len(rows)}개)",
+                  flush=True)
+            # 크롤링이 쓴 날짜는 닫을 때 합쳐지고, 그 전 실행/재추출이 남긴 작은 파일도 회차마다 합침
+            with CrawlLock():
+                compact()
+        except CrawlRunning as e:
+            print(f"[{time.strftime('%Y-%m-%d %H:%M')}] ⏭️  건너뜀: {e}", flush=True)
+        except Exception as e:
+            # 한 회차가 실패해도 다음 회차는 계속
+            print(f"[{time.strftime('%Y-%m-%d %H:%M')}] ❌ 실패: {e}", flush=True)
+        time.sleep(max(0.0, every_minutes * 60 - (time.monotonic() - started)))
+
+
+def start_background(days, pages, browsers=2, workers=8, summary_workers=4, api_key=None, resume=False,
+                     sources=None):
+    """crawl 명령을 별도 프로세스로 띄움 (대시보드용, 출력은 LOG_PATH로, resume이면 끊긴 마지막 실행을 이어서)"""
+    env = dict(os.environ)
+    if api_key:
+        env["OPENAI_API_KEY"] = api_key  # 명령줄에 키가 보이지 않게 환경변수로 넘김
+    command = [sys.executable, os.path.abspath(__file__), "crawl", "--days", str(days), "--pages", str(pages),
+               "--browsers", str(browsers), "--workers", str(workers), "--summary-workers", str(summary_workers)]
+    if sources:
+        command += ["--sources", ",".join(sources)]
+    if resume:
+        command.append("--resume")
+    options = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP} if os.name == "nt" else {"start_new_session": True}
+    with open(LOG_PATH, "a", encoding="utf-8") as log:
+        return subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, env=env,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), **options)
+
+
+# ---- 명령줄 ----
+
+def add_crawl_options(parser):
+    parser.add_argument("--days", type=int, default=1, help="크롤링할 날짜 수 (오늘부터 과거로)")
+    parser.add_argument("--pages", type=int, default=3, help="날짜당 크롤링할 페이지 수")
+    parser.add_argument("--workers", type=int, default=8, help="상세 페이지 동시 요청 수")
+    parser.add_argument("--browsers", type=int, default=2, help="소스 × 날짜를 나눠 맡을 작업자(브라우저) 수")
+    parser.add_argument("--summary-workers", type=int, default=4, help="요약 동시 요청 수")
+    parser.add_argument("--sources", default=None,
+                        help=f"수집할 소스 (쉼표로 구분, 기본 kbs-world): {', '.join(SOURCES)}")
+    parser.add_argument("--per-host", type=int, default=HOST_CONCURRENCY,
+                        help="호스트당 동시 작업/요청 상한 (응답이 느려지거나 429가 오면 자동으로 줄임)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KBS 뉴스 크롤링 + 요약")
+    commands = parser.add_subparsers(dest="command", required=True)
+    crawl = commands.add_parser("crawl", help="크롤링 한 번 실행")
+    add_crawl_options(crawl)
+    crawl.add_argument("--excel", metavar="PATH", help="결과를 엑셀 파일로도 내보내기")
+    crawl.add_argument("--resume", nargs="?", const=True, metavar="RUN_ID",
+                       help="끊긴 실행을 멈춘 자리부터 이어서 (실행 id를 안 주면 가장 최근에 끝나지 않은 실행)")
+    scheduled = commands.add_parser("schedule", help="일정 간격으로 계속 크롤링")
+    add_crawl_options(scheduled)
+    scheduled.add_argument("--every", type=float, default=60, help="실행 간격(분)")
+    again = commands.add_parser("reextract", help="보관해 둔 HTML을 다시 파싱해서 저장소 고치기 (네트워크 없음)")
+    again.add_argument("--processes", type=int, default=None, help="파싱할 프로세스 수 (기본: CPU 수)")
+    args = parser.parse_args(argv)
+
+    if args.command == "schedule":
+        try:
+            schedule(args.every, args.days, args.pages, args.browsers, args.workers, args.summary_workers,
+                     args.sources, args.per_host)
+        except KeyboardInterrupt:
+            print("\n⏹️  스케줄러 종료")
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        return 0
+
+    if args.command == "reextract":
+        try:
+            run_reextract(args.processes)
+        except CrawlRunning as e:
+            print(f"⏭️  {e}")
+            return 1
+        return 0
+
+    try:
+        if args.resume:
+            print("크롤링 이어서 시작\n", flush=True)
+        else:
+            print(f"{source_labels(args.sources)} 크롤링 시작 ({args.days}일, 날짜당 최대 {args.pages}페이지)\n",
+                  flush=True)
+        _, rows = run_crawl(args.days, args.pages, args.browsers, args.workers, args.summary_workers,
+                            resume=args.resume, sources=args.sources, per_host=args.per_host)
+    except CrawlRunning as e:
+        print(f"⏭️  {e}")
+        return 1
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    print_report(rows)
+    if not rows:
+        print("⚠️  수집된 뉴스가 없습니다.")
+    elif args.excel:
+        export_excel(rows, args.excel)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+# 공통 설정 (.env 값, 저장 경로 등)
+
+import os
+from dotenv import load_dotenv
+
+# 다른 모듈이 import 시점에 설정을 읽으므로 여기서 먼저 .env 로드
+load_dotenv()
+
+# 캐시/저장소 파일을 모아두는 폴더
+DATA_DIR = os.getenv("KBS_DATA_DIR", "data")
+
+# 크롤링 시작 주소 (로컬 테스트 사이트로 돌릴 때 변경)
+KBS_BASE_URL = os.getenv("KBS_BASE_URL", "https://news.kbs.co.kr/news/pc/category/category.do?ctcd=0006&ref=pSiteMap")
+
+# 호스트당 동시 요청 상한, robots.txt 확인 여부 (로컬 테스트 사이트에서만 끔: KBS_RESPECT_ROBOTS=0)
+HOST_CONCURRENCY = int(os.getenv("KBS_HOST_CONCURRENCY", "8"))
+RESPECT_ROBOTS = os.getenv("KBS_RESPECT_ROBOTS", "1") != "0"
+
+# OpenAI 분당 한도 (계정 등급에 맞게 조정)
+OPENAI_RPM = int(os.getenv("OPENAI_RPM", "500"))
+OPENAI_TPM = int(os.getenv("OPENAI_TPM", "200000"))
+# 기사 하나를 한 번에 요약할 최대 입력 토큰 (넘으면 나눠서 요약한 뒤 합침)
+ARTICLE_TOKENS = int(os.getenv("OPENAI_ARTICLE_TOKENS", "3000"))
+
+
+def data_path(*names):
+    """DATA_DIR 아래 경로를 만들고 상위 폴더가 없으면 생성"""
+    path = os.path.join(DATA_DIR, *names)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
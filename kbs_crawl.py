@@ -0,0 +1,688 @@
+# KBS 뉴스 크롤러 (여러 소스)
+# 소스(kbs_sources) × 날짜마다 독립된 목록이므로 작업자들이 (소스, 날짜)를 하나씩 맡아서 동시에 수집
+# 작업은 호스트마다 진행 중인 수가 가장 적은 것부터 골라서, 느린 소스가 있어도 다른 소스는 계속 진행됨
+# 모든 요청은 호스트별 동시 요청 수/간격/robots.txt(kbs_hosts)를 지킴
+# 상세 페이지는 HTTP 풀(kbs_fetch), 요약은 백그라운드 스레드(kbs_summarize)
+# 다시 올라온 거의 같은 기사(kbs_dedup)는 요약하지 않고 원본 기사의 요약을 그대로 씀
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from kbs_archive import PageArchive, LISTING
+from kbs_checkpoint import CrawlCheckpoint, PENDING, DONE, IN_FLIGHT, FAILED, FINISHED
+from kbs_config import HOST_CONCURRENCY, data_path
+from kbs_dataset import DatasetWriter, LIVE_FLUSH_EVERY, LIVE_FLUSH_SECONDS
+from kbs_dedup import DuplicateIndex, index_store
+from kbs_fetch import make_session, fetch_details
+from kbs_hosts import HostLimiter
+from kbs_metrics import metrics, LOAD_LISTING, PARSE_LISTING, FETCH_DETAIL, DEDUP, STORE, RETRY, SKIP
+from kbs_parse import parse_listing
+from kbs_search import SearchIndex
+from kbs_sources import DEFAULT_SOURCE, resolve, host_of
+from kbs_store import ArticleLog, canonical_url, date_label, day_offset_of
+from kbs_summarize import Summarizer
+from kbs_trends import TrendIndex
+from kbs_wait import (timings, wait_listing, wait_page_change, wait_date_change,
+                      first_item_href, current_date_label)
+
+DRIVER_RETRIES = 2  # 브라우저가 죽으면 새로 띄워서 다시 시도할 횟수
+
+# 크롤링은 한 번에 하나만 (대시보드/CLI/스케줄러가 같은 저장소를 쓰므로)
+LOCK_PATH = data_path("crawl.lock")
+LOCK_STALE_SECONDS = 6 * 3600  # 프로세스 확인이 안 되는 환경(윈도우)에서 이보다 오래된 잠금은 무시
+
+
+class CrawlRunning(RuntimeError):
+    """다른 크롤링이 이미 실행 중"""
+
+
+def _process_alive(pid):
+    if os.name == "nt":
+        return None  # 윈도우에서는 os.kill(pid, 0)이 신호를 보내므로 확인하지 않음
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class CrawlLock:
+    """잠금 파일(pid, 시작 시각)로 크롤링이 겹치지 않게 함, 죽은 프로세스가 남긴 잠금은 치움"""
+
+    def __init__(self, path=LOCK_PATH):
+        self.path = path
+        self.held = False
+
+    def holder(self):
+        """잠금을 가진 (pid, 시작 시각), 없으면 None"""
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                pid, started = f.read().split()
+            return int(pid), float(started)
+        except (OSError, ValueError):
+            return None
+
+    def is_stale(self):
+        holder = self.holder()
+        if holder is None:
+            return True
+        alive = _process_alive(holder[0])
+        if alive is None:
+            return time.time() - holder[1] > LOCK_STALE_SECONDS
+        return not alive
+
+    def acquire(self):
+        for _ in range(2):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self.is_stale():
+                    raise CrawlRunning(f"이미 다른 크롤링이 실행 중입니다 (pid {self.holder()[0]})")
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(f"{os.getpid()} {time.time()}")
+            self.held = True
+            return self
+        raise CrawlRunning("크롤링 잠금을 얻지 못했습니다")
+
+    def release(self):
+        if self.held:
+            self.held = False
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def make_driver():
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    return webdriver.Chrome(options=chrome_options)
+
+
+def date_url(source, day_offset, page=None):
+    """소스 목록 주소에 날짜(date_param)와 페이지(page_param) 파라미터를 붙인 주소"""
+    url = source["listing_url"]
+    params = []
+    if source["date_param"]:
+        target = datetime.now() - timedelta(days=day_offset)
+        params.append(f"{source['date_param']}={target.strftime(source['date_url_format'])}")
+    if page is not None and source["page_param"]:
+        params.append(f"{source['page_param']}={page}")
+    if not params:
+        return url
+    separator = "&" if "?" in url else "?"
+    return f"{url}{separator}{'&'.join(params)}"
+
+
+def open_date(driver, source, day_offset, hosts=None):
+    """해당 날짜 목록을 열고 실제로 열린 날짜를 반환
+
+    날짜 주소로 바로 열어보고, 다른 날짜가 열리면(또는 날짜 파라미터가 없는 소스면)
+    첫 화면에서 '이전 날짜'를 눌러서 이동
+    """
+    selectors = source["selectors"]
+
+    def load(url):
+        with hosts.slot(url) if hosts is not None else nullcontext():
+            driver.get(url)
+        wait_listing(driver, items=selectors["items"])
+
+    wanted = date_label(day_offset)
+    if source["date_param"]:
+        load(date_url(source, day_offset))
+        label = current_date_label(driver, selectors["date_label"])
+        if day_offset == 0 or label == wanted:
+            return label or wanted
+
+    load(source["listing_url"])
+    for _ in range(day_offset):
+        label = current_date_label(driver, selectors["date_label"])
+        old_href = first_item_href(driver, selectors["items"])
+        prev_button = driver.find_element(By.CSS_SELECTOR, selectors["previous_date"])
+        driver.execute_script("arguments[0].click();", prev_button)
+        if wait_date_change(driver, label, old_href, items=selectors["items"],
+                            date_label=selectors["date_label"]) is None:
+            break
+    return current_date_label(driver, selectors["date_label"]) or wanted
+
+
+class BrowserListing:
+    """브라우저로 여는 목록 (날짜 이동 + 페이지 번호 클릭 또는 페이지 주소)"""
+
+    ends_on_empty = False  # 그리는 도중에는 목록이 비어 보일 수 있으므로 빈 목록을 끝으로 보지 않음
+
+    def __init__(self, driver, source, hosts):
+        self.driver = driver
+        self.source = source
+        self.hosts = hosts
+        self.day_offset = None
+
+    def open(self, day_offset):
+        self.day_offset = day_offset
+        return open_date(self.driver, self.source, day_offset, self.hosts)
+
+    def next_page(self, page_num):
+        """page_num 페이지로 이동, 더 없으면 False (목록이 바뀌지 않으면 TimeoutError)"""
+        items = self.source["selectors"]["items"]
+        old_href = first_item_href(self.driver, items)
+        if self.source["pagination"] == "param":
+            url = date_url(self.source, self.day_offset, page_num)
+            with self.hosts.slot(url):
+                self.driver.get(url)
+            return wait_listing(self.driver, items=items) is not None
+        try:
+            next_button = self.driver.find_element(
+                By.CSS_SELECTOR, self.source["selectors"]["next_page"].format(page=page_num))
+        except WebDriverException:
+            return False
+        self.driver.execute_script("arguments[0].click();", next_button)
+        if wait_page_change(self.driver, old_href, items=items) is None:
+            raise TimeoutError(f"{page_num}페이지 이동 시간 초과")
+        return True
+
+    def page(self):
+        """지금 열린 목록 (HTML, 주소)"""
+        return self.driver.page_source, self.driver.current_url
+
+
+class HttpListing:
+    """브라우저 없이 requests로 받는 목록 (날짜/페이지 모두 주소 파라미터, 필요한 페이지만 받음)"""
+
+    ends_on_empty = True  # 기사가 하나도 없는 페이지(또는 404)면 마지막 페이지를 지난 것
+    driver = None
+
+    def __init__(self, source, hosts):
+        if source["pagination"] != "param":
+            raise ValueError(f"{source['name']}: 브라우저 없이 받는 목록은 pagination='param'이어야 합니다")
+        self.source = source
+        self.hosts = hosts
+        self.day_offset = None
+        self.page_num = 1
+
+    def open(self, day_offset):
+        self.day_offset = day_offset
+        self.page_num = 1
+        return date_label(day_offset)
+
+    def next_page(self, page_num):
+        self.page_num = page_num
+        return True
+
+    def page(self):
+        url = date_url(self.source, self.day_offset, self.page_num)
+        with metrics.span(LOAD_LISTING):
+            response = self.hosts.get(url, stage=LOAD_LISTING)
+        if response.status_code == 404:
+            return "", url
+        response.raise_for_status()
+        return response.text, response.url
+
+
+class NewsCrawler:
+    """소스 × 날짜 × 페이지 크롤링 한 번 실행
+
+    browsers개의 작업자가 (소스, 날짜)를 하나씩 맡고 (브라우저가 필요한 소스일 때만 작업자마다 브라우저를 띄움),
+    새 기사는 저장소에 넣은 뒤 요약 대기열로 보냄. sources는 kbs_sources 이름 목록 (없으면 기본 소스),
+    base_url을 주면 기본 소스의 목록 주소 대신 씀 (로컬 테스트 사이트), per_host는 호스트당 동시 작업/요청 수
+    """
+
+    def __init__(self, client, store, cache=None, base_url=None, browsers=1,
+                 max_workers=8, summary_workers=4, sources=None, per_host=HOST_CONCURRENCY):
+        self.store = store
+        self.base_url = base_url
+        self.sources = self._resolve(sources)
+        self.browsers = browsers
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.session = make_session(max_workers)
+        self.hosts = HostLimiter(self.session, max_per_host=per_host)
+        self.summarizer = Summarizer(client, concurrency=summary_workers, cache=cache,
+                                     on_done=self._on_summary)
+        self.submitted = set()  # 이번 실행에서 요약 대기열에 넣은 기사 URL
+        # 원본 기사 URL -> 원본 요약을 기다리는 중복 기사 [(key, row), ...]
+        self.waiting = {}
+        self.waiting_lock = threading.Lock()
+        self.events = queue.Queue()  # 백그라운드 크롤링 -> stream() 으로 전달하는 진행/기사 이벤트
+        self.list_dates = []
+        self.run_id = None  # 체크포인트 실행 id (stream()에서 정해짐)
+        self.local = threading.local()
+        self.drivers = []
+        self.drivers_lock = threading.Lock()
+
+    def _resolve(self, names):
+        sources = resolve(names)
+        for source in sources:
+            if self.base_url and source["name"] == DEFAULT_SOURCE:
+                source["listing_url"] = self.base_url
+        return sources
+
+    # ---- 스레드별 브라우저 ----
+
+    def _driver(self):
+        driver = getattr(self.local, "driver", None)
+        if driver is None:
+            driver = make_driver()
+            self.local.driver = driver
+            with self.drivers_lock:
+                self.drivers.append(driver)
+        return driver
+
+    def _discard_driver(self):
+        """죽은 브라우저 정리 (다음 _driver() 호출 때 새로 띄움)"""
+        driver = getattr(self.local, "driver", None)
+        self.local.driver = None
+        if driver is None:
+            return
+        with self.drivers_lock:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    # ---- 소스 × 날짜 하나 ----
+
+    def crawl_day(self, source, day_offset, pages_per_day):
+        """소스 하나의 날짜 하나를 수집하고 목록 날짜를 반환 (브라우저가 죽으면 새로 띄워 재시도)"""
+        if source["render"] == "http":
+            return self._crawl_day(HttpListing(source, self.hosts), source, day_offset, pages_per_day)
+        for attempt in range(DRIVER_RETRIES + 1):
+            try:
+                return self._crawl_day(BrowserListing(self._driver(), source, self.hosts), source, day_offset,
+                                       pages_per_day)
+            except WebDriverException as e:
+                metrics.error(LOAD_LISTING, e)
+                self._discard_driver()
+                if attempt == DRIVER_RETRIES:
+                    raise
+                metrics.count(LOAD_LISTING, RETRY)
+
+    def _crawl_day(self, listing, source, day_offset, pages_per_day):
+        name = source["name"]
+        target = date_label(day_offset)
+        if not self.hosts.allowed(date_url(source, day_offset)):
+            # robots.txt가 막은 목록은 열지 않고 끝난 것으로 둠 (이어서 해도 달라지지 않음)
+            metrics.count(LOAD_LISTING, SKIP)
+            metrics.error(LOAD_LISTING, PermissionError(f"robots.txt가 막은 목록: {date_url(source, day_offset)}"))
+            self.checkpoint.day_done(self.run_id, target, name)
+            return target
+        with metrics.span(LOAD_LISTING):
+            list_date = listing.open(day_offset)
+        mark = self.store.watermark(list_date, name)
+        newest_url = None
+        pages_done = 0
+        exhausted = False
+
+        # 지난 실행들에서 상세 페이지를 받지 못한 기사와, 이어서 하는 실행이면 지난번에 목록에서 찾고
+        # 저장하지 못한 기사부터 받음 (끝난 페이지는 넘기기만 함)
+        retry = {item["url"]: item for item in self.store.failed(list_date, name)}
+        retry.update((item["url"], item) for item in self.checkpoint.unfinished(self.run_id, target, name))
+        self.checkpoint.add_urls(self.run_id, target, list(retry.values()), name)
+        self._fetch_items(listing.driver, source, target, list_date, list(retry.values()))
+        resume_after, _ = self.checkpoint.day(self.run_id, target, name)
+
+        for page_num in range(1, pages_per_day + 1):
+            if page_num <= resume_after:
+                pages_done = page_num
+                known = None
+            else:
+                known, first_url, found = self._crawl_page(listing, source, target, list_date, page_num)
+                if page_num == 1:
+                    newest_url = first_url
+                pages_done = page_num
+                self.checkpoint.page_done(self.run_id, target, page_num, name)
+                if not found and listing.ends_on_empty:
+                    exhausted = True
+                    break
+
+            # 목록은 최신순이라 아는 기사가 나오면 그 뒤는 이전 실행에서 이미 읽은 범위
+            if known and mark is not None and (mark["exhausted"] or mark["pages_done"] >= pages_per_day):
+                pages_done = max(pages_done, mark["pages_done"])
+                exhausted = mark["exhausted"]
+                break
+
+            if page_num < pages_per_day:
+                try:
+                    with metrics.span(LOAD_LISTING):
+                        more = listing.next_page(page_num + 1)
+                except TimeoutError as e:
+                    metrics.error(LOAD_LISTING, TimeoutError(f"{source['label']} {list_date} {e}"))
+                    break
+                if not more:
+                    exhausted = True
+                    break
+
+        self.store.update_watermark(list_date, newest_url, pages_done, exhausted, name)
+        # 다시 받을 기사가 남았으면 끝난 날짜로 두지 않음 (실행은 실패로 끝나서 --resume/다음 실행에서 다시 받음)
+        if not self.store.failed(list_date, name):
+            self.checkpoint.day_done(self.run_id, target, name)
+        return list_date
+
+    def _crawl_page(self, listing, source, target, list_date, page_num):
+        """지금 열린 목록 페이지의 새 기사를 수집하고 (이미 저장돼 있던 기사 URL set, 첫 기사 URL, 목록 기사 수) 반환"""
+        html, url = listing.page()
+        self.archive.put(LISTING, url, html, list_date, page_num, source["name"])
+        with metrics.span(PARSE_LISTING):
+            news_items = parse_listing(html, list_date, base_url=url, selectors=source["selectors"])
+
+        # 이미 저장된 기사는 상세 페이지/요약 모두 건너뜀
+        known = self.store.known_urls([item["url"] for item in news_items])
+        new_items = [item for item in news_items if canonical_url(item["url"]) not in known]
+        metrics.count(PARSE_LISTING, SKIP, len(news_items) - len(new_items))
+        self.checkpoint.add_urls(self.run_id, target, new_items, source["name"])
+        self._fetch_items(listing.driver, source, target, list_date, new_items)
+        return known, news_items[0]["url"] if news_items else None, len(news_items)
+
+    def _fetch_items(self, driver, source, target, list_date, items):
+        """상세 페이지를 받아 저장하고 요약 대기열로 (체크포인트에 pending -> in_flight -> done 기록)
+
+        본문을 받지 못한 기사는 저장/요약하지 않고 pending으로 되돌려서 다음 실행(--resume)에서 다시 받음
+        """
+        # 지난 실행에서 받는 도중 끊긴 기사가 그 사이 저장됐으면 다시 받지 않음
+        known = self.store.known_urls([item["url"] for item in items])
+        # robots.txt가 막은 상세 페이지는 받지 않음
+        blocked = [item["url"] for item in items
+                   if canonical_url(item["url"]) not in known and not self.hosts.allowed(item["url"])]
+        metrics.count(FETCH_DETAIL, SKIP, len(blocked))
+        self.store.forget_failed(blocked)
+        skipped = set(blocked) | {item["url"] for item in items if canonical_url(item["url"]) in known}
+        self.checkpoint.mark(self.run_id, list(skipped), DONE)
+        items = [item for item in items if item["url"] not in skipped]
+        if not items:
+            return
+        self.checkpoint.mark(self.run_id, [item["url"] for item in items], IN_FLIGHT)
+
+        # 상세 페이지는 HTTP로 동시에 수집 (본문이 없으면 브라우저가 있을 때 브라우저로 재시도)
+        contents = fetch_details([item["url"] for item in items],
+                                 session=self.session, driver=driver, max_workers=self.max_workers,
+                                 archive=self.archive, hosts=self.hosts, selector=source["selectors"]["content"],
+                                 source=source["name"])
+
+        failed = [item for item in items if contents[item["url"]] is None]
+        self.checkpoint.mark(self.run_id, [item["url"] for item in failed], PENDING)
+        self.store.add_failed(failed, list_date, source["name"])
+        for item in items:
+            content = contents[item["url"]]
+            if content is None:
+                continue
+            with metrics.span(STORE):
+                self.store.save(item["url"], list_date, item["date"], item["title"], content)
+            self.checkpoint.mark(self.run_id, [item["url"]], DONE)
+            self.submitted.add(canonical_url(item["url"]))
+            key = (item["url"], list_date)
+            if not self._link_duplicate(key, [item["date"], item["title"], content]):
+                self.summarizer.submit(item["date"], item["title"], content, key=key)
+
+    # ---- 중복 기사 ----
+
+    def _link_duplicate(self, key, row):
+        """본문이 이미 본 기사와 거의 같으면 원본에 연결하고 True (요약은 원본 것을 씀)
+
+        원본 요약이 아직 없으면 원본 요약이 끝날 때(_on_summary) 같이 내보냄
+        """
+        url = canonical_url(key[0])
+        with metrics.span(DEDUP):
+            found = self.dedup.match_or_add(url, row[2])
+        if found is None:
+            return False
+        original = found[0]
+        self.store.set_duplicate(url, original)
+        metrics.count(DEDUP, SKIP)
+        with self.waiting_lock:
+            summary = self.store.summary(original)
+            if summary is None or summary.startswith("요약 실패"):
+                self.waiting.setdefault(original, []).append((key, row))
+                return True
+        self._on_summary(key, row + [summary], None, duplicate_of=original)
+        return True
+
+    def _release_duplicates(self, original, summary):
+        with self.waiting_lock:
+            waiting = self.waiting.pop(original, [])
+        for key, row in waiting:
+            self._on_summary(key, row + [summary], None, duplicate_of=original)
+
+    # ---- 전체 실행 ----
+
+    def _report(self, message, fraction):
+        self.events.put(("progress", message, fraction))
+
+    def _on_summary(self, key, row, usage, duplicate_of=None):
+        """요약 하나가 끝나면 바로 저장소/로그에 쓰고 stream()으로 넘김 (요약 워커 스레드)
+
+        duplicate_of가 있으면 원본 기사의 요약을 그대로 쓴 중복 기사
+        """
+        url, list_date = key
+        summary = row[3]
+        record = {
+            "url": canonical_url(url), "list_date": list_date, "date": row[0], "title": row[1],
+            "content": row[2], "summary": summary, "duplicate_of": duplicate_of,
+        }
+        with metrics.span(STORE):
+            if not summary.startswith("요약 실패"):
+                self.store.set_summary(url, summary, usage)
+            self.log.append(dict(record, usage=usage, logged_at=time.time()))
+            self.writer.append(record)
+            self.index.add([record])
+            self.trends.add([record])
+        self.events.put(("article", row))
+        if duplicate_of is None and not summary.startswith("요약 실패"):
+            self._release_duplicates(record["url"], summary)
+
+    def _crawl_all(self, targets, pages_per_day):
+        """targets(날짜 라벨, 최신순) × 소스를 작업자 풀로 수집하고 남은 요약까지 마무리"""
+        visited = {}  # (day_offset, 소스 이름) -> 목록 날짜
+        todo = []
+        for label in targets:
+            day_offset = day_offset_of(label)
+            for source in self.sources:
+                name = source["name"]
+                # 이전 실행에서 끝까지 읽은 지난 날짜와, 이어서 하는 실행에서 이미 끝낸 날짜는 건너뜀
+                # (끝까지 읽었어도 다시 받을 상세 페이지가 남은 날짜는 다시 엶)
+                if ((self.store.is_finished(label, pages_per_day, name) and not self.store.failed(label, name))
+                        or self.checkpoint.day(self.run_id, label, name)[1]):
+                    visited[(day_offset, name)] = label
+                    self.checkpoint.day_done(self.run_id, label, name)
+                else:
+                    todo.append((source, day_offset))
+
+        total = len(visited) + len(todo)
+        done = len(visited)
+        self._report(f"🌐 {len(todo)}개 (소스 {len(self.sources)}개 × 날짜) 수집 시작 "
+                     f"(이미 수집된 {done}개 건너뜀, 작업자 {self.browsers}개, 호스트당 {self.per_host}개)",
+                     done / total)
+        results = queue.Queue()
+        try:
+            with ThreadPoolExecutor(max_workers=self.browsers) as executor:
+                pending = list(todo)
+                running = {}  # 호스트 -> 진행 중인 작업 수
+                condition = threading.Condition()
+                for _ in range(min(self.browsers, len(todo))):
+                    executor.submit(self._work, pending, running, condition, pages_per_day, results)
+                for _ in todo:
+                    source, day_offset, list_date = results.get()
+                    visited[(day_offset, source["name"])] = list_date
+                    done += 1
+                    self._report(f"📅 [{done}/{total}] {source['label']} {list_date} 완료", done / total)
+        finally:
+            with self.drivers_lock:
+                for driver in self.drivers:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                self.drivers.clear()
+            self.session.close()
+            for row in self.hosts.summary():
+                if row["감속"]:
+                    self._report(f"🐢 {row['호스트']}: 감속 {row['감속']}회 (동시 {row['동시 요청']}개, "
+                                 f"간격 {row['간격(초)']}초)", done / total)
+
+            # 날짜 순서대로 합침
+            self.list_dates = list(dict.fromkeys(visited[key] for key in sorted(visited)))
+            self._report("📝 남은 요약 마무리 중...", 1.0)
+            self._finish_summaries(self.list_dates)
+
+    def _work(self, pending, running, condition, pages_per_day, results):
+        """작업자 하나: 진행 중인 작업이 가장 적은 호스트의 (소스, 날짜)부터 꺼내서 수집 (per_host개까지)"""
+        while True:
+            with condition:
+                while True:
+                    if not pending:
+                        return
+                    ready = [unit for unit in pending
+                             if running.get(host_of(unit[0]["listing_url"]), 0) < self.per_host]
+                    if ready:
+                        break
+                    condition.wait()
+                unit = min(ready, key=lambda unit: running.get(host_of(unit[0]["listing_url"]), 0))
+                pending.remove(unit)
+                host = host_of(unit[0]["listing_url"])
+                running[host] = running.get(host, 0) + 1
+            source, day_offset = unit
+            try:
+                list_date = self.crawl_day(source, day_offset, pages_per_day)
+            except Exception as e:
+                # 재시도해도 실패한 날짜는 저장소에 있는 만큼만 보여줌
+                # (브라우저 오류는 crawl_day에서 이미 기록)
+                if not isinstance(e, WebDriverException):
+                    metrics.error(LOAD_LISTING, e)
+                list_date = date_label(day_offset)
+            finally:
+                with condition:
+                    running[host] -= 1
+                    condition.notify_all()
+            results.put((source, day_offset, list_date))
+
+    def _finish_summaries(self, list_dates):
+        # 이전 실행에서 요약에 실패한 기사도 다시 요약
+        for url, list_date, date, title, content in self.store.missing_summaries(list_dates):
+            if url not in self.submitted:
+                self.submitted.add(url)
+                self.summarizer.submit(date, title, content, key=(url, list_date))
+        self.summarizer.join()
+        # 원본 요약이 실패한 중복 기사는 저장소에 요약 없이 남겨 두고 다음 실행에서 다시 요약
+        with self.waiting_lock:
+            left = sum(len(waiting) for waiting in self.waiting.values())
+            self.waiting.clear()
+        if left:
+            self._report(f"⚠️ 원본 요약이 없어 중복 기사 {left}개를 다음 실행으로 미룸", 1.0)
+        usage = self.summarizer.usage
+        if usage["requests"]:
+            self._report(f"🔢 요약 요청 {usage['requests']}회, 입력 {usage['prompt_tokens']:,} / "
+                         f"출력 {usage['completion_tokens']:,} 토큰", 1.0)
+
+    def stream(self, num_days, pages_per_day, on_progress=None, resume=None):
+        """요약이 끝나는 기사부터 [date, title, content, summary] 행을 하나씩 내보내는 제너레이터
+
+        크롤링/요약은 백그라운드 스레드에서 돌고, 각 기사는 내보내기 전에 이미 저장소,
+        JSONL 로그, 검색 색인, 키워드 트렌드에 기록됨 (parquet 데이터셋에는 모아서 추가).
+        거의 같은 기사는 원본 요약이 끝난 뒤에 같은 요약으로 내보냄.
+        on_progress(message, fraction)는 이 제너레이터를 도는 스레드에서 불림
+        다른 크롤링이 실행 중이면 CrawlRunning
+
+        진행 상황은 실행 id(self.run_id)별로 체크포인트(kbs_checkpoint)에 남음. resume에 실행 id
+        (True면 가장 최근에 끝나지 않은 실행)를 주면 그 실행의 소스/날짜/페이지 수로 멈춘 자리부터 이어감
+        """
+        lock = CrawlLock().acquire()
+        try:
+            timings.reset()
+            metrics.reset()
+            self.checkpoint = CrawlCheckpoint()
+            if resume:
+                run = self.checkpoint.run(self.checkpoint.latest_unfinished() if resume is True else resume)
+                if run is None:
+                    raise ValueError("이어서 할 크롤링 실행이 없습니다")
+                self.run_id, targets, pages_per_day = run["run_id"], run["targets"], run["pages"]
+                self.sources = self._resolve(run["sources"])
+                metrics.run_id = self.run_id  # 성능 기록도 같은 실행으로 이어 붙임
+            else:
+                self.run_id = metrics.run_id
+                targets = [date_label(day_offset) for day_offset in range(num_days)]
+                self.checkpoint.start(self.run_id, num_days, pages_per_day, targets,
+                                      [source["name"] for source in self.sources])
+            self.log = ArticleLog()
+            # 분석용 parquet 데이터셋 (대시보드에 바로 보이도록 조금씩 모아서 파일로 추가)
+            self.writer = DatasetWriter(flush_every=LIVE_FLUSH_EVERY, flush_seconds=LIVE_FLUSH_SECONDS)
+            self.index = SearchIndex(store=self.store)  # 검색 색인은 기사마다 바로 추가
+            self.dedup = DuplicateIndex()  # 중복 확인용 MinHash 색인 (처음이면 저장된 기사로 채움)
+            index_store(self.dedup, self.store)
+            self.trends = TrendIndex()  # 날짜 × 키워드 행렬도 기사마다 바로 더함
+            self.archive = PageArchive()  # 받은 목록/상세 HTML 원본 (kbs_cli.py reextract로 다시 파싱)
+        except Exception:
+            lock.release()
+            raise
+        errors = []
+
+        def work():
+            try:
+                self._crawl_all(targets, pages_per_day)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                self.events.put(("end",))
+
+        thread = threading.Thread(target=work, daemon=True)
+        thread.start()
+        try:
+            while True:
+                event = self.events.get()
+                if event[0] == "end":
+                    break
+                if event[0] == "progress":
+                    if on_progress is not None:
+                        on_progress(event[1], event[2])
+                else:
+                    yield event[1]
+        finally:
+            thread.join()
+            # 못 끝낸 소스 × 날짜가 있으면 실패로 남겨서 --resume으로 이어갈 수 있게 함
+            finished = not errors and self.checkpoint.all_done(self.run_id)
+            self.checkpoint.finish(self.run_id, FINISHED if finished else FAILED)
+            self.log.close()
+            self.writer.close()
+            # 단계별 기록은 대시보드 '성능' 탭과 Prometheus 텍스트 파일로 내보냄
+            metrics.export_jsonl()
+            metrics.export_prometheus()
+            lock.release()
+        if errors:
+            raise errors[0]
+
+    def run(self, num_days, pages_per_day, on_progress=None, resume=None):
+        """num_days일치를 수집하고 날짜 최신순 [date, title, content, summary] 행 반환"""
+        for _ in self.stream(num_days, pages_per_day, on_progress, resume):
+            pass
+        return self.store.rows(self.list_dates)
+
+
+def crawl_news(num_days, pages_per_day, client, store, cache=None, browsers=1, max_workers=8,
+               summary_workers=4, base_url=None, on_progress=None, sources=None):
+    """크롤링 한 번 실행 (NewsCrawler 간단 호출용)"""
+    crawler = NewsCrawler(client, store, cache=cache, base_url=base_url, browsers=browsers,
+                          max_workers=max_workers, summary_workers=summary_workers, sources=sources)
+    return crawler.run(num_days, pages_per_day, on_progress)
@@ -0,0 +1,334 @@
+# 뉴스 데이터셋 (Parquet, 날짜별 파티션)
+# data/news/day=YYYY-MM-DD/part-*.parquet 에 추가만 하고, 읽을 때는 필요한 날짜/컬럼만 메모리 맵으로 읽음
+# 크롤링 중에 작게 자주 쓴 파일은 크롤링이 끝나면 날짜마다 파일 하나로 합침 (compact_day)
+# 엑셀은 내보내기 용도로만 사용
+
+import io
+import os
+import threading
+import time
+import uuid
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from pyarrow import fs
+from kbs_config import DATA_DIR
+from kbs_terms import term_counts
+
+DATASET_DIR = os.path.join(DATA_DIR, "news")
+COLUMNS = ["기고 날짜", "뉴스 제목", "뉴스 내용", "3줄 요약"]
+# 본문을 빼고 읽을 때 쓰는 기본 컬럼 (평균 길이 등은 '본문 길이'로 계산)
+LIGHT_COLUMNS = ["url", "기고 날짜", "뉴스 제목", "3줄 요약", "본문 길이"]
+# 거의 같은 기사(kbs_dedup)는 원본 기사 url을 남겨 두고, 키워드/트렌드 집계에서는 원본만 셈
+DUPLICATE_COLUMN = "원본 url"
+
+SCHEMA = pa.schema([
+    ("url", pa.string()),
+    ("기고 날짜", pa.string()),
+    ("뉴스 제목", pa.string()),
+    ("뉴스 내용", pa.string()),
+    ("3줄 요약", pa.string()),
+    ("본문 길이", pa.int32()),
+    # 저장할 때 한 번만 센 키워드 빈도 (제목 + 본문)
+    ("키워드", pa.list_(pa.string())),
+    ("키워드 빈도", pa.list_(pa.int32())),
+    ("written_at", pa.float64()),
+    (DUPLICATE_COLUMN, pa.string()),
+])
+# 읽을 때는 파티션 폴더의 날짜도 컬럼으로 붙음 (예전 파일에 없는 컬럼은 null)
+DATASET_SCHEMA = SCHEMA.append(pa.field("day", pa.string()))
+
+FLUSH_EVERY = 50  # 기사 N개마다 파일 하나로 씀
+# 크롤링 중에는 대시보드에 바로 보이도록 작게 자주 씀 (기사 N개 또는 첫 기사가 들어온 뒤 N초)
+LIVE_FLUSH_EVERY = 5
+LIVE_FLUSH_SECONDS = 5.0
+
+
+def partition_day(list_date):
+    """'2024.01.15' -> '2024-01-15' (파티션 폴더 이름)"""
+    return list_date.replace(".", "-")[:10]
+
+
+def write_records(records, dataset_dir=DATASET_DIR):
+    """records(dict 목록)를 날짜별로 나눠 새 parquet 파일로 추가"""
+    by_day = {}
+    now = time.time()
+    for record in records:
+        day = partition_day(record["list_date"])
+        terms, counts = term_counts(record["title"], record["content"])
+        by_day.setdefault(day, []).append({
+            "url": record["url"],
+            "기고 날짜": record["date"],
+            "뉴스 제목": record["title"],
+            "뉴스 내용": record["content"],
+            "3줄 요약": record["summary"],
+            "본문 길이": len(record["content"] or ""),
+            "키워드": terms,
+            "키워드 빈도": counts,
+            "written_at": now,
+            DUPLICATE_COLUMN: record.get("duplicate_of"),
+        })
+
+    for day, rows in by_day.items():
+        folder = os.path.join(dataset_dir, f"day={day}")
+        os.makedirs(folder, exist_ok=True)
+        table = pa.Table.from_pylist(rows, schema=SCHEMA)
+        pq.write_table(table, _part_path(folder, now))
+
+
+def _part_path(folder, now):
+    return os.path.join(folder, f"part-{int(now * 1000)}-{uuid.uuid4().hex[:8]}.parquet")
+
+
+def compact_day(day, dataset_dir=DATASET_DIR):
+    """그 날짜의 part 파일들을 url마다 가장 나중 행만 남긴 파일 하나로 합침, 합친 파일 수 반환
+
+    새 파일을 먼저 쓰고 읽은 파일만 지우므로 그 사이 다른 실행이 추가한 파일은 그대로 남음
+    """
+    folder = os.path.join(dataset_dir, f"day={day}")
+    if not os.path.isdir(folder):
+        return 0
+    parts = sorted(entry.path for entry in os.scandir(folder)
+                   if entry.name.startswith("part-") and entry.name.endswith(".parquet"))
+    if len(parts) < 2:
+        return 0
+    # 예전 파일에 없는 컬럼은 null로 채워서 읽음
+    table = _latest(ds.dataset(parts, schema=SCHEMA, format="parquet").to_table())
+    # '.'으로 시작하는 파일은 데이터셋을 읽을 때 건너뛰므로 다 쓴 뒤에 이름을 바꿈
+    tmp = os.path.join(folder, f".compact-{uuid.uuid4().hex[:8]}.tmp")
+    pq.write_table(table, tmp)
+    os.replace(tmp, _part_path(folder, time.time()))
+    for path in parts:
+        os.remove(path)
+    return len(parts)
+
+
+def compact(days=None, dataset_dir=DATASET_DIR):
+    """여러 날짜(없으면 전체)를 compact_day로 합침, 합친 파일 수 반환"""
+    return sum(compact_day(day, dataset_dir) for day in (list_days(dataset_dir) if days is None else days))
+
+
+class DatasetWriter:
+    """크롤러가 기사 하나씩 넘기면 모아서 FLUSH_EVERY개마다 파일로 씀 (여러 스레드에서 호출 가능)
+
+    flush_seconds를 주면 모인 기사가 적어도 첫 기사가 들어온 뒤 그만큼 지나면 씀 (다음 append 때)
+    close()하면 남은 기사를 쓰고, 쓴 날짜들의 작은 파일을 하나로 합침
+    """
+
+    def __init__(self, dataset_dir=DATASET_DIR, flush_every=FLUSH_EVERY, flush_seconds=None):
+        self.dataset_dir = dataset_dir
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self.buffer = []
+        self.first_at = 0.0
+        self.days = set()
+        self.lock = threading.Lock()
+
+    def append(self, record):
+        with self.lock:
+            if not self.buffer:
+                self.first_at = time.monotonic()
+            self.buffer.append(record)
+            self.days.add(partition_day(record["list_date"]))
+            due = self.flush_seconds is not None and time.monotonic() - self.first_at >= self.flush_seconds
+            if len(self.buffer) < self.flush_every and not due:
+                return
+            records, self.buffer = self.buffer, []
+        write_records(records, self.dataset_dir)
+
+    def close(self):
+        with self.lock:
+            records, self.buffer = self.buffer, []
+            days, self.days = self.days, set()
+        if records:
+            write_records(records, self.dataset_dir)
+        compact(sorted(days), self.dataset_dir)
+
+
+def list_days(dataset_dir=DATASET_DIR):
+    """저장된 날짜 목록 (오래된 순)"""
+    if not os.path.isdir(dataset_dir):
+        return []
+    return sorted(name[4:] for name in os.listdir(dataset_dir) if name.startswith("day="))
+
+
+def dataset_version(dataset_dir=DATASET_DIR):
+    """파일이 추가될 때마다 바뀌는 값 (읽기 캐시 무효화용)"""
+    count, latest = 0, 0.0
+    for day in list_days(dataset_dir):
+        for entry in os.scandir(os.path.join(dataset_dir, f"day={day}")):
+            count += 1
+            latest = max(latest, entry.stat().st_mtime)
+    return count, latest
+
+
+def _dataset(dataset_dir=DATASET_DIR):
+    return ds.dataset(
+        dataset_dir,
+        schema=DATASET_SCHEMA,
+        format="parquet",
+        partitioning=ds.partitioning(pa.schema([("day", pa.string())]), flavor="hive"),
+        filesystem=fs.LocalFileSystem(use_mmap=True),
+    )
+
+
+def _read(dataset_dir, start_day, end_day, columns, condition=None):
+    """날짜 범위 + 조건으로 필요한 컬럼만 arrow Table로 읽기
+
+    날짜 조건은 폴더 단위로 걸러져서 범위 밖 파일은 열지도 않음
+    """
+    if start_day is not None:
+        condition = _and(condition, ds.field("day") >= start_day)
+    if end_day is not None:
+        condition = _and(condition, ds.field("day") <= end_day)
+    return _dataset(dataset_dir).to_table(columns=columns, filter=condition)
+
+
+def _and(condition, other):
+    return other if condition is None else condition & other
+
+
+def _latest(table):
+    """같은 url이 여러 번 쓰였으면 가장 나중 행만 남김"""
+    keys = table.select(["url", "written_at"]).to_pandas()
+    keep = keys.sort_values("written_at").drop_duplicates("url", keep="last").index
+    return table.take(pa.array(keep.to_numpy(), type=pa.int64()))
+
+
+def load(start_day=None, end_day=None, columns=None, dataset_dir=DATASET_DIR):
+    """날짜 범위(YYYY-MM-DD, 양 끝 포함)와 컬럼만 골라서 DataFrame으로 읽기
+
+    같은 기사가 여러 번 쓰였으면(요약 재시도 등) 가장 나중 것만 남김
+    """
+    columns = list(columns or COLUMNS)
+    if not list_days(dataset_dir):
+        return pd.DataFrame(columns=columns)
+
+    df = _read(dataset_dir, start_day, end_day,
+               list(dict.fromkeys(columns + ["url", "기고 날짜", "written_at"]))).to_pandas()
+    df = (df.sort_values("written_at")
+            .drop_duplicates("url", keep="last")
+            .sort_values("기고 날짜", ascending=False)
+            .reset_index(drop=True))
+    return df[columns]
+
+
+def load_contents(urls, start_day=None, end_day=None, dataset_dir=DATASET_DIR):
+    """{url: 본문} (날짜 범위 안에서 urls만 읽음, 같은 기사가 여러 번 쓰였으면 가장 나중 것)"""
+    urls = list(urls)
+    if not urls or not list_days(dataset_dir):
+        return {}
+    table = _latest(_read(dataset_dir, start_day, end_day, ["url", "뉴스 내용", "written_at"],
+                          ds.field("url").isin(urls)))
+    return dict(zip(table["url"].to_pylist(), table["뉴스 내용"].to_pylist()))
+
+
+def load_shared(columns=None, dataset_dir=DATASET_DIR):
+    """여러 세션이 같이 쓰는 읽기 전용 DataFrame (전체 기간, 날짜 최신순, 'day' 컬럼 포함)
+
+    문자열은 arrow 버퍼 그대로(string[pyarrow]) 두어서 행마다 파이썬 객체를 만들지 않고,
+    날짜는 정렬된 category로 바꿔서 날짜당 한 번만 저장함. 기간별 보기는 window()로 복사 없이 잘라 씀
+    """
+    columns = list(dict.fromkeys(list(columns or LIGHT_COLUMNS) + ["day"]))
+    df = load(columns=columns, dataset_dir=dataset_dir)
+    for column in df.columns:
+        if column in ("day", "기고 날짜"):
+            df[column] = pd.Categorical(df[column].astype(str), ordered=True)
+        elif df[column].dtype == object:
+            df[column] = df[column].astype(pd.StringDtype("pyarrow"))
+    # 기고 날짜 최신순 정렬이면 같은 날짜(day)끼리 붙어 있으므로 window()가 이진 탐색으로 자를 수 있음
+    return df.sort_values("day", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def window(shared, start_day=None, end_day=None):
+    """load_shared() 결과에서 날짜 범위(YYYY-MM-DD, 양 끝 포함) 행만 (iloc 슬라이스라 복사 없음)"""
+    days = shared["day"].cat
+    # day 코드는 내림차순이므로 부호를 바꿔서 오름차순으로 찾음
+    codes = -days.codes.to_numpy()
+    low = days.categories.searchsorted(start_day, "left") if start_day is not None else 0
+    high = days.categories.searchsorted(end_day, "right") - 1 if end_day is not None else len(days.categories)
+    first, last = codes.searchsorted(-high, "left"), codes.searchsorted(-low, "right")
+    return shared.iloc[first:last]
+
+
+def top_terms(start_day=None, end_day=None, k=20, urls=None, duplicates=False, dataset_dir=DATASET_DIR):
+    """기간 안(urls를 주면 그 기사들만)의 키워드 빈도 합계 상위 k개 [(키워드, 빈도), ...]
+
+    기사별로 저장해 둔 빈도를 펼쳐서 더하기만 하고 본문은 읽지 않음
+    다시 올라온 같은 기사가 순위를 부풀리지 않도록 기본으로 원본 기사만 셈 (duplicates=True면 전부)
+    """
+    if not list_days(dataset_dir):
+        return []
+    condition = ds.field("url").isin(list(urls)) if urls is not None else None
+    table = _latest(_read(dataset_dir, start_day, end_day,
+                          ["url", "written_at", "키워드", "키워드 빈도", DUPLICATE_COLUMN], condition))
+    # 중복 여부는 기사마다 가장 나중 행으로 판단 (나중에 중복으로 판정됐거나 풀린 기사)
+    if not duplicates:
+        table = table.filter(pc.is_null(table[DUPLICATE_COLUMN]))
+
+    terms = list(pc.list_flatten(table["키워드"]).chunks)
+    counts = list(pc.list_flatten(table["키워드 빈도"]).chunks)
+
+    # 키워드 컬럼이 생기기 전에 쓴 파일의 기사만 본문을 읽어서 셈
+    if table["키워드"].null_count:
+        missing_urls = table.filter(pc.is_null(table["키워드"]))["url"]
+        old = _latest(_read(dataset_dir, start_day, end_day, ["url", "written_at", "뉴스 제목", "뉴스 내용"],
+                            ds.field("url").isin(missing_urls.to_pylist())))
+        for title, content in zip(old["뉴스 제목"].to_pylist(), old["뉴스 내용"].to_pylist()):
+            old_terms, old_counts = term_counts(title, content)
+            terms.append(pa.array(old_terms, type=pa.string()))
+            counts.append(pa.array(old_counts, type=pa.int32()))
+
+    flat = pa.table({
+        "term": pa.chunked_array(terms, type=pa.string()),
+        "count": pa.chunked_array(counts, type=pa.int32()),
+    })
+    ranking = (flat.group_by("term").aggregate([("count", "sum")])
+                   .sort_by([("count_sum", "descending"), ("term", "ascending")])
+                   .slice(0, k))
+    return list(zip(ranking["term"].to_pylist(), ranking["count_sum"].to_pylist()))
+
+
+def load_terms(start_day=None, end_day=None, dataset_dir=DATASET_DIR):
+    """기간 안 원본 기사(중복 제외)의 저장된 키워드 빈도
+
+    DataFrame [url, day, 기고 날짜, 뉴스 제목, 키워드, 키워드 빈도] (키워드는 빈도 높은 순 배열)
+    키워드 컬럼이 생기기 전에 쓴 기사만 본문을 읽어서 셈
+    """
+    columns = ["url", "day", "기고 날짜", "뉴스 제목", "키워드", "키워드 빈도"]
+    if not list_days(dataset_dir):
+        return pd.DataFrame(columns=columns)
+    table = _latest(_read(dataset_dir, start_day, end_day, columns + ["written_at", DUPLICATE_COLUMN]))
+    table = table.filter(pc.is_null(table[DUPLICATE_COLUMN]))
+    df = table.select(columns).to_pandas()
+    missing = df["키워드"].isna()
+    if missing.any():
+        old = _latest(_read(dataset_dir, start_day, end_day, ["url", "written_at", "뉴스 내용"],
+                            ds.field("url").isin(df.loc[missing, "url"].tolist())))
+        contents = dict(zip(old["url"].to_pylist(), old["뉴스 내용"].to_pylist()))
+        counted = [term_counts(title, contents.get(url))
+                   for url, title in zip(df.loc[missing, "url"], df.loc[missing, "뉴스 제목"])]
+        df.loc[missing, "키워드"] = pd.Series([terms for terms, _ in counted], index=df.index[missing])
+        df.loc[missing, "키워드 빈도"] = pd.Series([counts for _, counts in counted], index=df.index[missing])
+    return df.reset_index(drop=True)
+
+
+def import_store(store, dataset_dir=DATASET_DIR):
+    """SQLite 저장소에만 있던 기사를 데이터셋으로 옮김 (데이터셋이 비어 있을 때 한 번)"""
+    if list_days(dataset_dir):
+        return 0
+    records = store.records()
+    if records:
+        write_records(records, dataset_dir)
+    return len(records)
+
+
+def export_excel(sheets):
+    """{'시트 이름': DataFrame} -> 엑셀 파일 bytes"""
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine="openpyxl") as writer:
+        for name, sheet_df in sheets.items():
+            sheet_df.to_excel(writer, index=False, sheet_name=name)
+    return output.getvalue()
@@ -0,0 +1,139 @@
+# 거의 같은 기사 찾기 (MinHash + LSH, SQLite)
+# KBS는 같은 국제 기사를 조금 고쳐서 다른 페이지/날짜에 다시 올리므로, 요약하기 전에
+# 본문의 글자 5-gram 집합을 MinHash 서명으로 만들어 이미 본 기사와 비슷한지 확인함
+# 서명을 띠(band)로 나눠 버킷에 넣어 두면(LSH) 비슷한 후보만 바로 찾을 수 있어서
+# 저장된 기사가 늘어나도 조회 시간이 거의 그대로임
+
+import random
+import sqlite3
+import threading
+import zlib
+import numpy as np
+from kbs_config import data_path
+from kbs_text import clean_content
+
+DEDUP_PATH = data_path("dedup.sqlite3")
+SHINGLE = 5          # 글자 n-gram 길이
+NUM_PERM = 64        # MinHash 해시 함수 수 (= 서명 길이)
+BANDS = 16           # LSH 띠 수 (띠 하나 = NUM_PERM // BANDS 개 값)
+THRESHOLD = 0.8      # 추정 자카드 유사도가 이 이상이면 같은 기사로 봄
+MIN_CHARS = 200      # 이보다 짧은 본문(본문을 거의 못 찾은 페이지 등)은 비교하지 않음
+
+_PRIME = (1 << 31) - 1
+_rng = random.Random(20240101)  # 실행마다 같은 해시 함수를 써야 저장된 서명과 비교 가능
+_A = np.array([_rng.randrange(1, _PRIME) for _ in range(NUM_PERM)], dtype=np.uint64)
+_B = np.array([_rng.randrange(0, _PRIME) for _ in range(NUM_PERM)], dtype=np.uint64)
+ROWS = NUM_PERM // BANDS
+
+
+def shingles(text):
+    """공통 문구를 빼고 공백을 없앤 본문의 글자 SHINGLE-gram 집합"""
+    text = "".join((clean_content(text) or "").split())
+    return {text[i:i + SHINGLE] for i in range(len(text) - SHINGLE + 1)}
+
+
+def signature(text):
+    """본문 -> MinHash 서명 (uint32 NUM_PERM개), 너무 짧으면 None"""
+    if not text or len(text) < MIN_CHARS:
+        return None
+    grams = shingles(text)
+    if not grams:
+        return None
+    hashes = np.array([zlib.crc32(gram.encode("utf-8")) % _PRIME for gram in grams], dtype=np.uint64)
+    # 해시 함수 i: (a_i * x + b_i) mod p 의 최솟값
+    values = (np.outer(_A, hashes) + _B[:, None]) % _PRIME
+    return values.min(axis=1).astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+    """두 서명의 추정 자카드 유사도 (같은 자리 값이 같은 비율)"""
+    return float(np.mean(sig_a == sig_b))
+
+
+def bands(sig):
+    return [(band, sig[band * ROWS:(band + 1) * ROWS].tobytes()) for band in range(BANDS)]
+
+
+class DuplicateIndex:
+    """원본 기사들의 서명 + LSH 버킷 (여러 스레드에서 같이 써도 됨)"""
+
+    def __init__(self, path=DEDUP_PATH, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS signatures (
+                url TEXT PRIMARY KEY,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (
+                band INTEGER NOT NULL,
+                bucket BLOB NOT NULL,
+                url TEXT NOT NULL,
+                PRIMARY KEY (band, bucket, url)
+            ) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+
+    def _find(self, sig, exclude=None):
+        clauses = " OR ".join("(band = ? AND bucket = ?)" for _ in range(BANDS))
+        params = [value for pair in bands(sig) for value in pair]
+        candidates = self.conn.execute(
+            f"SELECT s.url, s.signature FROM signatures s WHERE s.url IN "
+            f"(SELECT url FROM buckets WHERE {clauses})", params
+        ).fetchall()
+        best = None
+        for url, blob in candidates:
+            if url == exclude:
+                continue
+            score = similarity(sig, np.frombuffer(blob, dtype=np.uint32))
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (url, score)
+        return best
+
+    def _add(self, url, sig):
+        self.conn.execute("INSERT OR REPLACE INTO signatures (url, signature) VALUES (?, ?)", (url, sig.tobytes()))
+        self.conn.executemany("INSERT OR IGNORE INTO buckets (band, bucket, url) VALUES (?, ?, ?)",
+                              [(band, bucket, url) for band, bucket in bands(sig)])
+
+    def match_or_add(self, url, content):
+        """비슷한 원본 기사가 있으면 (원본 url, 유사도), 없으면 이 기사를 원본으로 등록하고 None
+
+        찾기와 등록을 한 번에 해서 같은 기사가 동시에 들어와도 하나만 원본이 됨
+        """
+        sig = signature(content)
+        if sig is None:
+            return None
+        with self.lock:
+            found = self._find(sig, exclude=url)
+            if found is None:
+                self._add(url, sig)
+                self.conn.commit()
+            return found
+
+    def add_records(self, records):
+        """기사(dict 목록)를 원본으로 등록, 이미 있는 원본과 겹치는 기사는 넣지 않음"""
+        added = 0
+        with self.lock:
+            for record in records:
+                if record.get("duplicate_of"):
+                    continue
+                sig = signature(record["content"])
+                if sig is None or self._find(sig, exclude=record["url"]) is not None:
+                    continue
+                self._add(record["url"], sig)
+                added += 1
+            self.conn.commit()
+        return added
+
+
+def index_store(index, store):
+    """SQLite 저장소의 기사로 색인을 채움 (색인이 비어 있을 때 한 번, 먼저 수집한 기사가 원본)"""
+    if index.count():
+        return 0
+    return index.add_records(store.records())
@@ -0,0 +1,140 @@
+# KBS 뉴스 상세 페이지 수집
+# 목록/날짜 이동은 Selenium, 상세 페이지는 HTTP 커넥션 풀로 동시에 가져오기
+# archive(kbs_archive.PageArchive)를 주면 받은 HTML을 파싱하기 전에 보관소에 저장
+# hosts(kbs_hosts.HostLimiter)를 주면 호스트별 동시 요청 수/간격을 지켜서 요청
+# 목록처럼 다시 받는 페이지는 conditional_get으로 ETag/Last-Modified를 보내서 바뀐 것만 받음 (kbs_cache.HttpCache)
+
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from kbs_archive import DETAIL
+from kbs_metrics import metrics, FETCH_DETAIL, PARSE_DETAIL, RETRY
+from kbs_parse import parse_content
+from kbs_sources import DEFAULT_SOURCE
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+}
+
+
+def make_session(pool_size=8):
+    """keep-alive 커넥션을 재사용하는 requests 세션 생성"""
+    session = requests.Session()
+    retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HEADERS)
+    return session
+
+
+def conditional_get(session, url, cache, timeout=10, hosts=None):
+    """캐시에 검증값이 있으면 If-None-Match/If-Modified-Since를 붙여서 GET -> 본문 (404면 None)
+
+    304면 캐시의 본문을, 200이면 새 본문을 캐시에 넣고 반환. 그 밖의 오류는 requests.HTTPError
+    """
+    def get(headers):
+        if hosts is not None:
+            return hosts.get(url, timeout, headers=headers)
+        return session.get(url, timeout=timeout, headers=headers)
+
+    headers = {}
+    validators = cache.validators(url)
+    if validators is not None:
+        etag, last_modified = validators
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    response = get(headers)
+    if response.status_code == 304:
+        text = cache.body(url)
+        if text is not None:
+            return text
+        response = get({})  # 그 사이 캐시에서 지워졌으면 조건 없이 다시
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    cache.put(url, response.headers.get("ETag"), response.headers.get("Last-Modified"), response.text)
+    return response.text
+
+
+def fetch_content(session, url, timeout=10, archive=None, hosts=None, selector=None, source=DEFAULT_SOURCE):
+    """HTTP로 상세 페이지를 받아 본문 추출 (실패하면 None, selector는 본문 선택자, source는 보관소에 남길 소스 이름)"""
+    try:
+        with metrics.span(FETCH_DETAIL):
+            response = hosts.get(url, timeout) if hosts is not None else session.get(url, timeout=timeout)
+            response.raise_for_status()
+    except requests.RequestException as e:
+        metrics.error(FETCH_DETAIL, e)
+        return None
+    # 커넥션 풀(urllib3 Retry)이 안에서 다시 시도한 횟수
+    retries = getattr(getattr(response.raw, "retries", None), "history", ())
+    metrics.count(FETCH_DETAIL, RETRY, len(retries))
+    if archive is not None:
+        archive.put(DETAIL, url, response.text, source=source)
+    with metrics.span(PARSE_DETAIL):
+        return parse_content(response.text, selector=selector)
+
+
+def fetch_with_browser(driver, url, timeout=10, archive=None, hosts=None, selector=None, source=DEFAULT_SOURCE):
+    """JS 렌더링이 필요한 페이지만 기존 방식대로 새 탭에서 열어서 본문 추출"""
+    # selenium은 브라우저를 쓸 때만 필요 (kbs_scrape처럼 requests만 쓰는 곳은 selenium 없이 import)
+    from kbs_wait import wait_content
+
+    metrics.count(FETCH_DETAIL, RETRY)
+    try:
+        with metrics.span(FETCH_DETAIL), hosts.slot(url) if hosts is not None else nullcontext():
+            driver.execute_script("window.open(arguments[0], '_blank');", url)
+            driver.switch_to.window(driver.window_handles[-1])
+            if wait_content(driver, timeout, selector=selector) is None:
+                return None
+            html = driver.page_source
+        if archive is not None:
+            archive.put(DETAIL, url, html, source=source)
+        with metrics.span(PARSE_DETAIL):
+            return parse_content(html, selector=selector)
+    except Exception as e:
+        metrics.error(FETCH_DETAIL, e)
+        return None
+    finally:
+        if len(driver.window_handles) > 1:
+            driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+
+
+def fetch_details(urls, session=None, driver=None, max_workers=8, archive=None, hosts=None, selector=None,
+                  source=DEFAULT_SOURCE):
+    """상세 페이지 URL 목록 -> {url: 본문} (받지 못했거나 본문을 찾지 못한 페이지는 None)
+
+    HTTP로 최대 max_workers개씩 동시에 가져오고 (hosts가 있으면 호스트별 상한/간격도 지킴),
+    본문을 찾지 못한 페이지만 driver가 있으면 브라우저로 다시 시도
+    """
+    if not urls:
+        return {}
+
+    own_session = session is None
+    if own_session:
+        session = make_session(max_workers)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            contents = list(executor.map(
+                lambda url: fetch_content(session, url, archive=archive, hosts=hosts, selector=selector,
+                                          source=source), urls))
+    finally:
+        if own_session:
+            session.close()
+
+    results = {}
+    for url, content in zip(urls, contents):
+        if content is None and driver is not None:
+            content = fetch_with_browser(driver, url, archive=archive, hosts=hosts, selector=selector,
+                                         source=source)
+        if content is None:
+            metrics.error(PARSE_DETAIL, LookupError(f"본문 없음: {url}"))
+        results[url] = content or None
+    return results
@@ -0,0 +1,176 @@
+# 호스트별 요청 예절 (동시 요청 수 제한, robots.txt, 응답에 맞춘 간격 조절)
+# 여러 소스를 같이 수집해도 한 사이트에 요청이 몰리지 않게 요청은 모두 HostLimiter.slot()을 거쳐서 보냄
+#   - 호스트마다 동시 요청은 limit개까지 (처음에는 HOST_CONCURRENCY, 상황에 따라 줄었다 늘었다 함)
+#   - 요청 시작 간격은 interval초 이상 (robots.txt에 Crawl-delay가 있으면 그 값 밑으로는 안 내려감)
+#   - 429/503/연결 오류면 limit은 절반, interval은 두 배 (Retry-After가 있으면 그때까지 쉼)
+#   - 응답 시간 이동 평균이 가장 빨랐던 때의 SLOW_FACTOR배를 넘으면 interval을 조금 늘리고,
+#     정상이면 interval은 조금씩 줄이고 limit은 조금씩 늘림 (AIMD)
+# 한 호스트가 느려져도 그 호스트의 요청만 기다리고 다른 호스트 요청은 그대로 나감
+
+import email.utils
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+from kbs_config import HOST_CONCURRENCY, RESPECT_ROBOTS
+from kbs_metrics import metrics, FETCH_DETAIL, RETRY
+from kbs_sources import host_of
+
+THROTTLED = {429, 503}
+THROTTLE_RETRIES = 2    # 429/503을 받은 요청을 간격을 늘려서 다시 보낼 횟수
+MIN_BACKOFF = 1.0       # 429/503을 받으면 간격을 최소 이만큼(초)으로
+MAX_INTERVAL = 30.0     # 간격 상한(초)
+MAX_RETRY_AFTER = 120.0  # Retry-After를 따르는 최대 시간(초)
+INTERVAL_STEP = 0.05    # 느려졌을 때 늘리는 간격(초)
+RECOVER = 0.8           # 정상 응답마다 간격에 곱하는 값
+MIN_INTERVAL = 0.01     # 이보다 작아진 간격은 0으로
+SLOW_FACTOR = 3.0
+EWMA = 0.2              # 응답 시간 이동 평균 가중치
+ROBOTS_TIMEOUT = 10
+
+
+def retry_after_seconds(value):
+    """Retry-After 헤더(초 또는 HTTP 날짜) -> 초, 없거나 읽을 수 없으면 None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostLimiter:
+    """호스트별 동시 요청 수/간격 + robots.txt (여러 스레드에서 같이 써도 됨)
+
+    session은 robots.txt와 get()에 쓰는 requests 세션 (User-Agent도 여기서 가져옴)
+    """
+
+    def __init__(self, session, max_per_host=HOST_CONCURRENCY, respect_robots=RESPECT_ROBOTS):
+        self.session = session
+        self.max_per_host = max(1, max_per_host)
+        self.respect_robots = respect_robots
+        self.user_agent = session.headers.get("User-Agent", "*")
+        self.condition = threading.Condition()
+        self.hosts = {}  # 호스트 -> 상태 dict
+        self.robots = {}  # "scheme://호스트" -> [잠금, RobotFileParser 또는 None]
+        self.robots_lock = threading.Lock()
+
+    def _state(self, host):
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = {
+                "limit": float(self.max_per_host), "interval": 0.0, "floor": 0.0, "next_at": 0.0,
+                "in_flight": 0, "latency": None, "best": None, "throttled": 0,
+            }
+        return state
+
+    # ---- 요청 자리 ----
+
+    @contextmanager
+    def slot(self, url):
+        """with limiter.slot(url): 그 호스트에 자리가 나고 간격이 지날 때까지 기다렸다가 요청 하나"""
+        with self.condition:
+            state = self._state(host_of(url))
+            while state["in_flight"] >= int(state["limit"]):
+                self.condition.wait()
+            state["in_flight"] += 1
+            start = max(time.monotonic(), state["next_at"])
+            state["next_at"] = start + state["interval"]
+        try:
+            delay = start - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            yield
+        finally:
+            with self.condition:
+                state["in_flight"] -= 1
+                self.condition.notify_all()
+
+    def record(self, url, status, seconds, retry_after=None):
+        """응답 하나 반영 (status가 None이면 연결 오류/타임아웃)"""
+        with self.condition:
+            state = self._state(host_of(url))
+            if status is None or status in THROTTLED:
+                state["throttled"] += 1
+                state["limit"] = max(1.0, state["limit"] / 2)
+                state["interval"] = min(MAX_INTERVAL, max(state["interval"] * 2, MIN_BACKOFF))
+                wait = retry_after_seconds(retry_after)
+                if wait:
+                    state["next_at"] = max(state["next_at"], time.monotonic() + min(wait, MAX_RETRY_AFTER))
+            else:
+                latency = seconds if state["latency"] is None else (1 - EWMA) * state["latency"] + EWMA * seconds
+                state["latency"] = latency
+                state["best"] = latency if state["best"] is None else min(state["best"], latency)
+                if latency > SLOW_FACTOR * state["best"]:
+                    state["interval"] = min(MAX_INTERVAL, state["interval"] + INTERVAL_STEP)
+                else:
+                    interval = state["interval"] * RECOVER
+                    state["interval"] = max(state["floor"], interval if interval >= MIN_INTERVAL else 0.0)
+                    state["limit"] = min(float(self.max_per_host), state["limit"] + 1 / state["limit"])
+            self.condition.notify_all()
+
+    def get(self, url, timeout=10, stage=FETCH_DETAIL, headers=None):
+        """호스트 제한을 지켜서 GET (429/503이면 늘어난 간격으로 THROTTLE_RETRIES번까지 다시 보냄)"""
+        for attempt in range(THROTTLE_RETRIES + 1):
+            with self.slot(url):
+                started = time.perf_counter()
+                try:
+                    response = self.session.get(url, timeout=timeout, headers=headers)
+                except Exception:
+                    self.record(url, None, time.perf_counter() - started)
+                    raise
+            self.record(url, response.status_code, time.perf_counter() - started,
+                        response.headers.get("Retry-After"))
+            if response.status_code not in THROTTLED or attempt == THROTTLE_RETRIES:
+                return response
+            response.close()
+            metrics.count(stage, RETRY)
+
+    # ---- robots.txt ----
+
+    def allowed(self, url):
+        """robots.txt가 이 주소를 허용하는지 (호스트마다 처음 한 번만 받아 둠)"""
+        if not self.respect_robots:
+            return True
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self.robots_lock:
+            entry = self.robots.setdefault(origin, [threading.Lock(), None])
+        with entry[0]:
+            if entry[1] is None:
+                entry[1] = self._load_robots(origin)
+        return entry[1].can_fetch(self.user_agent, url)
+
+    def _load_robots(self, origin):
+        """robots.txt 읽기 (urllib.robotparser와 같은 규칙: 401/403이면 전부 금지, 그 밖의 4xx/오류면 전부 허용)"""
+        parser = RobotFileParser(f"{origin}/robots.txt")
+        try:
+            response = self.get(parser.url, timeout=ROBOTS_TIMEOUT)
+        except Exception:
+            parser.allow_all = True
+            return parser
+        if response.status_code in (401, 403):
+            parser.disallow_all = True
+        elif response.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(response.text.splitlines())
+            delay = parser.crawl_delay(self.user_agent)
+            if delay:
+                with self.condition:
+                    state = self._state(host_of(origin))
+                    state["floor"] = float(delay)
+                    state["interval"] = max(state["interval"], state["floor"])
+        return parser
+
+    def summary(self):
+        """[{'호스트', '동시 요청', '간격(초)', '평균 응답(초)', '감속'}, ...]"""
+        with self.condition:
+            return [{"호스트": host, "동시 요청": int(state["limit"]), "간격(초)": round(state["interval"], 2),
+                     "평균 응답(초)": round(state["latency"] or 0.0, 3), "감속": state["throttled"]}
+                    for host, state in self.hosts.items()]
@@ -0,0 +1,171 @@
+# 단계별 실행 시간/횟수 기록
+# 크롤링 한 번을 목록 로딩 -> 목록 파싱 -> 상세 수집 -> 상세 파싱 -> 중복 확인 -> 요약 -> 저장 단계로 나눠서
+# 단계마다 걸린 시간(span)과 재시도/건너뜀/오류 횟수를 모으고, 실행이 끝나면 파일로 내보냄
+#   data/metrics/spans.jsonl : 실행마다 span/카운터/오류를 한 줄씩 추가 (대시보드 '성능' 탭에서 읽음)
+#   data/metrics/kbs.prom    : 마지막 실행의 Prometheus 텍스트 형식 (node_exporter textfile 수집용)
+
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from kbs_config import data_path
+
+LOAD_LISTING = "목록 로딩"
+PARSE_LISTING = "목록 파싱"
+FETCH_DETAIL = "상세 수집"
+PARSE_DETAIL = "상세 파싱"
+DEDUP = "중복 확인"
+SUMMARIZE = "요약"
+STORE = "저장"
+STAGES = [LOAD_LISTING, PARSE_LISTING, FETCH_DETAIL, PARSE_DETAIL, DEDUP, SUMMARIZE, STORE]
+
+# 카운터 종류
+RETRY = "재시도"
+SKIP = "건너뜀"
+ERROR = "오류"
+
+SPANS_PATH = data_path("metrics", "spans.jsonl")
+PROMETHEUS_PATH = data_path("metrics", "kbs.prom")
+# Prometheus 히스토그램 구간(초)
+BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+MAX_ERRORS = 100  # 실행 하나에서 메시지까지 남길 오류 수
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[max(0, math.ceil(p * len(values)) - 1)]
+
+
+class Metrics:
+    """여러 스레드에서 같이 써도 되는 span/카운터 기록"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.run_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+            self.started = time.time()
+            self.spans = []      # (단계, 시작 시각, 걸린 시간(초), 성공 여부)
+            self.counters = {}   # (단계, 종류) -> 횟수
+            self.errors = []     # (시각, 단계, 메시지)
+
+    @contextmanager
+    def span(self, stage):
+        """with metrics.span(단계): 블록에 걸린 시간 기록
+
+        예외가 나면 실패한 span으로 남기고 그대로 올림 (오류 횟수/메시지는 잡는 쪽에서 error()로 기록)
+        """
+        start = time.time()
+        began = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record(stage, start, time.perf_counter() - began, ok=False)
+            raise
+        self.record(stage, start, time.perf_counter() - began)
+
+    def record(self, stage, start, seconds, ok=True):
+        with self.lock:
+            self.spans.append((stage, start, seconds, ok))
+
+    def count(self, stage, kind, amount=1):
+        if not amount:
+            return
+        with self.lock:
+            self.counters[(stage, kind)] = self.counters.get((stage, kind), 0) + amount
+
+    def error(self, stage, error):
+        """오류 횟수 + 메시지 기록 (except에서 넘기는 오류도 여기로 남김)"""
+        self.count(stage, ERROR)
+        with self.lock:
+            if len(self.errors) < MAX_ERRORS:
+                self.errors.append((time.time(), stage, f"{type(error).__name__}: {error}"))
+
+    def summary(self):
+        """[{'단계', '횟수', 'p50(초)', 'p95(초)', '최대(초)', '합계(초)', '재시도', '건너뜀', '오류'}, ...]"""
+        with self.lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+        stages = [stage for stage in STAGES if any(span[0] == stage for span in spans)
+                  or any(key[0] == stage for key in counters)]
+        rows = []
+        for stage in stages:
+            values = [span[2] for span in spans if span[0] == stage]
+            rows.append({
+                "단계": stage,
+                "횟수": len(values),
+                "p50(초)": round(percentile(values, 0.5), 3),
+                "p95(초)": round(percentile(values, 0.95), 3),
+                "최대(초)": round(max(values, default=0), 3),
+                "합계(초)": round(sum(values), 2),
+                RETRY: counters.get((stage, RETRY), 0),
+                SKIP: counters.get((stage, SKIP), 0),
+                ERROR: counters.get((stage, ERROR), 0),
+            })
+        return rows
+
+    # ---- 내보내기 ----
+
+    def export_jsonl(self, path=SPANS_PATH):
+        """이번 실행 기록을 JSONL에 추가 (줄마다 type = span / counter / error)"""
+        with self.lock:
+            lines = [{"run": self.run_id, "type": "span", "stage": stage, "start": start,
+                      "seconds": round(seconds, 6), "ok": ok}
+                     for stage, start, seconds, ok in self.spans]
+            lines += [{"run": self.run_id, "type": "counter", "stage": stage, "kind": kind, "value": value}
+                      for (stage, kind), value in self.counters.items()]
+            lines += [{"run": self.run_id, "type": "error", "time": at, "stage": stage, "message": message}
+                      for at, stage, message in self.errors]
+        with open(path, "a", encoding="utf-8") as f:
+            for line in lines:
+                f.write(json.dumps(line, ensure_ascii=False) + "\n")
+
+    def export_prometheus(self, path=PROMETHEUS_PATH):
+        """이번 실행을 Prometheus 텍스트 형식으로 저장 (임시 파일에 쓰고 바꿔치기)"""
+        with self.lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+        out = ["# HELP kbs_stage_seconds 크롤링 단계별 걸린 시간", "# TYPE kbs_stage_seconds histogram"]
+        for stage in STAGES:
+            values = [span[2] for span in spans if span[0] == stage]
+            if not values:
+                continue
+            for bound in BUCKETS:
+                out.append(f'kbs_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} '
+                           f'{sum(1 for value in values if value <= bound)}')
+            out.append(f'kbs_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {len(values)}')
+            out.append(f'kbs_stage_seconds_sum{{stage="{stage}"}} {sum(values):.6f}')
+            out.append(f'kbs_stage_seconds_count{{stage="{stage}"}} {len(values)}')
+        out += ["# HELP kbs_stage_events_total 단계별 재시도/건너뜀/오류 횟수", "# TYPE kbs_stage_events_total counter"]
+        for (stage, kind), value in sorted(counters.items()):
+            out.append(f'kbs_stage_events_total{{stage="{stage}",kind="{kind}"}} {value}')
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(out) + "\n")
+        os.replace(tmp, path)
+
+
+metrics = Metrics()
+
+
+def load_runs(path=SPANS_PATH):
+    """spans.jsonl -> {실행 id: {'spans': [...], 'counters': [...], 'errors': [...]}} (기록된 순서)"""
+    runs = {}
+    if not os.path.exists(path):
+        return runs
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            run = runs.setdefault(record["run"], {"spans": [], "counters": [], "errors": []})
+            run[record["type"] + "s"].append(record)
+    return runs
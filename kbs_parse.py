@@ -0,0 +1,154 @@
+# HTML 추출 (파서 교체 가능)
+# 필요한 부분(목록 영역, 본문 영역)만 파싱해서 제목/날짜/링크/본문을 뽑음
+#
+# 백엔드
+#   html.parser : 파이썬 기본 파서 (설치 필요 없음, 가장 느림)
+#   lxml        : C로 만든 lxml 파서 (pip install lxml)
+#   selectolax  : C 기반 CSS 선택자 엔진 (pip install selectolax, 가장 빠름)
+# 기본값은 설치된 것 중 가장 빠른 것, .env의 KBS_PARSER로 고정 가능
+# 선택자는 기본이 KBS이고, 다른 소스(kbs_sources)는 selectors/selector로 넘김 (그때는 부분 파싱 필터 없이 전체 파싱)
+
+import os
+import re
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+try:
+    from selectolax.parser import HTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+KBS_HOST = "https://news.kbs.co.kr"
+LISTING_ITEMS = ".box-contents.has-wrap .box-content"
+CONTENT = "#cont_newstext"
+
+# 부분 파싱용 필터: 목록 묶음 / 본문 영역만 트리로 만듦
+# (부분 파싱 필터는 class 속성 문자열 전체와 비교하므로 "box-contents has-wrap"도 맞도록 정규식 사용)
+LISTING_STRAINER = SoupStrainer(class_=re.compile(r"(^|\s)box-contents(\s|$)"))
+CONTENT_STRAINER = SoupStrainer(id="cont_newstext")
+LISTING_SELECTORS = {"items": LISTING_ITEMS, "link": None, "title": ".title", "date": ".field-writer .date"}
+
+
+def available_backends():
+    backends = ["html.parser"]
+    if HAS_LXML:
+        backends.append("lxml")
+    if HAS_SELECTOLAX:
+        backends.append("selectolax")
+    return backends
+
+
+def default_backend():
+    wanted = os.getenv("KBS_PARSER", "auto")
+    if wanted != "auto":
+        if wanted not in available_backends():
+            raise ValueError(f"설치되지 않은 파서입니다: {wanted} (사용 가능: {available_backends()})")
+        return wanted
+    return available_backends()[-1]
+
+
+BACKEND = default_backend()
+
+
+# ---- 목록 페이지 ----
+
+def _listing_soup(html, backend, current_date, base_url, selectors):
+    strainer = LISTING_STRAINER if selectors["items"] == LISTING_ITEMS else None
+    soup = BeautifulSoup(html, backend, parse_only=strainer)
+    items = []
+    # 부분 파싱 결과에는 바깥 div가 루트로 남으므로 그 안에서 기사만 찾음
+    for item in soup.select(selectors["items"]):
+        link_elem = item.select_one(selectors["link"]) if selectors["link"] else item
+        link = link_elem.get("href") if link_elem else None
+        if not link:
+            continue
+
+        title_elem = item.select_one(selectors["title"])
+        title = title_elem.text.strip() if title_elem else "제목 없음"
+
+        date_elem = item.select_one(selectors["date"]) if selectors["date"] else None
+        date = date_elem.text.strip() if date_elem else current_date
+
+        items.append({"url": urljoin(base_url, link), "title": title, "date": date})
+    return items
+
+
+def _listing_selectolax(html, current_date, base_url, selectors):
+    tree = HTMLParser(html)
+    items = []
+    for item in tree.css(selectors["items"]):
+        link_elem = item.css_first(selectors["link"]) if selectors["link"] else item
+        link = link_elem.attributes.get("href") if link_elem else None
+        if not link:
+            continue
+
+        title_elem = item.css_first(selectors["title"])
+        title = title_elem.text().strip() if title_elem else "제목 없음"
+
+        date_elem = item.css_first(selectors["date"]) if selectors["date"] else None
+        date = date_elem.text().strip() if date_elem else current_date
+
+        items.append({"url": urljoin(base_url, link), "title": title, "date": date})
+    return items
+
+
+def parse_listing(html, current_date, backend=None, base_url=KBS_HOST, selectors=None):
+    """목록 페이지 HTML -> [{'url', 'title', 'date'}, ...] (링크는 base_url 기준 절대 주소)
+
+    selectors는 {'items', 'link', 'title', 'date'} (없으면 KBS), 날짜를 못 찾으면 current_date
+    """
+    backend = backend or BACKEND
+    selectors = dict(LISTING_SELECTORS, **(selectors or {}))
+    if backend == "selectolax":
+        return _listing_selectolax(html, current_date, base_url, selectors)
+    return _listing_soup(html, backend, current_date, base_url, selectors)
+
+
+# ---- 상세 페이지 ----
+
+def parse_content(html, backend=None, selector=None):
+    """상세 페이지 HTML에서 본문(selector, 기본은 #cont_newstext) 추출, 없으면 None"""
+    backend = backend or BACKEND
+    selector = selector or CONTENT
+    if backend == "selectolax":
+        content_elem = HTMLParser(html).css_first(selector)
+        text = content_elem.text() if content_elem else None
+    else:
+        soup = BeautifulSoup(html, backend, parse_only=CONTENT_STRAINER if selector == CONTENT else None)
+        content_elem = soup.select_one(selector)
+        text = content_elem.text if content_elem else None
+    if text is None:
+        return None
+    return text.strip() or None
+
+
+# ---- 상품 목록 (b4_* 연습 사이트) ----
+
+def parse_products(html, backend=None):
+    """.product 목록 -> [[카테고리, 상품명, 상세페이지 링크, 가격], ...]"""
+    backend = backend or BACKEND
+    rows = []
+    if backend == "selectolax":
+        for item in HTMLParser(html).css(".product"):
+            category = item.css_first(".product-category").text()
+            name = item.css_first(".product-name").text()
+            link = item.css_first(".product-name > a").attributes["href"]
+            price = item.css_first(".product-price").text()
+            rows.append([category, name, link, price.split("원")[0].replace(",", "")])
+        return rows
+
+    soup = BeautifulSoup(html, backend, parse_only=SoupStrainer(class_="product"))
+    for item in soup.select(".product"):
+        category = item.select_one(".product-category").text
+        name = item.select_one(".product-name").text
+        link = item.select_one(".product-name > a").attrs["href"]
+        price = item.select_one(".product-price").text
+        rows.append([category, name, link, price.split("원")[0].replace(",", "")])
+    return rows
@@ -0,0 +1,195 @@
+# 페이지 번호로 넘기는 목록 수집기 (b4_4 방식: ?page=1, 2, 3 ...)
+# keep-alive 커넥션 풀로 여러 페이지를 동시에 받고, 마지막 페이지는 알아서 찾고, 행은 받는 대로 파일에 씀
+#   - 첫 페이지의 페이지 링크(page=N) 중 가장 큰 번호까지는 한꺼번에 받고, 그 뒤는 1, 2, 4 ... 개씩 늘려가며
+#     확인해서 빈 페이지(또는 404)가 나오면 끝 (페이지 링크가 마지막 페이지를 보여주면 헛요청은 한 번)
+#   - 페이지는 ETag/Last-Modified로 조건부 요청 (kbs_cache.HttpCache), 안 바뀐 페이지는 304라 본문을 다시 안 받음
+#   - 호스트별 동시 요청 수/간격/robots.txt는 kbs_hosts.HostLimiter
+#   - 행은 columns의 타입대로 바꿔서 (가격은 int) 페이지 순서대로 .csv / .jsonl / .xlsx 에 바로 씀
+#
+#   python kbs_scrape.py data/products.csv --workers 8
+
+import argparse
+import csv
+import json
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+try:
+    import openpyxl
+    HAS_OPENPYXL = True
+except ImportError:
+    HAS_OPENPYXL = False
+
+from kbs_cache import HttpCache
+from kbs_fetch import make_session, conditional_get
+from kbs_hosts import HostLimiter
+from kbs_parse import parse_products
+
+PRODUCTS_URL = "https://startcoding.pythonanywhere.com/basic?keyword="
+# parse_products 행의 (컬럼 이름, 타입)
+PRODUCT_COLUMNS = [("카테고리", str), ("상품명", str), ("상세페이지 링크", str), ("가격", int)]
+PAGE_PARAM = "page"
+MAX_WORKERS = 8
+
+
+def page_url(url, page, page_param=PAGE_PARAM):
+    """url의 page_param 값을 page로 바꾼 주소 (다른 파라미터는 그대로)"""
+    parts = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != page_param]
+    return urlunsplit(parts._replace(query=urlencode([(page_param, page)] + query)))
+
+
+def last_page_hint(html, page_param=PAGE_PARAM):
+    """페이지 안의 링크에 나온 가장 큰 페이지 번호 (없으면 0)"""
+    return max((int(n) for n in re.findall(rf"[?&;]{re.escape(page_param)}=(\d+)", html)), default=0)
+
+
+def to_int(value):
+    """'12,900원' -> 12900 (숫자가 없으면 None)"""
+    if isinstance(value, int):
+        return value
+    digits = re.sub(r"[^\d-]", "", str(value))
+    try:
+        return int(digits)
+    except ValueError:
+        return None
+
+
+CONVERTERS = {
+    int: to_int,
+    float: lambda value: float(str(value).replace(",", "")),
+    str: lambda value: str(value).strip(),
+}
+
+
+def typed(row, columns):
+    """문자열 행 -> columns 타입대로 바꾼 튜플"""
+    return tuple(CONVERTERS[kind](value) for (_, kind), value in zip(columns, row))
+
+
+def scrape_pages(url, parse=parse_products, columns=PRODUCT_COLUMNS, page_param=PAGE_PARAM,
+                 max_workers=MAX_WORKERS, max_pages=None, session=None, cache=None, hosts=None, timeout=10):
+    """(페이지 번호, 타입을 맞춘 행 목록)을 페이지 순서대로 내보내는 제너레이터
+
+    parse(html)는 문자열 행 목록을 돌려주는 함수, 행이 없는 페이지가 나오면 그 앞에서 끝남.
+    robots.txt가 막은 주소면 PermissionError
+    """
+    own_session = session is None
+    session = session or make_session(max_workers)
+    cache = cache or HttpCache()
+    hosts = hosts or HostLimiter(session, max_per_host=max_workers)
+    if not hosts.allowed(page_url(url, 1, page_param)):
+        raise PermissionError(f"robots.txt가 막은 주소입니다: {url}")
+
+    def load(page):
+        html = conditional_get(session, page_url(url, page, page_param), cache, timeout, hosts)
+        return html, [typed(row, columns) for row in parse(html)] if html else []
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        html, rows = load(1)
+        if not rows:
+            return
+        yield 1, rows
+        hint = last_page_hint(html, page_param)
+        page, window = 2, 1
+        while max_pages is None or page <= max_pages:
+            # 링크로 보이는 페이지까지는 한꺼번에, 그 뒤로는 확인하는 개수를 두 배씩
+            end = hint if page <= hint else page + window - 1
+            if max_pages is not None:
+                end = min(end, max_pages)
+            for page, (_, rows) in zip(range(page, end + 1), executor.map(load, range(page, end + 1))):
+                if not rows:
+                    return
+                yield page, rows
+            if end > hint:
+                window = min(max_workers, window * 2)
+            page = end + 1
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if own_session:
+            session.close()
+
+
+class RowWriter:
+    """행을 받는 대로 파일에 씀 (.csv는 엑셀에서 바로 열리게 utf-8-sig, .jsonl은 줄마다 dict, .xlsx는 openpyxl 쓰기 전용)"""
+
+    def __init__(self, path, columns):
+        self.names = [name for name, _ in columns]
+        self.kind = path.rsplit(".", 1)[-1].lower()
+        self.path = path
+        if self.kind == "xlsx":
+            if not HAS_OPENPYXL:
+                raise ValueError("xlsx로 쓰려면 openpyxl이 필요합니다 (pip install openpyxl)")
+            self.book = openpyxl.Workbook(write_only=True)
+            self.sheet = self.book.create_sheet()
+            self.sheet.append(self.names)
+        elif self.kind in ("csv", "jsonl"):
+            self.file = open(path, "w", encoding="utf-8-sig" if self.kind == "csv" else "utf-8", newline="")
+            if self.kind == "csv":
+                self.csv = csv.writer(self.file)
+                self.csv.writerow(self.names)
+        else:
+            raise ValueError(f"지원하지 않는 파일 형식입니다: {path} (.csv / .jsonl / .xlsx)")
+
+    def write(self, rows):
+        if self.kind == "xlsx":
+            for row in rows:
+                self.sheet.append(list(row))
+        elif self.kind == "csv":
+            self.csv.writerows(rows)
+            self.file.flush()
+        else:
+            for row in rows:
+                self.file.write(json.dumps(dict(zip(self.names, row)), ensure_ascii=False) + "\n")
+            self.file.flush()
+
+    def close(self):
+        if self.kind == "xlsx":
+            self.book.save(self.path)
+        else:
+            self.file.close()
+
+
+def scrape_to_file(url, path, parse=parse_products, columns=PRODUCT_COLUMNS, on_page=None, **options):
+    """scrape_pages 결과를 path에 바로 쓰고 {'pages', 'rows', 'cached', 'seconds'} 반환
+
+    on_page(페이지 번호, 행 목록)은 페이지를 쓸 때마다 불림, options는 scrape_pages 인자
+    """
+    started = time.monotonic()
+    cache = options.pop("cache", None) or HttpCache()
+    hits = cache.hits
+    writer = RowWriter(path, columns)
+    pages = rows_written = 0
+    try:
+        for page, rows in scrape_pages(url, parse, columns, cache=cache, **options):
+            writer.write(rows)
+            pages += 1
+            rows_written += len(rows)
+            if on_page is not None:
+                on_page(page, rows)
+    finally:
+        writer.close()
+    return {"pages": pages, "rows": rows_written, "cached": cache.hits - hits,
+            "seconds": round(time.monotonic() - started, 2)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="페이지 번호로 넘기는 상품 목록 수집 (바뀐 페이지만 다시 받음)")
+    parser.add_argument("out", help="결과 파일 (.csv / .jsonl / .xlsx)")
+    parser.add_argument("--url", default=PRODUCTS_URL, help="목록 주소 (page 파라미터는 자동으로 붙임)")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="동시에 받을 페이지 수")
+    parser.add_argument("--max-pages", type=int, default=None, help="최대 페이지 수 (기본: 마지막 페이지까지)")
+    args = parser.parse_args(argv)
+    stats = scrape_to_file(args.url, args.out, max_workers=args.workers, max_pages=args.max_pages,
+                           on_page=lambda page, rows: print(f"<페이지 {page}> {len(rows)}개", flush=True))
+    print(f"✅ {stats['pages']}페이지, {stats['rows']}행 -> {args.out} "
+          f"(안 바뀐 페이지 {stats['cached']}개, {stats['seconds']}초)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
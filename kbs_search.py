@@ -0,0 +1,235 @@
+# 기사 검색 색인 (글자 2-gram 역색인, SQLite)
+# 한국어는 띄어쓰기로 형태소가 나뉘지 않아서 부분 문자열 검색이 필요함
+# 기사를 저장할 때 제목+본문의 글자 2-gram을 색인에 넣고, 검색할 때는 검색어의 2-gram
+# 목록(posting)을 교집합해서 후보만 확인하므로 전체 본문을 훑지 않음
+# 본문은 색인에 따로 두지 않고 (이미 저장소/데이터셋에 있음) 후보 기사의 본문만 저장소에서 꺼내서 확인
+
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from kbs_config import data_path
+from kbs_store import ArticleStore
+import kbs_dataset
+
+INDEX_PATH = data_path("search_index.sqlite3")
+TITLE_WEIGHT = 3    # 제목에 나온 검색어는 본문보다 이만큼 더 침
+SNIPPET_CHARS = 60  # 미리보기에서 검색어 앞뒤로 보여줄 글자 수
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+SPACES = re.compile(r"\s+")
+
+
+def normalize(text):
+    """대소문자/공백 차이를 없앰 (색인과 검색어에 똑같이 적용)"""
+    return SPACES.sub(" ", (text or "").lower()).strip()
+
+
+def bigrams(text):
+    return [text[i:i + 2] for i in range(len(text) - 1)]
+
+
+def query_terms(query):
+    """'미국 대선' -> ['미국', '대선'] (모든 검색어가 들어간 기사만 찾음)"""
+    return list(dict.fromkeys(term for term in normalize(query).split(" ") if term))
+
+
+def highlight(text, terms, width=SNIPPET_CHARS):
+    """첫 번째로 나온 검색어 주변만 잘라서 검색어를 **굵게** 표시"""
+    if not text:
+        return ""
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms]
+    positions = [pos for pos in positions if pos >= 0]
+    start = max(min(positions) - width, 0) if positions else 0
+    end = min(start + width * 2 + max(len(term) for term in terms), len(text))
+    snippet = SPACES.sub(" ", text[start:end]).strip()
+    pattern = re.compile("|".join(re.escape(term) for term in sorted(terms, key=len, reverse=True)),
+                         re.IGNORECASE)
+    snippet = pattern.sub(lambda m: f"**{m.group(0)}**", snippet)
+    return ("…" if start > 0 else "") + snippet + ("…" if end < len(text) else "")
+
+
+def text_digest(title, content):
+    """제목 + 본문 해시 (다시 넣을 때 바뀌었는지 비교용)"""
+    return hashlib.sha1(f"{title}\n{content}".encode("utf-8")).hexdigest()
+
+
+class SearchIndex:
+    """여러 스레드에서 같이 써도 되는 역색인 (기사가 추가될 때마다 바로 반영)
+
+    store는 검색할 때 후보 기사 본문을 꺼낼 저장소 (없는 기사는 parquet 데이터셋에서)
+    """
+
+    def __init__(self, path=INDEX_PATH, store=None):
+        self.lock = threading.Lock()
+        self.store = store or ArticleStore()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # 예전 파일은 docs에 본문까지 들고 있었음 -> 해시만 남기고 본문은 버림 (doc_id는 그대로라 posting 유지)
+        migrate = "content" in {row[1] for row in self.conn.execute("PRAGMA table_info(docs)")}
+        if migrate:
+            self.conn.execute("ALTER TABLE docs RENAME TO old_docs")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                day TEXT NOT NULL,
+                date TEXT,
+                title TEXT,
+                digest TEXT NOT NULL,
+                length INTEGER NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                gram TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (gram, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings(doc_id);
+        """)
+        if migrate:
+            self.conn.executemany(
+                "INSERT INTO docs (doc_id, url, day, date, title, digest, length, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                ((doc_id, url, day, date, title, text_digest(title or "", content or ""), length, indexed_at)
+                 for doc_id, url, day, date, title, content, length, indexed_at in self.conn.execute(
+                    "SELECT doc_id, url, day, date, title, content, length, indexed_at FROM old_docs").fetchall()))
+            self.conn.execute("DROP TABLE old_docs")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_docs_day ON docs(day)")
+        self.conn.commit()
+        if migrate:
+            self.conn.execute("VACUUM")
+
+    # ---- 색인 ----
+
+    def add(self, records):
+        """records(url, list_date, date, title, content 가 있는 dict)를 색인에 추가/갱신
+
+        제목과 본문이 그대로인 기사는 건너뜀 (요약만 바뀐 경우 등)
+        """
+        added = 0
+        with self.lock:
+            for record in records:
+                if self._add(record):
+                    added += 1
+            self.conn.commit()
+        return added
+
+    def _add(self, record):
+        title, content = record["title"] or "", record["content"] or ""
+        digest = text_digest(title, content)
+        row = self.conn.execute("SELECT doc_id, digest FROM docs WHERE url = ?", (record["url"],)).fetchone()
+        if row is not None:
+            if row[1] == digest:
+                return False
+            self.conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+            self.conn.execute("DELETE FROM docs WHERE doc_id = ?", (row[0],))
+
+        text = normalize(f"{title} {content}")
+        cursor = self.conn.execute(
+            "INSERT INTO docs (url, day, date, title, digest, length, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (record["url"], kbs_dataset.partition_day(record["list_date"]), record["date"], title, digest,
+             len(text), time.time())
+        )
+        doc_id = cursor.lastrowid
+        self.conn.executemany("INSERT INTO postings (gram, doc_id, tf) VALUES (?, ?, ?)",
+                              [(gram, doc_id, tf) for gram, tf in Counter(bigrams(text)).items()])
+        return True
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    # ---- 검색 ----
+
+    def search(self, query, start_day=None, end_day=None, limit=50):
+        """검색어가 모두 들어간 기사를 관련도순으로 반환
+
+        반환: (전체 일치 수, [{'url', 'date', 'title', 'score', 'snippet'}, ...] 상위 limit개)
+        """
+        terms = query_terms(query)
+        if not terms:
+            return 0, []
+        grams = sorted({gram for term in terms for gram in bigrams(term)})
+
+        day_filter, day_params = "", []
+        if start_day is not None:
+            day_filter += " AND d.day >= ?"
+            day_params.append(start_day)
+        if end_day is not None:
+            day_filter += " AND d.day <= ?"
+            day_params.append(end_day)
+
+        with self.lock:
+            total_docs, avg_length = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(AVG(length), 0) FROM docs").fetchone()
+            if grams:
+                # 모든 2-gram의 posting에 들어 있는 문서 = 교집합
+                marks = ",".join("?" * len(grams))
+                candidates = self.conn.execute(f"""
+                    SELECT d.doc_id, d.url, d.date, d.title, d.length
+                    FROM postings p JOIN docs d ON d.doc_id = p.doc_id
+                    WHERE p.gram IN ({marks}){day_filter}
+                    GROUP BY p.doc_id HAVING COUNT(*) = ?
+                """, grams + day_params + [len(grams)]).fetchall()
+                doc_freq = dict(self.conn.execute(
+                    f"SELECT gram, COUNT(*) FROM postings WHERE gram IN ({marks}) GROUP BY gram", grams
+                ).fetchall())
+            else:
+                # 한 글자 검색어만 있으면 2-gram이 없으므로 기간 안의 문서를 직접 확인
+                candidates = self.conn.execute(
+                    f"SELECT d.doc_id, d.url, d.date, d.title, d.length FROM docs d WHERE 1=1{day_filter}",
+                    day_params
+                ).fetchall()
+                doc_freq = {}
+
+        # 2-gram이 다 있어도 붙어서 나오지 않을 수 있으므로 실제 문자열로 확인 후 점수 계산
+        contents = self._contents([row[1] for row in candidates], start_day, end_day)
+        results = []
+        for _, url, date, title, length in candidates:
+            content = contents.get(url)
+            title_text, body_text = normalize(title), normalize(content)
+            score = 0.0
+            for term in terms:
+                tf = TITLE_WEIGHT * title_text.count(term) + body_text.count(term)
+                if tf == 0:
+                    break
+                # 검색어의 df는 그 검색어 2-gram 중 가장 드문 것으로 어림
+                df = min((doc_freq.get(gram, total_docs) for gram in bigrams(term)), default=total_docs)
+                idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (avg_length or 1))
+                score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+            else:
+                results.append({"url": url, "date": date, "title": title, "score": round(score, 3),
+                                "snippet": content})
+
+        results.sort(key=lambda r: (-r["score"], r["date"] or ""))
+        top = results[:limit]
+        # 미리보기는 보여줄 것만 만듦
+        for result in top:
+            result["snippet"] = highlight(result["snippet"], terms)
+        return len(results), top
+
+    def _contents(self, urls, start_day, end_day):
+        """후보 기사의 {url: 본문} (저장소에 없는 기사는 데이터셋의 같은 기간에서)"""
+        contents = self.store.contents(urls)
+        missing = [url for url in urls if url not in contents]
+        if missing:
+            contents.update(kbs_dataset.load_contents(missing, start_day, end_day))
+        return contents
+
+
+def index_dataset(index, dataset_dir=kbs_dataset.DATASET_DIR):
+    """parquet 데이터셋에 있는 기사를 색인에 넣음 (색인이 비어 있을 때 한 번)"""
+    if index.count() or not kbs_dataset.list_days(dataset_dir):
+        return 0
+    df = kbs_dataset.load(columns=["url", "day", "기고 날짜", "뉴스 제목", "뉴스 내용"], dataset_dir=dataset_dir)
+    return index.add({"url": row["url"], "list_date": row["day"], "date": row["기고 날짜"],
+                      "title": row["뉴스 제목"], "content": row["뉴스 내용"]}
+                     for _, row in df.iterrows())
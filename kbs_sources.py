@@ -0,0 +1,71 @@
+# 수집 대상(소스) 목록
+# 소스마다 목록 주소, 날짜/페이지 이동 방식, 목록/상세 선택자를 설정으로 두고 크롤러(kbs_crawl)는 이 설정만 보고 수집함
+# KBS 분류(ctcd)는 화면이 같으므로 kbs_category()로 만들고, 다른 사이트는 같은 키로 설정을 추가하면 됨
+#
+#   render      : "browser" (Selenium, JS로 그리는 목록) / "http" (requests로 바로 받는 목록)
+#   pagination  : "click" (selectors["next_page"]를 눌러서) / "param" (주소의 page_param 값으로)
+#   date_param  : 날짜 목록을 바로 여는 주소 파라미터 (date_url_format 형식), 없으면 첫 화면에서 '이전 날짜'를 눌러서
+#   selectors   : items/link/title/date (목록), content (상세), date_label/previous_date (브라우저 날짜 이동)
+#
+#   python kbs_cli.py crawl --sources kbs-world,kbs-politics
+
+from urllib.parse import urlsplit
+from kbs_config import KBS_BASE_URL
+from kbs_parse import LISTING_SELECTORS, CONTENT
+
+DEFAULT_SOURCE = "kbs-world"
+KBS_CATEGORY_URL = "https://news.kbs.co.kr/news/pc/category/category.do?ctcd={ctcd}&ref=pSiteMap"
+
+# 목록 선택자(items, link, title, date)는 kbs_parse의 기본값, link가 None이면 items 요소 자신의 href
+KBS_SELECTORS = dict(
+    LISTING_SELECTORS,
+    content=CONTENT,
+    date_label=".datepicker-label .date",
+    previous_date=".previous-button",
+    next_page="#page{page}",
+)
+
+
+def kbs_category(ctcd, label):
+    """KBS 뉴스 분류 하나의 소스 설정"""
+    return {
+        "label": label,
+        "listing_url": KBS_CATEGORY_URL.format(ctcd=ctcd),
+        "render": "browser",
+        "pagination": "click",
+        "date_param": "datetime",
+        "date_url_format": "%Y%m%d",
+        "page_param": None,
+        "selectors": KBS_SELECTORS,
+    }
+
+
+SOURCES = {
+    # 국제 뉴스는 로컬 테스트 사이트로 바꿀 수 있게 .env의 KBS_BASE_URL을 그대로 씀
+    "kbs-world": dict(kbs_category("0006", "KBS 국제"), listing_url=KBS_BASE_URL),
+    "kbs-politics": kbs_category("0001", "KBS 정치"),
+    "kbs-economy": kbs_category("0002", "KBS 경제"),
+    "kbs-society": kbs_category("0003", "KBS 사회"),
+    "kbs-culture": kbs_category("0004", "KBS 문화"),
+    "kbs-science": kbs_category("0005", "KBS IT·과학"),
+}
+
+
+def get_source(name):
+    try:
+        return dict(SOURCES[name], name=name)
+    except KeyError:
+        raise ValueError(f"없는 소스입니다: {name} (사용 가능: {', '.join(SOURCES)})") from None
+
+
+def resolve(names=None):
+    """소스 이름 목록 또는 'a,b' 문자열 -> 소스 설정 목록 (없으면 기본 소스 하나)"""
+    if not names:
+        names = [DEFAULT_SOURCE]
+    elif isinstance(names, str):
+        names = [name.strip() for name in names.split(",") if name.strip()]
+    return [get_source(name) for name in dict.fromkeys(names)]
+
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
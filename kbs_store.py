@@ -0,0 +1,311 @@
+# 수집한 기사 저장소 (SQLite)
+# 기사는 정규화된 KBS URL로, 목록 날짜별 진행 상황은 워터마크로 관리해서
+# 다시 실행할 때 이미 본 기사/끝난 날짜는 건너뜀
+# 워터마크는 소스(kbs_sources)마다 따로 둠 (기본 소스는 예전처럼 날짜만, 다른 소스는 '소스/날짜' 키)
+# 상세 페이지를 받지 못한 기사는 failed_urls에 남겨 두고 다음 실행마다 MAX_FETCH_ATTEMPTS번까지 다시 받음
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, parse_qs, urlencode
+from kbs_config import data_path
+from kbs_sources import DEFAULT_SOURCE
+
+STORE_PATH = data_path("articles.sqlite3")
+LOG_PATH = data_path("articles.jsonl")
+KBS_VIEW_URL = "https://news.kbs.co.kr/news/pc/view/view.do"
+# 목록 날짜 라벨 형식 (저장소/체크포인트/데이터셋이 모두 이 형식을 씀)
+DATE_FORMAT = "%Y.%m.%d"
+# 기사별 요약 토큰 사용량 (kbs_summarize.new_usage()의 키와 같음)
+USAGE_COLUMNS = ["prompt_tokens", "completion_tokens", "summary_requests"]
+MAX_FETCH_ATTEMPTS = 5  # 상세 페이지를 이만큼 받지 못하면 포기 (없어진 기사 등)
+
+
+def canonical_url(url):
+    """같은 기사를 가리키는 URL을 하나로 통일 (ref 등 추적용 파라미터 제거)"""
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    if parts.netloc.endswith("news.kbs.co.kr") and "ncd" in query:
+        return f"{KBS_VIEW_URL}?ncd={query['ncd'][0]}"
+    # 다른 주소는 fragment 제거 + 쿼리 정렬만
+    sorted_query = urlencode(sorted((k, v) for k, values in query.items() for v in values))
+    return f"{parts.scheme}://{parts.netloc}{parts.path}" + (f"?{sorted_query}" if sorted_query else "")
+
+
+def today_label():
+    """KBS 날짜 선택기와 같은 형식의 오늘 날짜"""
+    return datetime.now().strftime(DATE_FORMAT)
+
+
+def date_label(day_offset):
+    """오늘로부터 day_offset일 전 날짜 (KBS 날짜 선택기 형식)"""
+    return (datetime.now() - timedelta(days=day_offset)).strftime(DATE_FORMAT)
+
+
+def day_offset_of(label):
+    """날짜 라벨 -> 오늘로부터 며칠 전인지 (이어서 하는 실행이 다음 날 시작돼도 같은 날짜를 찾도록)"""
+    return (datetime.now().date() - datetime.strptime(label, DATE_FORMAT).date()).days
+
+
+def watermark_key(list_date, source=DEFAULT_SOURCE):
+    return list_date if source == DEFAULT_SOURCE else f"{source}/{list_date}"
+
+
+class ArticleStore:
+    def __init__(self, path=STORE_PATH):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                list_date TEXT NOT NULL,
+                date TEXT,
+                title TEXT,
+                content TEXT,
+                summary TEXT,
+                crawled_at REAL NOT NULL,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER,
+                summary_requests INTEGER,
+                duplicate_of TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_list_date ON articles(list_date);
+            CREATE TABLE IF NOT EXISTS watermarks (
+                list_date TEXT PRIMARY KEY,
+                newest_url TEXT,
+                pages_done INTEGER NOT NULL DEFAULT 0,
+                exhausted INTEGER NOT NULL DEFAULT 0,
+                closed INTEGER NOT NULL DEFAULT 0,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS failed_urls (
+                url TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                list_date TEXT NOT NULL,
+                date TEXT,
+                title TEXT,
+                attempts INTEGER NOT NULL,
+                failed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_failed_urls_day ON failed_urls(source, list_date);
+        """)
+        # 예전 파일에는 토큰 사용량/원본 기사 컬럼이 없으므로 추가
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(articles)")}
+        for column in USAGE_COLUMNS:
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE articles ADD COLUMN {column} INTEGER")
+        if "duplicate_of" not in columns:
+            self.conn.execute("ALTER TABLE articles ADD COLUMN duplicate_of TEXT")
+        self.conn.commit()
+
+    # ---- 기사 ----
+
+    def known_urls(self, urls):
+        """urls 중 이미 저장된 것만 set으로 반환"""
+        urls = [canonical_url(url) for url in urls]
+        if not urls:
+            return set()
+        marks = ",".join("?" * len(urls))
+        with self.lock:
+            rows = self.conn.execute(f"SELECT url FROM articles WHERE url IN ({marks})", urls).fetchall()
+        return {row[0] for row in rows}
+
+    def save(self, url, list_date, date, title, content, summary=None):
+        with self.lock:
+            self.conn.execute("""
+                INSERT INTO articles (url, list_date, date, title, content, summary, crawled_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    date = excluded.date, title = excluded.title, content = excluded.content,
+                    summary = COALESCE(excluded.summary, articles.summary)
+            """, (canonical_url(url), list_date, date, title, content, summary, time.time()))
+            self.conn.execute("DELETE FROM failed_urls WHERE url = ?", (canonical_url(url),))
+            self.conn.commit()
+
+    # ---- 받지 못한 상세 페이지 ----
+
+    def add_failed(self, items, list_date, source=DEFAULT_SOURCE):
+        """상세 페이지를 받지 못한 기사 [{'url', 'title', 'date'}, ...] 기록 (실패 횟수 +1)"""
+        now = time.time()
+        with self.lock:
+            self.conn.executemany("""
+                INSERT INTO failed_urls (url, source, list_date, date, title, attempts, failed_at)
+                VALUES (?, ?, ?, ?, ?, 1, ?)
+                ON CONFLICT(url) DO UPDATE SET attempts = attempts + 1, failed_at = excluded.failed_at
+            """, [(canonical_url(item["url"]), source, list_date, item["date"], item["title"], now)
+                  for item in items])
+            self.conn.commit()
+
+    def failed(self, list_date, source=DEFAULT_SOURCE, max_attempts=MAX_FETCH_ATTEMPTS):
+        """그 날짜에서 아직 다시 받아 볼 기사 [{'url', 'title', 'date'}, ...]"""
+        with self.lock:
+            rows = self.conn.execute("SELECT url, title, date FROM failed_urls "
+                                     "WHERE source = ? AND list_date = ? AND attempts < ?",
+                                     (source, list_date, max_attempts)).fetchall()
+        return [{"url": url, "title": title, "date": date} for url, title, date in rows]
+
+    def forget_failed(self, urls):
+        """더 받지 않을 기사(robots.txt가 막은 기사 등)를 다시 받을 목록에서 뺌"""
+        with self.lock:
+            self.conn.executemany("DELETE FROM failed_urls WHERE url = ?",
+                                  [(canonical_url(url),) for url in urls])
+            self.conn.commit()
+
+    def set_summary(self, url, summary, usage=None):
+        """요약 저장 (usage가 있으면 그 기사에 쓴 토큰 수도 저장)"""
+        usage = usage or {}
+        with self.lock:
+            self.conn.execute("""
+                UPDATE articles SET summary = ?,
+                    prompt_tokens = COALESCE(?, prompt_tokens),
+                    completion_tokens = COALESCE(?, completion_tokens),
+                    summary_requests = COALESCE(?, summary_requests)
+                WHERE url = ?
+            """, (summary, usage.get("prompt_tokens"), usage.get("completion_tokens"), usage.get("requests"),
+                  canonical_url(url)))
+            self.conn.commit()
+
+    def clear_summary(self, url):
+        """본문이 바뀐 기사의 요약/토큰 사용량을 지움 (다음 크롤링이나 kbs_batch에서 다시 요약)"""
+        with self.lock:
+            self.conn.execute("UPDATE articles SET summary = NULL, prompt_tokens = NULL, completion_tokens = NULL, "
+                              "summary_requests = NULL WHERE url = ?", (canonical_url(url),))
+            self.conn.commit()
+
+    def set_duplicate(self, url, original_url):
+        """거의 같은 기사(kbs_dedup)로 판정된 기사에 원본 기사 url 기록"""
+        with self.lock:
+            self.conn.execute("UPDATE articles SET duplicate_of = ? WHERE url = ?",
+                              (canonical_url(original_url), canonical_url(url)))
+            self.conn.commit()
+
+    def contents(self, urls, chunk=500):
+        """{url: 본문} (urls는 저장된 정규화 URL, 없는 기사는 빠짐)"""
+        urls = list(urls)
+        found = {}
+        for i in range(0, len(urls), chunk):
+            part = urls[i:i + chunk]
+            marks = ",".join("?" * len(part))
+            with self.lock:
+                found.update(self.conn.execute(f"SELECT url, content FROM articles WHERE url IN ({marks})",
+                                               part).fetchall())
+        return found
+
+    def summary(self, url):
+        """저장된 요약 (없거나 아직 요약 전이면 None)"""
+        with self.lock:
+            row = self.conn.execute("SELECT summary FROM articles WHERE url = ?", (canonical_url(url),)).fetchone()
+        return row[0] if row else None
+
+    def usage_totals(self, list_dates):
+        """목록 날짜들의 요약 토큰 사용량 합계 {'기사', 'prompt_tokens', 'completion_tokens', 'requests'}"""
+        row = self._select("COUNT(prompt_tokens), SUM(prompt_tokens), SUM(completion_tokens), "
+                           "SUM(summary_requests)", list_dates, order=False)
+        count, prompt, completion, requests = row[0] if row else (0, 0, 0, 0)
+        return {"기사": count, "prompt_tokens": prompt or 0, "completion_tokens": completion or 0,
+                "requests": requests or 0}
+
+    def missing_summaries(self, list_dates):
+        """요약이 아직 없는 기사 [(url, list_date, date, title, content), ...]"""
+        return self._select("url, list_date, date, title, content", list_dates, "AND summary IS NULL")
+
+    def list_dates(self):
+        """기사가 있는 목록 날짜 전체 (최신순)"""
+        with self.lock:
+            rows = self.conn.execute("SELECT DISTINCT list_date FROM articles ORDER BY list_date DESC").fetchall()
+        return [row[0] for row in rows]
+
+    def rows(self, list_dates):
+        """대시보드용 [date, title, content, summary] 행 (날짜 최신순)"""
+        columns = "date, title, content, COALESCE(summary, '요약 없음')"
+        return [list(row) for row in self._select(columns, list_dates)]
+
+    def records(self):
+        """저장된 기사 전체 [{'url', 'list_date', 'date', 'title', 'content', 'summary', 'duplicate_of'}, ...]
+
+        (먼저 수집한 기사부터)
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT url, list_date, date, title, content, COALESCE(summary, '요약 없음'), duplicate_of "
+                "FROM articles ORDER BY crawled_at"
+            ).fetchall()
+        keys = ["url", "list_date", "date", "title", "content", "summary", "duplicate_of"]
+        return [dict(zip(keys, row)) for row in rows]
+
+    def _select(self, columns, list_dates, extra="", order=True):
+        list_dates = list(list_dates)
+        if not list_dates:
+            return []
+        marks = ",".join("?" * len(list_dates))
+        order_by = "ORDER BY list_date DESC, date DESC" if order else ""
+        with self.lock:
+            return self.conn.execute(
+                f"SELECT {columns} FROM articles WHERE list_date IN ({marks}) {extra} {order_by}",
+                list_dates
+            ).fetchall()
+
+    # ---- 날짜별 워터마크 ----
+
+    def watermark(self, list_date, source=DEFAULT_SOURCE):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT newest_url, pages_done, exhausted, closed FROM watermarks WHERE list_date = ?",
+                (watermark_key(list_date, source),)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"newest_url": row[0], "pages_done": row[1], "exhausted": bool(row[2]), "closed": bool(row[3])}
+
+    def is_finished(self, list_date, pages_per_day, source=DEFAULT_SOURCE):
+        """그 날짜가 지난 뒤에 목록 끝 또는 요청한 페이지 수까지 다 읽었으면 True
+
+        (당일에 읽은 날짜는 이후에 기사가 더 올라왔을 수 있으므로 끝난 것으로 보지 않음)
+        """
+        mark = self.watermark(list_date, source)
+        if mark is None or not mark["closed"]:
+            return False
+        return mark["exhausted"] or mark["pages_done"] >= pages_per_day
+
+    def update_watermark(self, list_date, newest_url, pages_done, exhausted, source=DEFAULT_SOURCE):
+        """이번 실행 결과를 기존 워터마크와 합쳐서 저장 (더 깊이 읽은 쪽 유지)"""
+        newest_url = canonical_url(newest_url) if newest_url else None
+        closed = list_date != today_label()
+        with self.lock:
+            # 날짜가 지난 뒤 처음 읽은 경우에는 당일에 쌓인 진행도는 버리고 새로 시작
+            self.conn.execute("""
+                INSERT INTO watermarks (list_date, newest_url, pages_done, exhausted, closed, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(list_date) DO UPDATE SET
+                    newest_url = COALESCE(excluded.newest_url, watermarks.newest_url),
+                    pages_done = CASE WHEN excluded.closed > watermarks.closed THEN excluded.pages_done
+                                      ELSE MAX(watermarks.pages_done, excluded.pages_done) END,
+                    exhausted = CASE WHEN excluded.closed > watermarks.closed THEN excluded.exhausted
+                                     ELSE MAX(watermarks.exhausted, excluded.exhausted) END,
+                    closed = MAX(watermarks.closed, excluded.closed),
+                    updated_at = excluded.updated_at
+            """, (watermark_key(list_date, source), newest_url, pages_done, int(exhausted), int(closed), time.time()))
+            self.conn.commit()
+
+
+class ArticleLog:
+    """기사가 끝날 때마다 한 줄씩 추가하는 JSONL 로그 (크롤링 도중 죽어도 쓴 데까지는 남음)"""
+
+    def __init__(self, path=LOG_PATH):
+        self.lock = threading.Lock()
+        self.file = open(path, "a", encoding="utf-8")
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        with self.lock:
+            self.file.close()
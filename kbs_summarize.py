@@ -0,0 +1,418 @@
+# 뉴스 요약 (OpenAI)
+# 큐에 쌓인 기사를 여러 스레드가 동시에 요약하고, 분당 요청/토큰 한도를 토큰 버킷으로 지킴
+# 짧은 기사는 토큰 예산만큼 묶어서 한 번에 요청하고 JSON으로 기사별 요약을 받음
+# 본문은 KBS 공통 문구를 빼고 보내며, 예산을 넘는 긴 기사는 나눠서 요약한 뒤 합침
+# OPENAI_BASE_URL을 지정하면 로컬 가짜 chat-completions 서버로도 돌려볼 수 있음
+
+import json
+import queue
+import random
+import threading
+import time
+import openai
+from kbs_config import OPENAI_RPM, OPENAI_TPM, ARTICLE_TOKENS
+from kbs_cache import make_key
+from kbs_metrics import metrics, SUMMARIZE, STORE, RETRY, SKIP
+from kbs_text import clean_content, count_tokens, split_chunks
+
+MODEL = "gpt-4o-mini"
+SYSTEM_PROMPT = "뉴스를 정확하고 간결하게 3줄로 요약하세요."
+USER_PROMPT = "다음 뉴스를 3줄로 요약:\n\n{content}"
+# ARTICLE_TOKENS(.env의 OPENAI_ARTICLE_TOKENS)를 넘는 긴 기사는 조각별 요약 -> 합쳐서 요약
+CHUNK_PROMPT = "다음은 긴 뉴스의 일부입니다. 핵심 내용만 3줄 이내로 요약:\n\n{content}"
+REDUCE_PROMPT = "다음은 한 뉴스를 나눠서 요약한 내용입니다. 전체 뉴스를 3줄로 요약:\n\n{content}"
+MAX_TOKENS = 200
+TEMPERATURE = 0.7
+
+# 분당 한도 (.env의 OPENAI_RPM / OPENAI_TPM)
+RPM_LIMIT = OPENAI_RPM
+TPM_LIMIT = OPENAI_TPM
+
+# 여러 기사 묶음 요청 (기사 번호 -> 요약 JSON 응답)
+BATCH_SYSTEM_PROMPT = "여러 뉴스를 각각 정확하고 간결하게 3줄로 요약하고, JSON으로만 답하세요."
+BATCH_USER_PROMPT = (
+    "아래 뉴스들을 각각 3줄로 요약하세요. 각 뉴스는 [번호]로 시작합니다.\n"
+    '{{"summaries": {{"번호": "3줄 요약", ...}}}} 형식으로 모든 번호에 답하세요.\n\n{articles}'
+)
+BATCH_TOKENS = 6000      # 묶음 하나의 입력 토큰 예산 (0이면 묶지 않음)
+BATCH_MAX_ARTICLES = 10  # 묶음 하나에 넣을 최대 기사 수
+BATCH_WAIT = 1.0         # 묶음을 채우려고 다음 기사를 기다리는 최대 시간(초)
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0   # 첫 재시도 대기(초)
+BACKOFF_MAX = 30.0   # 최대 대기(초)
+
+
+class TokenBucket:
+    """분당 rate_per_minute만큼 채워지는 토큰 버킷"""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1):
+        """amount만큼 토큰이 생길 때까지 대기 후 차감"""
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """요청 수(RPM) + 토큰 수(TPM) 버킷 묶음"""
+
+    def __init__(self, rpm=RPM_LIMIT, tpm=TPM_LIMIT):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def acquire(self, tokens):
+        self.requests.acquire(1)
+        self.tokens.acquire(tokens)
+
+
+def estimate_tokens(text, max_tokens=MAX_TOKENS):
+    """요청 토큰 수 (로컬에서 셈) + 응답 토큰"""
+    return count_tokens(text) + max_tokens
+
+
+def new_usage():
+    """기사 하나의 토큰 사용량 (요청할 때마다 누적)"""
+    return {"prompt_tokens": 0, "completion_tokens": 0, "requests": 0}
+
+
+def add_usage(usage, response, share=1.0):
+    """응답의 usage를 share 비율만큼 usage에 더함 (묶음 요청은 기사별로 나눠서 기록)"""
+    if usage is None:
+        return
+    counts = getattr(response, "usage", None)
+    usage["prompt_tokens"] += round((getattr(counts, "prompt_tokens", 0) or 0) * share)
+    usage["completion_tokens"] += round((getattr(counts, "completion_tokens", 0) or 0) * share)
+    usage["requests"] += 1
+
+
+def is_retryable(error):
+    """429, 5xx, 연결/타임아웃 오류만 재시도"""
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def backoff_delay(attempt, error=None):
+    """지수 백오프 + 지터, 서버가 Retry-After를 주면 그 값을 우선"""
+    response = getattr(error, "response", None)
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(BACKOFF_MAX, float(retry_after))
+            except ValueError:
+                pass
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt))
+    return random.uniform(delay / 2, delay)
+
+
+def request_summary(content, client, prompt=USER_PROMPT, usage=None):
+    """chat-completions 요청 한 번"""
+    response = client.chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt.format(content=content)}
+        ],
+        max_tokens=MAX_TOKENS,
+        temperature=TEMPERATURE
+    )
+    add_usage(usage, response)
+    return response.choices[0].message.content.strip()
+
+
+def batch_request(contents):
+    """기사 여러 개를 묶은 chat-completions 요청 본문 (기사 번호는 1부터)"""
+    articles = "\n\n".join(f"[{number}] {content}" for number, content in enumerate(contents, 1))
+    return {
+        "model": MODEL,
+        "messages": [
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": BATCH_USER_PROMPT.format(articles=articles)}
+        ],
+        "max_tokens": MAX_TOKENS * len(contents),
+        "temperature": TEMPERATURE,
+        "response_format": {"type": "json_object"},
+    }
+
+
+def parse_batch_response(text, count):
+    """묶음 응답 JSON -> {기사 번호(1부터): 요약}, 빠진 번호는 결과에 없음
+
+    JSON이 아니면 ValueError
+    """
+    data = json.loads(text)
+    summaries = data.get("summaries", data) if isinstance(data, dict) else {}
+    result = {}
+    for number in range(1, count + 1):
+        summary = summaries.get(str(number)) if isinstance(summaries, dict) else None
+        if isinstance(summary, list):
+            summary = "\n".join(str(line) for line in summary)
+        if isinstance(summary, str) and summary.strip():
+            result[number] = summary.strip()
+    return result
+
+
+def request_batch_summaries(contents, client, usages=None):
+    """묶음 요청 한 번 -> {기사 번호: 요약}, 사용량은 기사 길이 비율로 나눠서 usages에 기록"""
+    response = client.chat.completions.create(**batch_request(contents))
+    if usages is not None:
+        sizes = [count_tokens(content) or 1 for content in contents]
+        for usage, size in zip(usages, sizes):
+            add_usage(usage, response, size / sum(sizes))
+    return parse_batch_response(response.choices[0].message.content, len(contents))
+
+
+def pack_batches(contents, budget=BATCH_TOKENS, max_articles=BATCH_MAX_ARTICLES):
+    """토큰 예산 안에 들어가게 기사 번호(0부터)를 묶음으로 나눔 [[0, 1, 2], [3], ...]"""
+    batches, current, tokens = [], [], 0
+    for index, content in enumerate(contents):
+        needed = estimate_tokens(content, 0)
+        if current and (tokens + needed > budget or len(current) >= max_articles):
+            batches.append(current)
+            current, tokens = [], 0
+        current.append(index)
+        tokens += needed
+    if current:
+        batches.append(current)
+    return batches
+
+
+def summary_key(content):
+    """요약 캐시 키 (프롬프트나 파라미터가 바뀌면 키도 바뀜)"""
+    return make_key(content, model=MODEL, system=SYSTEM_PROMPT, user=USER_PROMPT,
+                    max_tokens=MAX_TOKENS, temperature=TEMPERATURE,
+                    article_tokens=ARTICLE_TOKENS, chunk=CHUNK_PROMPT, reduce=REDUCE_PROMPT)
+
+
+def batch_summary_key(content):
+    """묶음 요청으로 만든 요약의 캐시 키 (묶음 프롬프트가 바뀌면 키도 바뀜)"""
+    return make_key(content, model=MODEL, system=BATCH_SYSTEM_PROMPT, user=BATCH_USER_PROMPT,
+                    max_tokens=MAX_TOKENS, temperature=TEMPERATURE)
+
+
+def cached_for_batch(cache, content):
+    """묶음으로 요약할 기사의 캐시된 요약 (묶음 요약이 없으면 한 건씩 요약한 것), 없으면 None"""
+    if cache is None:
+        return None
+    summary = cache.get(batch_summary_key(content))
+    return summary if summary is not None else cache.get(summary_key(content))
+
+
+def request_with_retry(content, client, prompt=USER_PROMPT, limiter=None, max_retries=MAX_RETRIES, usage=None):
+    """한도 대기 + 재시도를 붙인 요약 요청 한 번 (재시도해도 안 되면 마지막 오류를 그대로 올림)"""
+    attempt = 0
+    while True:
+        if limiter is not None:
+            limiter.acquire(estimate_tokens(content))
+        try:
+            return request_summary(content, client, prompt, usage)
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+            metrics.count(SUMMARIZE, RETRY)
+            time.sleep(backoff_delay(attempt, e))
+            attempt += 1
+
+
+def summarize_news(content, client, limiter=None, max_retries=MAX_RETRIES, cache=None, usage=None):
+    """뉴스 하나를 3줄로 요약 (캐시 확인 + 한도 대기 + 재시도 포함), 실패하면 '요약 실패: ...' 반환
+
+    공통 문구를 뺀 본문이 ARTICLE_TOKENS를 넘으면 조각별로 요약한 뒤 한 번 더 합쳐서 요약
+    usage(dict)를 주면 이 기사에 쓴 토큰 수를 더해 줌
+    """
+    key = summary_key(content) if cache is not None else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            metrics.count(SUMMARIZE, SKIP)
+            return cached
+
+    # 재시도는 여기서 직접 하므로 SDK 자체 재시도는 끔
+    client = client.with_options(max_retries=0)
+    text = clean_content(content) or content
+    try:
+        if count_tokens(text) <= ARTICLE_TOKENS:
+            summary = request_with_retry(text, client, USER_PROMPT, limiter, max_retries, usage)
+        else:
+            partials = [request_with_retry(chunk, client, CHUNK_PROMPT, limiter, max_retries, usage)
+                        for chunk in split_chunks(text, ARTICLE_TOKENS)]
+            summary = request_with_retry("\n\n".join(partials), client, REDUCE_PROMPT, limiter, max_retries, usage)
+    except Exception as e:
+        metrics.error(SUMMARIZE, e)
+        return f"요약 실패: {str(e)}"
+    if key is not None:
+        cache.set(key, summary)
+    return summary
+
+
+def summarize_batch(contents, client, limiter=None, max_retries=MAX_RETRIES, cache=None, usages=None):
+    """기사 여러 개를 한 번에 요약해서 같은 순서의 요약 목록 반환
+
+    캐시에 있는 기사는 빼고 묶어서 요청하고, 응답을 못 읽었거나 빠진 기사와 예산을 넘는
+    긴 기사는 한 건씩 요약. usages(기사별 dict 목록)를 주면 토큰 사용량을 기록
+    묶음 응답은 batch_summary_key로 저장하고, 찾을 때는 한 건씩 요약한 것(summary_key)도 씀
+    """
+    usages = usages or [None] * len(contents)
+    summaries = [cached_for_batch(cache, content) for content in contents]
+    metrics.count(SUMMARIZE, SKIP, sum(summary is not None for summary in summaries))
+    texts = [clean_content(content) or content for content in contents]
+    pending = [index for index, summary in enumerate(summaries)
+               if summary is None and count_tokens(texts[index]) <= ARTICLE_TOKENS]
+    single = [index for index, summary in enumerate(summaries) if summary is None and index not in pending]
+    if len(pending) <= 1:
+        single, pending = single + pending, []
+
+    result = {}
+    if pending:
+        batch = [texts[index] for index in pending]
+        client = client.with_options(max_retries=0)
+        attempt = 0
+        while True:
+            if limiter is not None:
+                limiter.acquire(sum(estimate_tokens(text, 0) for text in batch) + MAX_TOKENS * len(batch))
+            try:
+                result = request_batch_summaries(batch, client, [usages[index] for index in pending])
+                break
+            except Exception as e:
+                # JSON을 못 읽은 경우(ValueError)도 재시도하지 않고 한 건씩 요약으로 넘어감
+                if attempt >= max_retries or not is_retryable(e):
+                    metrics.error(SUMMARIZE, e)
+                    break
+                metrics.count(SUMMARIZE, RETRY)
+                time.sleep(backoff_delay(attempt, e))
+                attempt += 1
+
+    for number, index in enumerate(pending, 1):
+        summary = result.get(number)
+        if summary is None:
+            single.append(index)
+        else:
+            summaries[index] = summary
+            if cache is not None:
+                cache.set(batch_summary_key(contents[index]), summary)
+    for index in single:
+        summaries[index] = summarize_news(contents[index], client, limiter, max_retries, cache, usages[index])
+    return summaries
+
+
+class Summarizer:
+    """큐 기반 요약 단계
+
+    submit()으로 기사를 넣으면 concurrency개의 스레드가 바로 요약을 시작하고,
+    끝나는 대로 on_done을 부르며, join()이 넣은 순서대로 [date, title, content, summary] 행을 돌려줌
+    batch_tokens가 있으면 각 스레드가 대기열의 기사를 토큰 예산만큼 묶어서 한 번에 요청함
+    """
+
+    def __init__(self, client, concurrency=4, rpm=RPM_LIMIT, tpm=TPM_LIMIT, max_retries=MAX_RETRIES,
+                 cache=None, on_done=None, batch_tokens=BATCH_TOKENS, batch_size=BATCH_MAX_ARTICLES):
+        self.client = client
+        self.cache = cache
+        self.batch_tokens = batch_tokens
+        self.batch_size = batch_size
+        # on_done(key, row, usage): 요약 하나가 끝날 때마다 워커 스레드에서 호출 (usage = 토큰 사용량)
+        self.on_done = on_done
+        self.usage = new_usage()  # 이번 실행 전체 사용량
+        self.limiter = RateLimiter(rpm, tpm)
+        self.max_retries = max_retries
+        self.queue = queue.Queue()
+        self.rows = []
+        self.lock = threading.Lock()
+        self.workers = [threading.Thread(target=self._work, daemon=True) for _ in range(concurrency)]
+        for worker in self.workers:
+            worker.start()
+
+    def _work(self):
+        carry = None  # 예산을 넘어서 다음 묶음으로 넘긴 기사
+        while True:
+            job = carry if carry is not None else self.queue.get()
+            carry = None
+            if job is None:
+                self.queue.task_done()
+                return
+            jobs, stop = [job], False
+            if self.batch_tokens:
+                tokens = estimate_tokens(job[4], 0)
+                deadline = time.monotonic() + BATCH_WAIT
+                while len(jobs) < self.batch_size:
+                    try:
+                        job = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        stop = True
+                        break
+                    needed = estimate_tokens(job[4], 0)
+                    if tokens + needed > self.batch_tokens:
+                        carry = job
+                        break
+                    jobs.append(job)
+                    tokens += needed
+
+            self._summarize(jobs)
+            for _ in jobs:
+                self.queue.task_done()
+            if stop:
+                self.queue.task_done()
+                return
+
+    def _summarize(self, jobs):
+        contents = [job[4] for job in jobs]
+        usages = [new_usage() for _ in jobs]
+        with metrics.span(SUMMARIZE):
+            if len(jobs) == 1:
+                summaries = [summarize_news(contents[0], self.client, self.limiter, self.max_retries, self.cache,
+                                            usages[0])]
+            else:
+                summaries = summarize_batch(contents, self.client, self.limiter, self.max_retries, self.cache,
+                                            usages)
+        for (index, key, date, title, content), summary, usage in zip(jobs, summaries, usages):
+            row = [date, title, content, summary]
+            with self.lock:
+                self.rows[index] = row
+                for name, value in usage.items():
+                    self.usage[name] += value
+            if self.on_done is not None:
+                try:
+                    self.on_done(key, row, usage)
+                except Exception as e:
+                    metrics.error(STORE, e)
+
+    def submit(self, date, title, content, key=None):
+        """요약 대기열에 추가하고 결과 행 번호를 반환 (여러 스레드에서 호출해도 됨)
+
+        key는 on_done에 그대로 넘겨주는 값 (예: 기사 URL)
+        """
+        with self.lock:
+            index = len(self.rows)
+            self.rows.append(None)
+        self.queue.put((index, key, date, title, content))
+        return index
+
+    def join(self):
+        """남은 요약이 모두 끝날 때까지 기다린 뒤 submit 순서대로 행 목록 반환"""
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        return self.rows
@@ -0,0 +1,23 @@
+# 키워드(용어) 빈도
+# 기사를 저장할 때 한 번만 세어서 데이터셋에 같이 넣고, 대시보드는 저장된 빈도를 합치기만 함
+
+import re
+from collections import Counter
+
+STOPWORDS = {'있다', '하다', '되다', '이다', '않다', '없다', '같다', '많다',
+             '크다', '작다', '높다', '낮다', '좋다', '나쁘다', '위해', '통해',
+             '대한', '있는', '하는', '되는', '이번', '올해', '지난', '오늘'}
+
+WORD_PATTERN = re.compile(r'[가-힣]{2,}')
+
+
+def extract_keywords(text):
+    """한글 텍스트에서 주요 키워드 추출 (2글자 이상 한글 단어, 불용어 제외)"""
+    return [w for w in WORD_PATTERN.findall(text) if w not in STOPWORDS]
+
+
+def term_counts(title, content):
+    """기사 하나의 (용어 목록, 빈도 목록) - 빈도 높은 순"""
+    counts = Counter(extract_keywords(f"{title or ''} {content or ''}"))
+    terms = [term for term, _ in counts.most_common()]
+    return terms, [counts[term] for term in terms]
@@ -0,0 +1,103 @@
+# 요약 전 본문 정리 + 토큰 세기
+# 기자 이름/사진 출처/저작권 문구 같은 KBS 공통 문구를 빼고, 토큰 수를 로컬에서 세서
+# 예산을 넘는 기사는 문장 단위로 나눔
+#
+# 토큰은 tiktoken이 있으면 모델과 같은 방식으로 세고 (pip install tiktoken),
+# 없으면 한글 기준 대략 2글자당 1토큰으로 어림
+
+import re
+
+try:
+    import tiktoken
+    HAS_TIKTOKEN = True
+except ImportError:
+    HAS_TIKTOKEN = False
+
+ENCODING_NAME = "o200k_base"  # gpt-4o 계열 토크나이저
+
+# 본문에서 뺄 KBS 공통 문구 (줄 단위)
+BOILERPLATE_LINES = [
+    re.compile(r"^\s*(촬영\s*기자|영상\s*편집|그래픽|자료\s*조사|리포트)\s*[:：].*$"),
+    re.compile(r"^\s*[\[(]?\s*사진\s*출처\s*[:：].*$"),
+    re.compile(r"^\s*[가-힣]{2,4}\s*기자\s*[(]?[\w.+-]+@[\w.-]+[)]?\s*$"),
+    re.compile(r"^\s*[\w.+-]+@kbs\.co\.kr\s*$"),
+    re.compile(r"^\s*※.*$"),
+    re.compile(r"^\s*▣\s*KBS\s*기사\s*원문보기.*$"),
+    re.compile(r"^.*(Copyright|ⓒ)\s*.*KBS.*$", re.IGNORECASE),
+    re.compile(r"^.*무단\s*전재.*금지.*$"),
+    re.compile(r"^\s*\[앵커\]\s*$|^\s*\[리포트\]\s*$"),
+]
+# 줄 안에 섞여 나오는 사진 출처 표기
+INLINE_CAPTION = re.compile(r"[\[(]\s*사진\s*출처\s*[:：][^\])]*[\])]")
+BLANK_LINES = re.compile(r"\n{3,}")
+SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+_encoding = None
+
+
+def _encoder():
+    """tiktoken 인코딩 (처음 쓸 때 한 번 로드, 실패하면 어림값 사용)"""
+    global _encoding
+    if _encoding is None and HAS_TIKTOKEN:
+        try:
+            _encoding = tiktoken.get_encoding(ENCODING_NAME)
+        except Exception:
+            _encoding = False
+    return _encoding or None
+
+
+def count_tokens(text):
+    encoding = _encoder()
+    if encoding is not None:
+        return len(encoding.encode(text or "", disallowed_special=()))
+    return len(text or "") // 2
+
+
+def clean_content(text):
+    """기사 본문에서 KBS 공통 문구(기자 이름, 사진 출처, 저작권 등) 제거"""
+    if not text:
+        return text
+    text = INLINE_CAPTION.sub("", text)
+    lines = [line.strip() for line in text.splitlines()
+             if not any(pattern.match(line) for pattern in BOILERPLATE_LINES)]
+    return BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def split_chunks(text, budget):
+    """문장 단위로 잘라서 각 조각이 budget 토큰을 넘지 않게 나눔 (한 문장이 너무 길면 글자로 자름)"""
+    chunks, current, tokens = [], [], 0
+    for sentence in SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        needed = count_tokens(sentence)
+        while needed > budget:
+            # 예산에 맞는 길이를 비율로 어림해서 앞부분만 떼어냄
+            cut = max(1, len(sentence) * budget // needed)
+            if current:
+                chunks.append(" ".join(current))
+                current, tokens = [], 0
+            chunks.append(sentence[:cut])
+            sentence = sentence[cut:]
+            needed = count_tokens(sentence)
+        if current and tokens + needed > budget:
+            chunks.append(" ".join(current))
+            current, tokens = [], 0
+        if sentence:
+            current.append(sentence)
+            tokens += needed
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+def fit_lines(lines, budget):
+    """앞에서부터 budget 토큰 안에 들어가는 줄만 남김"""
+    kept, tokens = [], 0
+    for line in lines:
+        needed = count_tokens(line) + 1
+        if tokens + needed > budget:
+            break
+        kept.append(line)
+        tokens += needed
+    return kept
@@ -0,0 +1,193 @@
+# 기사 주제 묶기 (TF-IDF + 미니배치 k-means, numpy)
+# 저장해 둔 기사별 키워드 빈도로 TF-IDF 벡터를 만들고 비슷한 기사끼리 주제로 묶어서
+# 주제마다 기사 수, 추세, 핵심 키워드, 대표 제목만 남김 -> AI 인사이트 프롬프트에는 이 요약만 넣음
+# (기사가 아무리 많아도 프롬프트 크기는 주제 수 × 몇 줄로 고정)
+#
+# 문서 × 단어 행렬은 CSR 배열(indptr, indices, data)로 들고 있다가 미니배치만 dense로 펼침
+
+import numpy as np
+import kbs_dataset
+from kbs_text import fit_lines
+
+MAX_TOPICS = 8       # 주제 수 상한
+DOCS_PER_TOPIC = 20  # 기사 수가 적으면 주제 수를 줄임 (기사 DOCS_PER_TOPIC개당 주제 하나)
+MAX_FEATURES = 2000  # 문서 빈도 높은 순으로 쓸 단어 수
+MIN_DF = 2           # 최소 문서 빈도 (한 기사에만 나온 단어는 주제를 나누는 데 도움이 안 됨)
+MAX_DF = 0.5         # 기사 절반 이상에 나오는 단어는 뺌
+BATCH_SIZE = 256
+ITERATIONS = 100
+MERGE_SIMILARITY = 0.8  # 중심이 이만큼 비슷한 주제는 하나로 합침 (주제 수를 넉넉히 잡아도 쪼개지지 않게)
+TOP_TERMS = 6        # 주제마다 보여줄 핵심 키워드 수
+TOP_TITLES = 3       # 주제마다 보여줄 대표 제목 수
+SEED = 0
+
+
+def vectorize(term_lists, count_lists):
+    """기사별 (키워드, 빈도) -> (단어 목록, CSR 행렬 (indptr, indices, data)) 행 단위 L2 정규화된 TF-IDF"""
+    n_docs = len(term_lists)
+    df = {}
+    for terms in term_lists:
+        for term in terms:
+            df[term] = df.get(term, 0) + 1
+    vocab = [term for term, count in sorted(df.items(), key=lambda item: (-item[1], item[0]))
+             if count >= MIN_DF and count <= MAX_DF * n_docs][:MAX_FEATURES]
+    position = {term: i for i, term in enumerate(vocab)}
+    idf = np.log((1 + n_docs) / (1 + np.array([df[term] for term in vocab], dtype=np.float64))) + 1
+
+    indptr, indices, data = [0], [], []
+    for terms, counts in zip(term_lists, count_lists):
+        for term, count in zip(terms, counts):
+            i = position.get(term)
+            if i is not None:
+                indices.append(i)
+                data.append(count)
+        indptr.append(len(indices))
+    indptr = np.array(indptr, dtype=np.int64)
+    indices = np.array(indices, dtype=np.int64)
+    data = np.array(data, dtype=np.float64)
+    # tf는 log(1 + 빈도)로 긴 기사가 한 단어에 끌려가지 않게 함
+    data = np.log1p(data) * idf[indices] if len(indices) else data
+    rows = np.repeat(np.arange(n_docs), np.diff(indptr))
+    norms = np.sqrt(np.bincount(rows, weights=data ** 2, minlength=n_docs))
+    data = data / np.where(norms[rows] > 0, norms[rows], 1)
+    return vocab, (indptr, indices, data.astype(np.float32))
+
+
+def dense_rows(csr, rows, width):
+    """CSR 행렬에서 rows 행만 dense로 펼침"""
+    indptr, indices, data = csr
+    out = np.zeros((len(rows), width), dtype=np.float32)
+    for out_row, row in enumerate(rows):
+        start, end = indptr[row], indptr[row + 1]
+        out[out_row, indices[start:end]] = data[start:end]
+    return out
+
+
+def _init_centers(sample, k, rng):
+    """k-means++ 초기 중심 (코사인 거리 기준)"""
+    centers = [sample[rng.integers(len(sample))]]
+    for _ in range(1, k):
+        distance = 1 - np.max(sample @ np.array(centers).T, axis=1)
+        distance = np.clip(distance, 0, None)
+        total = distance.sum()
+        index = rng.integers(len(sample)) if total <= 0 else rng.choice(len(sample), p=distance / total)
+        centers.append(sample[index])
+    return np.array(centers, dtype=np.float32)
+
+
+def minibatch_kmeans(csr, n_docs, width, k, batch_size=BATCH_SIZE, iterations=ITERATIONS, seed=SEED):
+    """미니배치 k-means (Sculley 2010): 배치마다 가장 가까운 중심을 1/누적개수 비율로 옮김
+
+    벡터가 L2 정규화돼 있으므로 내적이 큰 중심이 가장 가까운 중심. 정규화된 중심 행렬 반환
+    """
+    rng = np.random.default_rng(seed)
+    sample = dense_rows(csr, rng.choice(n_docs, size=min(n_docs, batch_size * 4), replace=False), width)
+    centers = _init_centers(sample, k, rng)
+    seen = np.zeros(k, dtype=np.float64)
+    for _ in range(iterations):
+        batch = dense_rows(csr, rng.choice(n_docs, size=min(n_docs, batch_size), replace=False), width)
+        nearest = np.argmax(batch @ centers.T, axis=1)
+        for vector, center in zip(batch, nearest):
+            seen[center] += 1
+            rate = 1.0 / seen[center]
+            centers[center] = (1 - rate) * centers[center] + rate * vector
+    norms = np.linalg.norm(centers, axis=1, keepdims=True)
+    return centers / np.where(norms > 0, norms, 1)
+
+
+def assign(csr, n_docs, width, centers, chunk=BATCH_SIZE * 4):
+    """기사마다 가장 가까운 주제 번호와 그 중심과의 코사인 유사도 (chunk개씩 펼쳐서 계산)"""
+    labels = np.empty(n_docs, dtype=np.int64)
+    similarity = np.empty(n_docs, dtype=np.float32)
+    for start in range(0, n_docs, chunk):
+        rows = np.arange(start, min(n_docs, start + chunk))
+        scores = dense_rows(csr, rows, width) @ centers.T
+        labels[rows] = np.argmax(scores, axis=1)
+        similarity[rows] = scores[np.arange(len(rows)), labels[rows]]
+    return labels, similarity
+
+
+def merge_similar(centers, labels, threshold=MERGE_SIMILARITY):
+    """중심의 코사인 유사도가 threshold 이상인 주제를 앞 번호 주제로 합친 중심 행렬 (합쳐진 자리는 0)"""
+    sizes = np.bincount(labels, minlength=len(centers)).astype(np.float64)
+    target = np.arange(len(centers))
+    similarity = centers @ centers.T
+    for topic in range(len(centers)):
+        for earlier in range(topic):
+            if target[earlier] == earlier and similarity[topic, earlier] >= threshold:
+                target[topic] = earlier
+                break
+    merged = np.zeros_like(centers)
+    np.add.at(merged, target, centers * sizes[:, None])
+    norms = np.linalg.norm(merged, axis=1, keepdims=True)
+    return merged / np.where(norms > 0, norms, 1)
+
+
+def cluster(start_day=None, end_day=None, max_topics=MAX_TOPICS, dataset_dir=kbs_dataset.DATASET_DIR):
+    """기간 안 기사들의 주제 목록 (기사 수 많은 순)
+
+    [{'주제', '기사 수', '비율', '추세', '핵심 키워드': [...], '대표 제목': [...]}, ...]
+    추세는 기간 뒤쪽 절반의 기사 비율이 앞쪽 절반보다 얼마나 늘었는지 (%, 앞쪽에 없던 주제는 '신규',
+    하루치만 있으면 None)
+    """
+    df = kbs_dataset.load_terms(start_day, end_day, dataset_dir)
+    n_docs = len(df)
+    if n_docs == 0:
+        return []
+    vocab, csr = vectorize(df["키워드"].tolist(), df["키워드 빈도"].tolist())
+    if not vocab:
+        return []
+    k = max(1, min(max_topics, n_docs // DOCS_PER_TOPIC))
+    centers = minibatch_kmeans(csr, n_docs, len(vocab), k)
+    labels, _ = assign(csr, n_docs, len(vocab), centers)
+    centers = merge_similar(centers, labels)
+    labels, similarity = assign(csr, n_docs, len(vocab), centers)
+
+    # 기간을 날짜 기준 앞/뒤 절반으로 나눠 주제 비율 변화를 봄
+    days = df["day"].to_numpy()
+    unique_days = sorted(set(days))
+    middle = unique_days[len(unique_days) // 2]
+    late = days >= middle
+    early_total, late_total = max(1, int((~late).sum())), max(1, int(late.sum()))
+
+    titles = df["뉴스 제목"].to_numpy()
+    topics = []
+    for topic in range(k):
+        members = np.flatnonzero(labels == topic)
+        if not len(members):
+            continue
+        early_share = (~late[members]).sum() / early_total
+        late_share = late[members].sum() / late_total
+        closest = members[np.argsort(-similarity[members], kind="stable")]
+        topics.append({
+            "주제": topic,
+            "기사 수": int(len(members)),
+            "비율": round(len(members) / n_docs, 3),
+            "추세": (None if len(unique_days) < 2 else
+                     int(round((late_share - early_share) / early_share * 100)) if early_share else "신규"),
+            "핵심 키워드": [vocab[i] for i in np.argsort(-centers[topic], kind="stable")[:TOP_TERMS]
+                         if centers[topic][i] > 0],
+            "대표 제목": list(dict.fromkeys(titles[closest]))[:TOP_TITLES],
+        })
+    topics.sort(key=lambda item: -item["기사 수"])
+    for number, item in enumerate(topics, 1):
+        item["주제"] = number
+    return topics
+
+
+def format_trend(trend):
+    """추세 값 -> '+35%' / '신규' / '-'"""
+    if trend is None:
+        return "-"
+    return trend if isinstance(trend, str) else f"{trend:+d}%"
+
+
+def digest(topics, budget):
+    """주제 목록 -> 프롬프트에 넣을 여러 줄 텍스트 (budget 토큰 안에서 큰 주제부터)"""
+    lines = []
+    for item in topics:
+        lines.append(f"[주제 {item['주제']}] 기사 {item['기사 수']}개 ({item['비율']:.0%}), "
+                     f"추세 {format_trend(item['추세'])}, "
+                     f"키워드: {', '.join(item['핵심 키워드'])}")
+        lines += [f"  - {title}" for title in item["대표 제목"]]
+    return "\n".join(fit_lines(lines, budget))
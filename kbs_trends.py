@@ -0,0 +1,201 @@
+# 날짜 × 키워드 빈도 행렬 (SQLite) + 떠오르는 키워드
+# 기사를 저장할 때 키워드별로 (날짜, 기사 수, 빈도)를 더해 두고, 대시보드는 기간의 행렬만 꺼내서
+# numpy로 이동 합계/증가율/급증 점수를 계산함 (본문을 다시 읽지 않으므로 몇 달 범위도 바로 나옴)
+#
+# 저장은 0이 아닌 칸만 (term, day) 행으로 하고, 읽을 때 기간 안에서 자주 나온 키워드만 dense 행렬로 만듦
+# 다시 올라온 같은 기사(kbs_dedup)는 넣지 않음
+
+import sqlite3
+import threading
+from datetime import date, timedelta
+import numpy as np
+import kbs_dataset
+from kbs_config import data_path
+from kbs_terms import term_counts
+
+TRENDS_PATH = data_path("trends.sqlite3")
+WINDOW = 7       # 최근 구간(일)
+BASELINE = 28    # 비교할 이전 구간(일)
+MIN_DOCS = 3     # 행렬에 넣을 키워드의 기간 내 최소 기사 수
+
+
+def day_axis(start_day, end_day):
+    """'YYYY-MM-DD' 두 날짜 사이(양 끝 포함)의 모든 날짜 ['2024-01-01', ...]"""
+    start, end = date.fromisoformat(start_day), date.fromisoformat(end_day)
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+def shift_day(day, days):
+    return (date.fromisoformat(day) + timedelta(days=days)).isoformat()
+
+
+def rolling_sum(matrix, window):
+    """날짜 축(0번 축)으로 window일 이동 합계 (앞쪽 window-1일은 있는 만큼만 합침)"""
+    total = np.cumsum(matrix, axis=0, dtype=np.float64)
+    total[window:] = total[window:] - total[:-window]
+    return total
+
+
+def burst_scores(matrix, totals, window=WINDOW):
+    """마지막 window일과 그 이전 구간을 비교한 키워드별 (최근 기사 수, 기대값, 증가율, 급증 점수)
+
+    기대값은 이전 구간에서 그 키워드가 나온 기사 비율 × 최근 구간 전체 기사 수라서
+    날짜마다 수집한 기사 수가 달라도 비교할 수 있음. 점수는 (최근 - 기대) / sqrt(기대 + 1)
+    """
+    recent = matrix[-window:].sum(axis=0, dtype=np.float64)
+    before = matrix[:-window].sum(axis=0, dtype=np.float64)
+    recent_total = float(totals[-window:].sum())
+    before_total = float(totals[:-window].sum())
+    share = before / before_total if before_total else np.zeros_like(before)
+    expected = share * recent_total
+    growth = (recent + 1) / (expected + 1)
+    score = (recent - expected) / np.sqrt(expected + 1)
+    return recent, expected, growth, score
+
+
+class TrendIndex:
+    """날짜 × 키워드 기사 수/빈도 (여러 스레드에서 같이 써도 됨)"""
+
+    def __init__(self, path=TRENDS_PATH):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS term_days (
+                term TEXT NOT NULL,
+                day TEXT NOT NULL,
+                docs INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (term, day)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_term_days_day ON term_days(day, term);
+            CREATE TABLE IF NOT EXISTS days (
+                day TEXT PRIMARY KEY,
+                docs INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                day TEXT NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def add(self, records):
+        """기사(dict: url, list_date, title, content)들의 키워드 빈도를 더함, 이미 넣은 기사와 중복 기사는 건너뜀
+
+        record에 'terms', 'counts'가 있으면 (데이터셋에 저장해 둔 빈도) 다시 세지 않음
+        """
+        added = 0
+        with self.lock:
+            for record in records:
+                if record.get("duplicate_of"):
+                    continue
+                day = kbs_dataset.partition_day(record["list_date"])
+                inserted = self.conn.execute("INSERT OR IGNORE INTO articles (url, day) VALUES (?, ?)",
+                                             (record["url"], day)).rowcount
+                if not inserted:
+                    continue
+                terms, counts = record.get("terms"), record.get("counts")
+                if terms is None:
+                    terms, counts = term_counts(record["title"], record["content"])
+                self.conn.executemany("""
+                    INSERT INTO term_days (term, day, docs, count) VALUES (?, ?, 1, ?)
+                    ON CONFLICT(term, day) DO UPDATE SET docs = docs + 1, count = count + excluded.count
+                """, [(term, day, int(count)) for term, count in zip(terms, counts)])
+                self.conn.execute("""
+                    INSERT INTO days (day, docs) VALUES (?, 1)
+                    ON CONFLICT(day) DO UPDATE SET docs = docs + 1
+                """, (day,))
+                added += 1
+            self.conn.commit()
+        return added
+
+    def rebuild(self, days, dataset_dir=kbs_dataset.DATASET_DIR):
+        """days(YYYY-MM-DD)의 칸을 지우고 데이터셋의 지금 기사로 다시 채움 (본문을 고친 재추출 뒤 등)"""
+        days = sorted(set(days))
+        if not days:
+            return 0
+        marks = ",".join("?" * len(days))
+        with self.lock:
+            for table in ("term_days", "days", "articles"):
+                self.conn.execute(f"DELETE FROM {table} WHERE day IN ({marks})", days)
+            self.conn.commit()
+        wanted = set(days)
+        return self.add(record for record in _dataset_records(days[0], days[-1], dataset_dir)
+                        if record["list_date"] in wanted)
+
+    def matrix(self, start_day, end_day, terms=None, min_docs=MIN_DOCS, value="docs"):
+        """(날짜 목록, 키워드 목록, 날짜 × 키워드 행렬, 날짜별 전체 기사 수)
+
+        terms를 주면 그 키워드만, 아니면 기간 안에서 min_docs개 이상 기사에 나온 키워드만 넣음
+        value는 'docs'(그 키워드가 나온 기사 수) 또는 'count'(빈도 합)
+        """
+        column = {"docs": "docs", "count": "count"}[value]
+        days = day_axis(start_day, end_day)
+        with self.lock:
+            if terms is not None:
+                terms = list(terms)
+                marks = ",".join("?" * len(terms))
+                rows = self.conn.execute(
+                    f"SELECT term, day, {column} FROM term_days WHERE day BETWEEN ? AND ? AND term IN ({marks})",
+                    [start_day, end_day] + terms
+                ).fetchall() if terms else []
+            else:
+                rows = self.conn.execute(f"""
+                    SELECT t.term, t.day, t.{column} FROM term_days t
+                    JOIN (SELECT term FROM term_days WHERE day BETWEEN ? AND ?
+                          GROUP BY term HAVING SUM(docs) >= ?) c ON c.term = t.term
+                    WHERE t.day BETWEEN ? AND ?
+                """, (start_day, end_day, min_docs, start_day, end_day)).fetchall()
+            day_docs = dict(self.conn.execute("SELECT day, docs FROM days WHERE day BETWEEN ? AND ?",
+                                              (start_day, end_day)).fetchall())
+        if terms is None:
+            terms = sorted({row[0] for row in rows})
+        term_pos = {term: i for i, term in enumerate(terms)}
+        day_pos = {day: i for i, day in enumerate(days)}
+        matrix = np.zeros((len(days), len(terms)), dtype=np.int32)
+        if rows:
+            term_index = np.fromiter((term_pos[row[0]] for row in rows), dtype=np.int64, count=len(rows))
+            day_index = np.fromiter((day_pos[row[1]] for row in rows), dtype=np.int64, count=len(rows))
+            values = np.fromiter((row[2] for row in rows), dtype=np.int32, count=len(rows))
+            np.add.at(matrix, (day_index, term_index), values)
+        totals = np.array([day_docs.get(day, 0) for day in days], dtype=np.int32)
+        return days, terms, matrix, totals
+
+    def rising(self, end_day, k=10, window=WINDOW, baseline=BASELINE, min_docs=MIN_DOCS):
+        """end_day까지 최근 window일 동안 이전 baseline일보다 급증한 키워드 상위 k개
+
+        [{'키워드', '최근 기사 수', '기대 기사 수', '증가율', '급증 점수'}, ...]
+        """
+        start_day = shift_day(end_day, -(window + baseline - 1))
+        _, terms, matrix, totals = self.matrix(start_day, end_day, min_docs=min_docs)
+        if not terms:
+            return []
+        recent, expected, growth, score = burst_scores(matrix, totals, window)
+        order = [i for i in np.argsort(-score, kind="stable") if recent[i] >= min_docs and score[i] > 0][:k]
+        return [{"키워드": terms[i], "최근 기사 수": int(recent[i]), "기대 기사 수": round(float(expected[i]), 1),
+                 "증가율": round(float(growth[i]), 2), "급증 점수": round(float(score[i]), 2)} for i in order]
+
+
+def index_dataset(index, dataset_dir=kbs_dataset.DATASET_DIR):
+    """parquet 데이터셋에 있는 기사로 행렬을 채움 (비어 있을 때 한 번, 저장해 둔 키워드 빈도를 그대로 씀)"""
+    if index.count() or not kbs_dataset.list_days(dataset_dir):
+        return 0
+    return index.add(_dataset_records(None, None, dataset_dir))
+
+
+def _dataset_records(start_day, end_day, dataset_dir):
+    """데이터셋 기사 -> TrendIndex.add에 넘길 dict (list_date는 파티션 날짜 YYYY-MM-DD)"""
+    df = kbs_dataset.load(start_day, end_day,
+                          columns=["url", "day", "뉴스 제목", "뉴스 내용", "키워드", "키워드 빈도",
+                                   kbs_dataset.DUPLICATE_COLUMN], dataset_dir=dataset_dir)
+    return ({"url": row["url"], "list_date": row["day"], "title": row["뉴스 제목"],
+             "content": row["뉴스 내용"], "terms": row["키워드"], "counts": row["키워드 빈도"],
+             # 원본 url이 없는 칸은 pandas 버전에 따라 None 또는 NaN
+             "duplicate_of": row[kbs_dataset.DUPLICATE_COLUMN] if isinstance(row[kbs_dataset.DUPLICATE_COLUMN], str)
+             else None}
+            for _, row in df.iterrows())
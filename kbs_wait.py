@@ -0,0 +1,114 @@
+# Selenium 대기 헬퍼
+# 고정 time.sleep 대신 필요한 요소가 준비될 때까지만 기다리고, 실제로 기다린 시간을 기록
+# 선택자 기본값은 KBS, 다른 소스는 kbs_sources의 selectors 값을 넘김
+
+import threading
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+LISTING_ITEMS = ".box-contents.has-wrap .box-content"
+DATE_LABEL = ".datepicker-label .date"
+CONTENT = "#cont_newstext"
+
+DEFAULT_TIMEOUT = 10
+
+
+class WaitTimings:
+    """대기 종류별로 걸린 시간(초)과 타임아웃 횟수 기록"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.durations = {}
+        self.timeouts = {}
+
+    def record(self, name, seconds, timed_out=False):
+        with self.lock:
+            self.durations.setdefault(name, []).append(seconds)
+            if timed_out:
+                self.timeouts[name] = self.timeouts.get(name, 0) + 1
+
+    def reset(self):
+        with self.lock:
+            self.durations.clear()
+            self.timeouts.clear()
+
+    def summary(self):
+        """[{'대기': name, '횟수', '합계(초)', '평균(초)', '최대(초)', '타임아웃'}, ...]"""
+        with self.lock:
+            return [
+                {
+                    "대기": name,
+                    "횟수": len(values),
+                    "합계(초)": round(sum(values), 2),
+                    "평균(초)": round(sum(values) / len(values), 3),
+                    "최대(초)": round(max(values), 3),
+                    "타임아웃": self.timeouts.get(name, 0),
+                }
+                for name, values in self.durations.items()
+            ]
+
+
+timings = WaitTimings()
+
+
+def wait_for(driver, name, condition, timeout=DEFAULT_TIMEOUT):
+    """condition이 참이 될 때까지 대기, 걸린 시간을 name으로 기록 (타임아웃이면 None)"""
+    start = time.perf_counter()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=0.1).until(condition)
+        timings.record(name, time.perf_counter() - start)
+        return result
+    except TimeoutException:
+        timings.record(name, time.perf_counter() - start, timed_out=True)
+        return None
+
+
+def first_item_href(driver, items=LISTING_ITEMS):
+    """현재 목록 첫 기사의 링크 (목록이 바뀌었는지 비교용)"""
+    try:
+        elements = driver.find_elements(By.CSS_SELECTOR, items)
+        return elements[0].get_attribute("href") if elements else None
+    except WebDriverException:
+        # 목록을 다시 그리는 중이면 stale 오류가 날 수 있음
+        return None
+
+
+def current_date_label(driver, date_label=DATE_LABEL):
+    try:
+        return driver.find_element(By.CSS_SELECTOR, date_label).text
+    except WebDriverException:
+        return None
+
+
+def wait_listing(driver, timeout=DEFAULT_TIMEOUT, items=LISTING_ITEMS):
+    """목록 기사 요소가 나타날 때까지"""
+    return wait_for(driver, "목록 로딩",
+                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, items)), timeout)
+
+
+def wait_content(driver, timeout=DEFAULT_TIMEOUT, selector=None):
+    """상세 페이지 본문(selector, 기본은 #cont_newstext)이 나타날 때까지"""
+    return wait_for(driver, "본문 로딩",
+                    EC.presence_of_element_located((By.CSS_SELECTOR, selector or CONTENT)), timeout)
+
+
+def wait_page_change(driver, old_href, timeout=DEFAULT_TIMEOUT, items=LISTING_ITEMS):
+    """페이지 번호 클릭 후 목록이 다른 기사들로 바뀔 때까지"""
+    def changed(d):
+        href = first_item_href(d, items)
+        return href is not None and href != old_href
+    return wait_for(driver, "페이지 이동", changed, timeout)
+
+
+def wait_date_change(driver, old_date, old_href, timeout=DEFAULT_TIMEOUT, items=LISTING_ITEMS,
+                     date_label=DATE_LABEL):
+    """이전 날짜 클릭 후 날짜 표시와 목록이 모두 바뀔 때까지"""
+    def changed(d):
+        label = current_date_label(d, date_label)
+        return label is not None and label != old_date and first_item_href(d, items) != old_href
+    if wait_for(driver, "날짜 이동", changed, timeout) is None:
+        return None
+    return wait_listing(driver, timeout, items)